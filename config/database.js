@@ -1,4 +1,5 @@
 const { Pool } = require('pg');
+const { PrismaClient } = require('@prisma/client');
 const config = require('./env');
 
 const pool = new Pool({
@@ -9,6 +10,10 @@ const pool = new Pool({
   connectionTimeoutMillis: 2000,
 });
 
+// Shared Prisma client: every PrismaClient opens its own connection pool, so
+// routes and services use this one instead of constructing their own
+const prisma = new PrismaClient();
+
 // Test database connection
 async function testConnection() {
   try {
@@ -35,9 +40,37 @@ async function disconnect() {
 // Query function
 const query = (text, params) => pool.query(text, params);
 
+/**
+ * Run a bulk-ingest job on one pooled connection, passing it a query function.
+ * With DB_BULK_ASYNC_COMMIT=true the session sets synchronous_commit=off, so commits
+ * return without waiting for their WAL flush. A crash can then lose the last fraction
+ * of a second of committed rows, but nothing is corrupted or half-applied. Only use it
+ * for data that can be fetched again, such as SAM.gov contracts.
+ * @param {Function} fn - Receives (text, params) => Promise<QueryResult>
+ * @returns {Promise<*>} Whatever fn returns
+ */
+async function withBulkSession(fn) {
+  const client = await pool.connect();
+  let releaseError;
+  try {
+    if (config.dbBulkAsyncCommit) {
+      await client.query('SET synchronous_commit TO off');
+    }
+    return await fn((text, params) => client.query(text, params));
+  } finally {
+    if (config.dbBulkAsyncCommit) {
+      // A connection that can't be reset is discarded rather than returned to the pool
+      await client.query('RESET synchronous_commit').catch(error => { releaseError = error; });
+    }
+    client.release(releaseError);
+  }
+}
+
 module.exports = {
   query,
+  withBulkSession,
   pool,
+  prisma,
   testConnection,
   disconnect
 };
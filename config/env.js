@@ -1,4 +1,11 @@
 require('dotenv').config();
+const os = require('os');
+
+// For integer settings where 0 is meaningful: only a missing or non-numeric value gets the default
+const parseIntSetting = (value, fallback) => {
+  const parsed = parseInt(value, 10);
+  return Number.isNaN(parsed) ? fallback : parsed;
+};
 
 const config = {
   // Server
@@ -8,6 +15,7 @@ const config = {
   
   // Database
   databaseUrl: process.env.DATABASE_URL || 'postgresql://localhost:5432/government_contracts',
+  dbBulkAsyncCommit: process.env.DB_BULK_ASYNC_COMMIT === 'true', // see withBulkSession
   
   // Authentication
   sessionSecret: process.env.SESSION_SECRET || 'your-secret-key-change-in-production',
@@ -15,8 +23,15 @@ const config = {
   
   // External APIs
   samGovApiKey: process.env.SAM_GOV_API_KEY,
+  samGovRequestsPerSecond: parseFloat(process.env.SAM_GOV_REQUESTS_PER_SECOND) || 2,
   norshinApiKey: process.env.NORSHIN_API_KEY,
   norshinApiUrl: process.env.NORSHIN_API_URL || 'https://norshin.com/api/process-document',
+  norshinBatchApiUrl: process.env.NORSHIN_BATCH_API_URL, // e.g. https://norshin.com/api/process-document-batch
+  norshinBatchSize: parseInt(process.env.NORSHIN_BATCH_SIZE) || 10,
+  norshinMaxParallel: parseInt(process.env.NORSHIN_MAX_PARALLEL) || 4,
+  norshinRequestsPerSecond: parseFloat(process.env.NORSHIN_REQUESTS_PER_SECOND) || 0, // 0 = unlimited
+  norshinUploadRetries: parseIntSetting(process.env.NORSHIN_UPLOAD_RETRIES, 3), // 0 = no retries
+  norshinHttp2: process.env.NORSHIN_HTTP2 === 'true', // multiplex uploads over one HTTP/2 session
   openRouterApiKey: process.env.OPENROUTER_API_KEY || process.env.REACT_APP_OPENROUTER_KEY,
   
   // Vector Database (Vectra - Pure Node.js)
@@ -25,11 +40,15 @@ const config = {
   // File Upload
   maxFileSize: parseInt(process.env.MAX_FILE_SIZE) || 50 * 1024 * 1024, // 50MB
   allowedExtensions: (process.env.ALLOWED_EXTENSIONS || '.pdf,.doc,.docx,.txt').split(','),
+  pdfMaxPages: parseIntSetting(process.env.PDF_MAX_PAGES, 200), // text-layer pages read per PDF (0 = all)
   
   // Directories
   uploadDir: process.env.UPLOAD_DIR || './uploads',
   documentsDir: process.env.DOCUMENTS_DIR || './documents',
   
+  // Document processing (I/O bound, so roughly two in-flight documents per core)
+  processingMaxWorkers: parseInt(process.env.PROCESSING_MAX_WORKERS) || Math.min(32, os.cpus().length * 2),
+  
   // Rate Limiting
   rateLimitWindowMs: parseInt(process.env.RATE_LIMIT_WINDOW_MS) || 900000, // 15 minutes
   rateLimitMaxRequests: parseInt(process.env.RATE_LIMIT_MAX_REQUESTS) || 100
@@ -0,0 +1,341 @@
+const fs = require('fs');
+const http = require('http');
+const http2 = require('http2');
+const https = require('https');
+const { pipeline } = require('stream/promises');
+const axios = require('axios');
+const config = require('./env');
+
+// Shared keep-alive agents so repeated requests to SAM.gov / Norshin reuse
+// TCP+TLS connections instead of handshaking for every document
+// The pool is at least as large as the processing worker count so workers never queue for a socket
+const maxSockets = parseInt(process.env.HTTP_MAX_SOCKETS) || Math.max(20, config.processingMaxWorkers);
+
+const httpAgent = new http.Agent({
+  keepAlive: true,
+  maxSockets,
+  maxFreeSockets: maxSockets
+});
+
+const httpsAgent = new https.Agent({
+  keepAlive: true,
+  maxSockets,
+  maxFreeSockets: maxSockets
+});
+
+const httpClient = axios.create({
+  httpAgent,
+  httpsAgent
+});
+
+// Opt-in retries for transient upstream failures: pass `retries: n` in the request config,
+// plus an optional async `beforeRetry()` that runs after the backoff (e.g. to take a rate-limiter token).
+// Off by default because streamed bodies (multipart uploads) can't be replayed; those
+// callers rebuild the body and use isRetryableError/retryDelayMs themselves.
+const RETRY_STATUSES = new Set([429, 502, 503, 504]);
+const RETRY_ERROR_CODES = new Set(['ECONNRESET', 'ECONNREFUSED', 'ETIMEDOUT']);
+const RETRY_BACKOFF_MS = 500;
+// Longest Retry-After we wait out; a server asking for more (e.g. a daily quota) fails the request now
+const MAX_RETRY_DELAY_MS = 30000;
+
+const isRetryableError = (error) => {
+  const status = error.response?.status;
+  return status ? RETRY_STATUSES.has(status) : RETRY_ERROR_CODES.has(error.code);
+};
+
+// Retry-After is either delay-seconds or an HTTP-date; null when absent or unparseable
+const parseRetryAfterMs = (value) => {
+  if (!value) return null;
+  const seconds = Number(value);
+  if (!Number.isNaN(seconds)) return Math.max(0, seconds * 1000);
+  const date = Date.parse(value);
+  return Number.isNaN(date) ? null : Math.max(0, date - Date.now());
+};
+
+/**
+ * How long to wait before retrying a failed request.
+ * Honours Retry-After when the server sends one, otherwise backs off exponentially.
+ * @param {Error} error - Axios-shaped error
+ * @param {number} attempt - 1-based retry attempt
+ * @returns {number|null} Delay in ms, or null when the server asks for longer than
+ *   MAX_RETRY_DELAY_MS and the caller should fail instead of waiting
+ */
+const retryDelayMs = (error, attempt) => {
+  const retryAfterMs = parseRetryAfterMs(error.response?.headers?.['retry-after']);
+  if (retryAfterMs === null) {
+    return Math.min(MAX_RETRY_DELAY_MS, RETRY_BACKOFF_MS * 2 ** (attempt - 1));
+  }
+  return retryAfterMs > MAX_RETRY_DELAY_MS ? null : retryAfterMs;
+};
+
+httpClient.interceptors.response.use(null, async (error) => {
+  const requestConfig = error.config;
+  if (!requestConfig || !isRetryableError(error) || !(requestConfig.retries > 0)) {
+    throw error;
+  }
+
+  requestConfig.retryAttempt = (requestConfig.retryAttempt || 0) + 1;
+  if (requestConfig.retryAttempt > requestConfig.retries) {
+    throw error;
+  }
+
+  const delay = retryDelayMs(error, requestConfig.retryAttempt);
+  if (delay === null) {
+    throw error;
+  }
+  // Query strings can carry credentials (SAM.gov's api_key), so only the path is logged
+  console.warn(`⚠️ [DEBUG] ${requestConfig.method?.toUpperCase()} ${String(requestConfig.url).split('?')[0]} failed (${error.response?.status || error.code}), retry ${requestConfig.retryAttempt}/${requestConfig.retries} in ${delay}ms`);
+  await new Promise(resolve => setTimeout(resolve, delay));
+  if (requestConfig.beforeRetry) {
+    await requestConfig.beforeRetry();
+  }
+  return httpClient(requestConfig);
+});
+
+// Opt-in HTTP/2 for multipart uploads (NORSHIN_HTTP2=true): concurrent uploads to the same
+// origin share one multiplexed session instead of a socket + TLS handshake each.
+// Origins that negotiate HTTP/1.1 are remembered and go through the keep-alive pool.
+const HTTP2_CONNECT_TIMEOUT_MS = 10000;
+const http2Sessions = new Map(); // origin -> Promise<ClientHttp2Session|null>
+
+const getHttp2Session = (origin) => {
+  if (!http2Sessions.has(origin)) {
+    http2Sessions.set(origin, new Promise((resolve) => {
+      const session = http2.connect(origin);
+      let connected = false;
+      const timer = setTimeout(() => session.destroy(new Error('HTTP/2 connect timeout')), HTTP2_CONNECT_TIMEOUT_MS);
+      session.once('connect', () => {
+        connected = true;
+        clearTimeout(timer);
+        session.unref();
+        resolve(session);
+      });
+      session.on('error', (error) => {
+        clearTimeout(timer);
+        if (!connected) {
+          console.warn(`⚠️ [DEBUG] HTTP/2 unavailable for ${origin} (${error.message}), using HTTP/1.1`);
+          resolve(null);
+        }
+      });
+      // Drop closed sessions so the next upload reconnects; failed probes stay cached as null
+      session.once('close', () => {
+        http2Sessions.get(origin)?.then(current => {
+          if (current === session) http2Sessions.delete(origin);
+        });
+      });
+    }));
+  }
+  return http2Sessions.get(origin);
+};
+
+const parseBody = (raw) => {
+  try {
+    return JSON.parse(raw);
+  } catch (parseError) {
+    return raw; // Non-JSON body, keep as text
+  }
+};
+
+const readStream = async (stream) => {
+  const chunks = [];
+  for await (const chunk of stream) {
+    chunks.push(chunk);
+  }
+  return Buffer.concat(chunks).toString('utf8');
+};
+
+// Mirrors the axios response/error shape ({ status, headers, data } / error.response).
+// With responseType 'stream', successful responses resolve as soon as headers arrive and
+// data is the body stream; error bodies are always buffered and parsed.
+const postOverHttp2 = (session, url, body, headers, timeout, responseType) => new Promise((resolve, reject) => {
+  const { pathname, search } = new URL(url);
+  const requestHeaders = { ':method': 'POST', ':path': `${pathname}${search}` };
+  for (const [name, value] of Object.entries(headers)) {
+    requestHeaders[name.toLowerCase()] = value;
+  }
+
+  const request = session.request(requestHeaders);
+  request.setTimeout(timeout, () => request.close(http2.constants.NGHTTP2_CANCEL));
+  request.on('error', reject);
+
+  request.on('response', async (responseHeaders) => {
+    const status = responseHeaders[':status'];
+    if (responseType === 'stream' && status < 400) {
+      resolve({ status, headers: responseHeaders, data: request });
+      return;
+    }
+
+    try {
+      const response = { status, headers: responseHeaders, data: parseBody(await readStream(request)) };
+      if (status >= 400) {
+        const error = new Error(`Request failed with status code ${status}`);
+        error.response = response;
+        reject(error);
+      } else {
+        resolve(response);
+      }
+    } catch (error) {
+      reject(error);
+    }
+  });
+
+  request.on('close', () => {
+    // No-op once settled; otherwise the stream closed before any response headers
+    reject(new Error(`HTTP/2 request to ${url} closed without a response`));
+  });
+
+  body.pipe(request);
+});
+
+// Total multipart size, as axios computes it for the HTTP/1.1 path: file parts are sized
+// with fs.stat, never read, so uploads stay streamed. null when a part has no known length.
+const getFormLength = (form) => new Promise((resolve) => {
+  if (typeof form.getLength !== 'function') {
+    resolve(null);
+    return;
+  }
+  form.getLength((error, length) => resolve(error ? null : length));
+});
+
+// POST a form-data body, over HTTP/2 when enabled and negotiated, otherwise via httpClient.
+// Pass responseType 'stream' to receive the body as a stream instead of parsed JSON.
+const postForm = async (url, form, { headers = {}, timeout = 120000, responseType } = {}) => {
+  if (config.norshinHttp2 && url.startsWith('https://')) {
+    const session = await getHttp2Session(new URL(url).origin);
+    if (session && !session.closed && !session.destroyed) {
+      const contentLength = await getFormLength(form);
+      const http2Headers = contentLength === null ? headers : { ...headers, 'Content-Length': contentLength };
+      return postOverHttp2(session, url, form, http2Headers, timeout, responseType);
+    }
+  }
+
+  try {
+    return await httpClient.post(url, form, {
+      headers,
+      timeout,
+      responseType,
+      maxBodyLength: Infinity,
+      maxContentLength: Infinity
+    });
+  } catch (error) {
+    // Streamed error bodies are read so callers can still inspect error.response.data
+    if (responseType === 'stream' && typeof error.response?.data?.pipe === 'function') {
+      error.response.data = parseBody(await readStream(error.response.data).catch(() => ''));
+    }
+    throw error;
+  }
+};
+
+// Ask the server for the size up front so oversized files are rejected without a GET.
+// Returns null when the server doesn't answer HEAD or omits Content-Length.
+const probeContentLength = async (url, headers) => {
+  try {
+    const response = await httpClient.head(url, { timeout: 10000, headers });
+    const length = parseInt(response.headers['content-length']);
+    return Number.isNaN(length) ? null : length;
+  } catch (error) {
+    return null;
+  }
+};
+
+// Start a size-capped download; the response body is left as a stream for the caller
+const openDownload = async (url, options) => {
+  const {
+    maxBytes = config.maxFileSize,
+    timeout = 120000,
+    headers = {},
+    probe = true
+  } = options;
+
+  const requestHeaders = { ...headers };
+  if (probe) {
+    const probedLength = await probeContentLength(url, headers);
+    if (probedLength !== null && probedLength > maxBytes) {
+      throw new Error(`File too large: ${probedLength} bytes exceeds limit of ${maxBytes} bytes`);
+    }
+    if (probedLength === null) {
+      // Size unknown: ask the server to stop after maxBytes + 1 so the cap below still trips
+      requestHeaders.Range = `bytes=0-${maxBytes}`;
+    }
+  }
+
+  const response = await httpClient.get(url, {
+    responseType: 'stream',
+    timeout,
+    headers: requestHeaders
+  });
+
+  const declaredLength = parseInt(response.headers['content-length']);
+  if (declaredLength > maxBytes) {
+    response.data.destroy();
+    throw new Error(`File too large: ${declaredLength} bytes exceeds limit of ${maxBytes} bytes`);
+  }
+  return { response, maxBytes };
+};
+
+// Stream a download into memory, collecting chunks and concatenating once at the end.
+// Aborts as soon as the body exceeds maxBytes instead of buffering the whole response first.
+const downloadToBuffer = async (url, options = {}) => {
+  const { response, maxBytes } = await openDownload(url, options);
+  const stream = response.data;
+
+  const chunks = [];
+  let totalBytes = 0;
+  for await (const chunk of stream) {
+    totalBytes += chunk.length;
+    if (totalBytes > maxBytes) {
+      stream.destroy();
+      throw new Error(`File too large: exceeded limit of ${maxBytes} bytes while downloading`);
+    }
+    chunks.push(chunk);
+  }
+
+  return {
+    data: Buffer.concat(chunks, totalBytes),
+    headers: response.headers,
+    status: response.status
+  };
+};
+
+// Stream a download straight to filePath, so memory use stays at one chunk however large
+// the file is. Same options and size cap as downloadToBuffer; a partial file is removed.
+const downloadToFile = async (url, filePath, options = {}) => {
+  const { response, maxBytes } = await openDownload(url, options);
+
+  let totalBytes = 0;
+  try {
+    await pipeline(
+      response.data,
+      async function* (source) {
+        for await (const chunk of source) {
+          totalBytes += chunk.length;
+          if (totalBytes > maxBytes) {
+            throw new Error(`File too large: exceeded limit of ${maxBytes} bytes while downloading`);
+          }
+          yield chunk;
+        }
+      },
+      fs.createWriteStream(filePath)
+    );
+  } catch (error) {
+    await fs.promises.rm(filePath, { force: true });
+    throw error;
+  }
+
+  return {
+    bytes: totalBytes,
+    headers: response.headers,
+    status: response.status
+  };
+};
+
+module.exports = {
+  httpClient,
+  downloadToBuffer,
+  downloadToFile,
+  postForm,
+  isRetryableError,
+  retryDelayMs,
+  httpAgent,
+  httpsAgent
+};
@@ -1,65 +1,91 @@
 const { PrismaClient } = require('@prisma/client');
 require('dotenv').config();
 const AIService = require('./services/aiService');
+const { contractText } = require('./services/vectorService');
 const logger = require('./utils/logger');
 
 const prisma = new PrismaClient();
 
+// Contracts read, embedded and stored per page; one embedding request per page
+const EMBEDDING_BATCH_SIZE = 100;
+// Contracts processed per run
+const MAX_CONTRACTS = 300;
+
 async function populateContractEmbeddings() {
   console.log('🔄 Populating contract embeddings...');
   
   try {
-    // Get all contracts from the database
-    const contracts = await prisma.contract.findMany({
-      take: 300 // Process all 300 contracts
-    });
-    
-    console.log(`📊 Found ${contracts.length} contracts to process`);
+    const total = Math.min(await prisma.contract.count(), MAX_CONTRACTS);
+    console.log(`📊 Found ${total} contracts to process`);
     
     let processed = 0;
     let failed = 0;
+    let seen = 0;
+    let lastId = 0;
     
-    for (const contract of contracts) {
-      try {
-        // Create content for embedding
-        const content = `${contract.title} ${contract.description || ''} ${contract.agency || ''}`;
+    // Stream contracts in id order, one page at a time and only the embedded columns,
+    // so memory stays flat no matter how many contracts there are
+    while (seen < total) {
+      const contracts = await prisma.contract.findMany({
+        where: { id: { gt: lastId } },
+        orderBy: { id: 'asc' },
+        take: Math.min(EMBEDDING_BATCH_SIZE, total - seen),
+        select: { id: true, title: true, description: true, agency: true }
+      });
+      if (contracts.length === 0) break;
+      seen += contracts.length;
+      lastId = contracts[contracts.length - 1].id;
+
+      const batch = [];
+      for (const contract of contracts) {
+        // Same field table as the vector index, so missing fields leave no "null" or gaps
+        const content = contractText(contract);
         
-        if (content.trim().length < 10) {
+        if (content.length < 10) {
           console.log(`⚠️  Skipping contract ${contract.id} - insufficient content`);
           continue;
         }
-        
-        // Generate embedding
-        const embedding = await AIService.generateEmbedding(content);
-        
-        // Generate summary
-        const summary = await AIService.summarizeDocument(content);
-        
-        // Store in contract_embeddings table using Prisma
-        await prisma.$executeRaw`
-          INSERT INTO contract_embeddings (contract_id, embedding, content_summary, metadata)
-          VALUES (${contract.id}, ${JSON.stringify(embedding)}, ${summary}, ${JSON.stringify({
-            contentLength: content.length,
-            indexedAt: new Date().toISOString()
-          })}::jsonb) 
-          ON CONFLICT (contract_id) 
-          DO UPDATE SET 
-            embedding = EXCLUDED.embedding,
-            content_summary = EXCLUDED.content_summary,
-            metadata = EXCLUDED.metadata,
-            updated_at = NOW()
-        `;
-        
-        processed++;
-        
-        // Progress indicator
-        if (processed % 10 === 0) {
-          console.log(`✅ Processed ${processed}/${contracts.length} contracts`);
+        batch.push({ contract, content });
+      }
+      if (batch.length === 0) continue;
+      
+      // Generate embeddings for the whole page in one call
+      const embeddings = await AIService.generateEmbeddings(batch.map(item => item.content));
+      
+      for (let j = 0; j < batch.length; j++) {
+        const { contract, content } = batch[j];
+        try {
+          const embedding = embeddings[j];
+          
+          // Generate summary
+          const summary = await AIService.summarizeDocument(content);
+          
+          // Store in contract_embeddings table using Prisma
+          await prisma.$executeRaw`
+            INSERT INTO contract_embeddings (contract_id, embedding, content_summary, metadata)
+            VALUES (${contract.id}, ${JSON.stringify(embedding)}, ${summary}, ${JSON.stringify({
+              contentLength: content.length,
+              indexedAt: new Date().toISOString()
+            })}::jsonb) 
+            ON CONFLICT (contract_id) 
+            DO UPDATE SET 
+              embedding = EXCLUDED.embedding,
+              content_summary = EXCLUDED.content_summary,
+              metadata = EXCLUDED.metadata,
+              updated_at = NOW()
+          `;
+          
+          processed++;
+          
+          // Progress indicator
+          if (processed % 10 === 0) {
+            console.log(`✅ Processed ${processed}/${total} contracts`);
+          }
+          
+        } catch (error) {
+          console.error(`❌ Failed to process contract ${contract.id}:`, error.message);
+          failed++;
         }
-        
-      } catch (error) {
-        console.error(`❌ Failed to process contract ${contract.id}:`, error.message);
-        failed++;
       }
     }
     
@@ -0,0 +1,5 @@
+-- CreateIndex
+CREATE INDEX "document_processing_queue_status_queued_at_idx" ON "document_processing_queue"("status", "queued_at");
+
+-- CreateIndex
+CREATE INDEX "document_processing_queue_status_completed_at_idx" ON "document_processing_queue"("status", "completed_at");
@@ -0,0 +1,27 @@
+-- AlterTable
+ALTER TABLE "document_processing_queue" ADD COLUMN "metadata" TEXT;
+
+-- Files extracted from a ZIP used to share the archive's URL; key them as <zip url>#<member name>
+-- like new rows, so de-duplication below doesn't collapse an archive into a single member
+UPDATE "document_processing_queue"
+SET "document_url" = "document_url" || '#' || "filename"
+WHERE "description" LIKE 'Extracted from ZIP:%'
+  AND "filename" IS NOT NULL
+  AND POSITION('#' IN "document_url") = 0;
+
+-- Remove duplicate (contract, URL) entries so the unique index can be built,
+-- keeping a completed row if there is one, otherwise the oldest
+DELETE FROM "document_processing_queue"
+WHERE "id" IN (
+  SELECT "id" FROM (
+    SELECT "id", ROW_NUMBER() OVER (
+      PARTITION BY "contract_notice_id", "document_url"
+      ORDER BY ("status" = 'completed') DESC, "id"
+    ) AS "rank"
+    FROM "document_processing_queue"
+  ) AS "ranked"
+  WHERE "ranked"."rank" > 1
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "document_processing_queue_contract_notice_id_document_url_key" ON "document_processing_queue"("contract_notice_id", "document_url");
@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "document_processing_queue_status_local_file_path_idx" ON "document_processing_queue"("status", "local_file_path");
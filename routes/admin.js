@@ -1,7 +1,7 @@
 const express = require('express');
 const { resetDatabases } = require('../scripts/reset-databases');
 const { prisma } = require('../config/database');
-const vectorService = require('../services/vectorService');
+const vectorService = require('../services/vectorService').getSharedInstance();
 
 const router = express.Router();
 
@@ -31,12 +31,13 @@ router.post('/reset-databases', async (req, res) => {
 // Get database statistics
 router.get('/database-stats', async (req, res) => {
   try {
-    const contractCount = await prisma.contract.count();
-    const jobCount = await prisma.indexingJob.count();
-    const queueCount = await prisma.documentProcessingQueue.count();
-    const analysisCount = await prisma.documentAnalysis.count();
-    
-    const vectorStats = await vectorService.getCollectionStats();
+    const [contractCount, jobCount, queueCount, analysisCount, vectorStats] = await Promise.all([
+      prisma.contract.count(),
+      prisma.indexingJob.count(),
+      prisma.documentProcessingQueue.count(),
+      prisma.documentAnalysis.count(),
+      vectorService.getCollectionStats()
+    ]);
     
     res.json({
       success: true,
@@ -4,9 +4,7 @@ const winProbabilityPredictor = require('../services/mlWinProbability');
 const contractSimilarity = require('../services/contractSimilarity');
 const aiOpportunityAlerts = require('../services/aiOpportunityAlerts');
 const bidStrategyOptimizer = require('../services/bidStrategyOptimizer');
-const { PrismaClient } = require('@prisma/client');
-
-const prisma = new PrismaClient();
+const { prisma } = require('../config/database');
 
 // Win Probability Prediction Endpoint
 router.post('/win-probability', async (req, res) => {
@@ -2,12 +2,10 @@ const express = require('express');
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs-extra');
-const pdfParse = require('pdf-parse');
-const mammoth = require('mammoth');
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const { prisma } = require('../config/database');
 const config = require('../config/env');
 const aiService = require('../services/aiService');
+const textExtractor = require('../utils/textExtractor');
 const ProposalDraftingService = require('../services/proposalDraftingService');
 
 const proposalService = new ProposalDraftingService();
@@ -73,11 +71,8 @@ initializeAIRFPTables();
 
 // Configure multer for file uploads
 const storage = multer.diskStorage({
-  destination: function (req, file, cb) {
-    const uploadDir = path.join(__dirname, '../uploads/rfp-documents');
-    fs.ensureDirSync(uploadDir);
-    cb(null, uploadDir);
-  },
+  // A string destination is created once when the storage is built, not on every upload
+  destination: path.join(__dirname, '../uploads/rfp-documents'),
   filename: function (req, file, cb) {
     const uniqueSuffix = Date.now() + '-' + Math.round(Math.random() * 1E9);
     cb(null, file.fieldname + '-' + uniqueSuffix + path.extname(file.originalname));
@@ -191,19 +186,7 @@ router.post('/upload', upload.single('rfpDocument'), async (req, res) => {
     const fileExtension = path.extname(originalFilename).toLowerCase();
 
     try {
-      if (fileExtension === '.pdf') {
-        const dataBuffer = fs.readFileSync(filePath);
-        const pdfData = await pdfParse(dataBuffer);
-        extractedText = pdfData.text;
-      } else if (fileExtension === '.docx') {
-        const result = await mammoth.extractRawText({ path: filePath });
-        extractedText = result.value;
-      } else if (fileExtension === '.doc') {
-        const result = await mammoth.extractRawText({ path: filePath });
-        extractedText = result.value;
-      } else if (fileExtension === '.txt') {
-        extractedText = fs.readFileSync(filePath, 'utf8');
-      }
+      extractedText = await textExtractor.extractTextFromFile(filePath, fileExtension);
     } catch (parseError) {
       console.error('Document parsing error:', parseError);
       return res.status(400).json({ 
@@ -1,7 +1,7 @@
 const express = require('express');
 const { query } = require('../config/database');
 const aiService = require('../services/aiService');
-const { logger } = require('../utils/logger');
+const logger = require('../utils/logger');
 
 const router = express.Router();
 
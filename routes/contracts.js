@@ -1,8 +1,7 @@
 const express = require('express');
-const axios = require('axios');
-const { query } = require('../config/database');
-const VectorService = require('../services/vectorService');
-const config = require('../config/env');
+const { query, withBulkSession } = require('../config/database');
+const vectorService = require('../services/vectorService').getSharedInstance();
+const { fetchContractPage } = require('../services/samGovService');
 
 const router = express.Router();
 
@@ -110,9 +109,6 @@ router.get('/:noticeId', async (req, res) => {
   try {
     const { noticeId } = req.params;
     
-    // Get the vector service from the global instance
-    const vectorService = require('../server').vectorService;
-    
     if (!vectorService || !vectorService.isConnected) {
       return res.status(503).json({
         success: false,
@@ -141,12 +137,75 @@ router.get('/:noticeId', async (req, res) => {
   }
 });
 
-// Helper function to format dates for SAM.gov API (MM/dd/yyyy format)
-function formatDateForSAM(date) {
-  const month = String(date.getMonth() + 1).padStart(2, '0');
-  const day = String(date.getDate()).padStart(2, '0');
-  const year = date.getFullYear();
-  return `${month}/${day}/${year}`;
+const CONTRACT_UPSERT_COLUMNS = [
+  'notice_id', 'title', 'description', 'agency', 'naics_code',
+  'classification_code', 'posted_date', 'set_aside_code', 'resource_links'
+];
+const CONTRACT_UPSERT_BATCH_SIZE = 500; // 9 params per row, well under Postgres' 65535 limit
+
+const contractUpsertValues = (contract) => [
+  contract.noticeId,
+  contract.title,
+  contract.description,
+  contract.agency,
+  contract.naicsCode,
+  contract.classificationCode,
+  contract.postedDate,
+  contract.setAsideCode,
+  JSON.stringify(contract.resourceLinks)
+];
+
+const contractUpsertSql = (rowCount) => {
+  const width = CONTRACT_UPSERT_COLUMNS.length;
+  const rows = Array.from({ length: rowCount }, (_, row) =>
+    `(${CONTRACT_UPSERT_COLUMNS.map((_, col) => `$${row * width + col + 1}`).join(', ')})`
+  );
+  return `
+    INSERT INTO contracts (${CONTRACT_UPSERT_COLUMNS.join(', ')})
+    VALUES ${rows.join(',\n           ')}
+    ON CONFLICT (notice_id) 
+    DO UPDATE SET 
+      title = EXCLUDED.title,
+      description = EXCLUDED.description,
+      agency = EXCLUDED.agency,
+      naics_code = EXCLUDED.naics_code,
+      classification_code = EXCLUDED.classification_code,
+      posted_date = EXCLUDED.posted_date,
+      set_aside_code = EXCLUDED.set_aside_code,
+      resource_links = EXCLUDED.resource_links,
+      updated_at = NOW()
+  `;
+};
+
+// Upsert contracts (unique noticeIds) in multi-row batches. A batch that fails is
+// retried row by row so one bad record doesn't count the whole page as errors.
+async function upsertContracts(contracts) {
+  let upserted = 0;
+  let failed = 0;
+
+  // One connection for the whole page, with async commit when bulk mode is enabled
+  await withBulkSession(async (bulkQuery) => {
+    for (let i = 0; i < contracts.length; i += CONTRACT_UPSERT_BATCH_SIZE) {
+      const batch = contracts.slice(i, i + CONTRACT_UPSERT_BATCH_SIZE);
+      try {
+        await bulkQuery(contractUpsertSql(batch.length), batch.flatMap(contractUpsertValues));
+        upserted += batch.length;
+      } catch (batchError) {
+        console.warn(`⚠️ [DEBUG] Batch upsert of ${batch.length} contracts failed, retrying individually: ${batchError.message}`);
+        for (const contract of batch) {
+          try {
+            await bulkQuery(contractUpsertSql(1), contractUpsertValues(contract));
+            upserted++;
+          } catch (error) {
+            console.error('Error processing contract:', error);
+            failed++;
+          }
+        }
+      }
+    }
+  });
+
+  return { upserted, failed };
 }
 
 // Fetch contracts from SAM.gov API
@@ -191,72 +250,15 @@ router.post('/fetch', async (req, res) => {
 
     try {
       // Fetch contracts from SAM.gov
-      const samGovUrl = `https://api.sam.gov/opportunities/v2/search`;
-      const params = new URLSearchParams({
-        api_key: config.samGovApiKey,
-        limit: Math.min(limit, 1000),
+      const { contracts: contractRows, totalRecords } = await fetchContractPage({
+        limit,
         offset,
-        postedFrom: startDate ? formatDateForSAM(startDate) : undefined,
-        postedTo: endDate ? formatDateForSAM(endDate) : undefined
+        postedFrom: startDate,
+        postedTo: endDate
       });
 
-      const response = await axios.get(`${samGovUrl}?${params}`);
-      const contractsData = response.data.opportunitiesData || [];
-      
-      let processedCount = 0;
-      let errorsCount = 0;
-
-      for (const contractData of contractsData) {
-        try {
-          const contractDetails = {
-            noticeId: contractData.noticeId,
-            title: contractData.title,
-            description: contractData.description,
-            agency: contractData.fullParentPathName,
-            naicsCode: contractData.naicsCode,
-            classificationCode: contractData.classificationCode,
-            postedDate: contractData.postedDate ? new Date(contractData.postedDate) : null,
-            setAsideCode: contractData.typeOfSetAsideCode,
-            resourceLinks: contractData.resourceLinks || []
-          };
-          
-          if (!contractDetails.noticeId) continue;
-
-          // Upsert contract using raw SQL
-          await query(`
-            INSERT INTO contracts (
-              notice_id, title, description, agency, naics_code, 
-              classification_code, posted_date, set_aside_code, resource_links
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-            ON CONFLICT (notice_id) 
-            DO UPDATE SET 
-              title = EXCLUDED.title,
-              description = EXCLUDED.description,
-              agency = EXCLUDED.agency,
-              naics_code = EXCLUDED.naics_code,
-              classification_code = EXCLUDED.classification_code,
-              posted_date = EXCLUDED.posted_date,
-              set_aside_code = EXCLUDED.set_aside_code,
-              resource_links = EXCLUDED.resource_links,
-              updated_at = NOW()
-          `, [
-            contractDetails.noticeId,
-            contractDetails.title,
-            contractDetails.description,
-            contractDetails.agency,
-            contractDetails.naicsCode,
-            contractDetails.classificationCode,
-            contractDetails.postedDate,
-            contractDetails.setAsideCode,
-            JSON.stringify(contractDetails.resourceLinks)
-          ]);
-
-          processedCount++;
-        } catch (error) {
-          console.error('Error processing contract:', error);
-          errorsCount++;
-        }
-      }
+      // Upsert the whole page in multi-row statements instead of one round trip per contract
+      const { upserted: processedCount, failed: errorsCount } = await upsertContracts(contractRows);
 
       // Update job status
       await query(`
@@ -270,7 +272,7 @@ router.post('/fetch', async (req, res) => {
         job_id: job.id,
         contracts_processed: processedCount,
         errors: errorsCount,
-        total_available: response.data.totalRecords || 0
+        total_available: totalRecords
       });
 
     } catch (error) {
@@ -326,30 +328,33 @@ router.post('/index', async (req, res) => {
     let errorsCount = 0;
 
     try {
-      for (const contract of contracts) {
-        try {
-          // Index contract in vector database
-          await vectorService.indexContract(contract);
-          
-          // Mark as indexed
-          await query(`
-            UPDATE contracts 
-            SET indexed_at = NOW() 
-            WHERE id = $1
-          `, [contract.id]);
-          
-          indexedCount++;
-          
-          // Commit changes periodically
-          if (indexedCount % 10 === 0) {
-            console.log(`Indexed ${indexedCount} contracts so far...`);
-          }
-        } catch (error) {
-          console.error(`Error indexing contract ${contract.notice_id}:`, error);
-          errorsCount++;
-        }
+
+      // Rows come back snake_case; embed them in batches rather than one model call each
+      const indexedIds = await vectorService.indexContracts(contracts.map(contract => ({
+        noticeId: contract.notice_id,
+        title: contract.title,
+        description: contract.description,
+        agency: contract.agency,
+        naicsCode: contract.naics_code,
+        postedDate: contract.posted_date,
+        setAsideCode: contract.set_aside_code
+      })));
+
+      // Mark everything that made it into the index with a single UPDATE
+      const indexedRowIds = contracts
+        .filter(contract => indexedIds.has(contract.notice_id))
+        .map(contract => contract.id);
+      if (indexedRowIds.length > 0) {
+        await query(`
+          UPDATE contracts 
+          SET indexed_at = NOW() 
+          WHERE id = ANY($1)
+        `, [indexedRowIds]);
       }
 
+      indexedCount = indexedRowIds.length;
+      errorsCount = contracts.length - indexedCount;
+
       // Update job status
       await query(`
         UPDATE indexing_jobs 
@@ -2,21 +2,17 @@ const express = require('express');
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs-extra');
-const pdfParse = require('pdf-parse');
-const mammoth = require('mammoth');
 const { query } = require('../config/database');
 const aiService = require('../services/aiService');
-const { logger } = require('../utils/logger');
+const logger = require('../utils/logger');
+const textExtractor = require('../utils/textExtractor');
 
 const router = express.Router();
 
 // Configure multer for document uploads
 const storage = multer.diskStorage({
-  destination: function (req, file, cb) {
-    const uploadDir = path.join(__dirname, '../uploads/documents');
-    fs.ensureDirSync(uploadDir);
-    cb(null, uploadDir);
-  },
+  // A string destination is created once when the storage is built, not on every upload
+  destination: path.join(__dirname, '../uploads/documents'),
   filename: function (req, file, cb) {
     const uniqueSuffix = Date.now() + '-' + Math.round(Math.random() * 1E9);
     cb(null, file.fieldname + '-' + uniqueSuffix + path.extname(file.originalname));
@@ -49,26 +45,14 @@ router.post('/analyze', upload.single('document'), async (req, res) => {
     const filePath = req.file.path;
     const originalFilename = req.file.originalname;
 
-    logger.info(`Analyzing document: ${originalFilename} for user ${req.user.id}`);
+    logger.info('Analyzing document: %s for user %s', originalFilename, req.user.id);
 
     // Extract text from document
     let extractedText = '';
     const fileExtension = path.extname(originalFilename).toLowerCase();
 
     try {
-      if (fileExtension === '.pdf') {
-        const dataBuffer = fs.readFileSync(filePath);
-        const pdfData = await pdfParse(dataBuffer);
-        extractedText = pdfData.text;
-      } else if (fileExtension === '.docx') {
-        const result = await mammoth.extractRawText({ path: filePath });
-        extractedText = result.value;
-      } else if (fileExtension === '.doc') {
-        const result = await mammoth.extractRawText({ path: filePath });
-        extractedText = result.value;
-      } else if (fileExtension === '.txt') {
-        extractedText = fs.readFileSync(filePath, 'utf8');
-      }
+      extractedText = await textExtractor.extractTextFromFile(filePath, fileExtension);
     } catch (parseError) {
       logger.error('Document parsing error:', parseError);
       return res.status(400).json({ error: 'Failed to parse document content' });
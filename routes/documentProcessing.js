@@ -1,14 +1,12 @@
 const express = require('express');
 const { prisma } = require('../config/database');
-const vectorService = require('../services/vectorService');
-const { summarizeContent } = require('../services/summarizationService');
-const config = require('../config/env');
-const axios = require('axios');
+const { QUEUE_WORK_ITEM_SELECT } = require('../services/documentQueueService');
+const {
+  processTestDocumentsSequentially,
+  processDocumentsInParallel
+} = require('../services/documentProcessorService');
 const fs = require('fs-extra');
 const path = require('path');
-const documentAnalyzer = require('../utils/documentAnalyzer');
-const LibreOfficeService = require('../services/libreoffice.service');
-const libreOfficeService = new LibreOfficeService();
 
 const router = express.Router();
 
@@ -173,6 +171,7 @@ router.post('/', async (req, res) => {
           status: 'queued',
           filename: { startsWith: 'TEST_' }
         },
+        select: QUEUE_WORK_ITEM_SELECT,
         orderBy: { queuedAt: 'asc' }
       }), job.id);
 
@@ -306,6 +305,7 @@ router.post('/', async (req, res) => {
     const queuedDocs = await prisma.documentProcessingQueue.findMany({
       where: { status: 'queued' },
       take: limit,
+      select: QUEUE_WORK_ITEM_SELECT,
       orderBy: { queuedAt: 'asc' }
     });
 
@@ -354,532 +354,5 @@ router.post('/', async (req, res) => {
   }
 });
 
-// Helper function to process test documents with higher concurrency
-async function processTestDocumentsSequentially(documents, jobId) {
-  console.log(`🧪 [DEBUG] Processing ${documents.length} TEST documents with CONCURRENCY=20 (cost-effective mode)`);
-  
-  let processedCount = 0;
-  let successCount = 0;
-  let errorCount = 0;
-  let skippedCount = 0;
-
-  // Process documents with concurrency of 20 instead of sequentially
-  const concurrency = Math.min(20, documents.length);
-  console.log(`🧪 [DEBUG] Using concurrency: ${concurrency}`);
-
-  // Process single document
-  const processDocument = async (doc) => {
-    try {
-      console.log(`🧪 [DEBUG] Processing TEST document: ${doc.filename}`);
-      
-      // Update status to processing
-      try {
-        await prisma.documentProcessingQueue.update({
-          where: { id: doc.id },
-          data: { 
-            status: 'processing',
-            startedAt: new Date()
-          }
-        });
-      } catch (updateError) {
-        if (updateError.code === 'P2025') {
-          console.log(`⚠️ [DEBUG] Test document record ${doc.id} no longer exists, skipping`);
-          return { success: false, filename: doc.filename, error: 'Record not found' };
-        }
-        throw updateError;
-      }
-
-      const documentId = `${doc.contractNoticeId}_${doc.filename}`;
-      
-      // Check if document is already indexed in vector database
-      const existingDocs = await vectorService.searchDocuments(documentId, 1);
-      
-      if (existingDocs.length > 0 && existingDocs[0].metadata.id === documentId) {
-        console.log(`🧪 [DEBUG] Test document already indexed, using cached: ${documentId}`);
-        
-        try {
-          await prisma.documentProcessingQueue.update({
-            where: { id: doc.id },
-            data: {
-              status: 'completed',
-              processedData: JSON.stringify({ 
-                cached: true, 
-                content: existingDocs[0].document,
-                source: 'vector_database',
-                testMode: true
-              }),
-              completedAt: new Date()
-            }
-          });
-        } catch (updateError) {
-          if (updateError.code === 'P2025') {
-            console.log(`⚠️ [DEBUG] Test document record ${doc.id} was deleted`);
-            return { success: false, filename: doc.filename, error: 'Record deleted during caching' };
-          }
-          throw updateError;
-        }
-
-        skippedCount++;
-        console.log(`🧪 [DEBUG] ✅ Test document cached successfully: ${doc.filename}`);
-        return { success: true, filename: doc.filename, cached: true };
-      } else {
-        // Process document via summarization service
-        console.log(`🧪 [DEBUG] 💰 COST ALERT: Sending test document to summarization service`);
-        
-        // First, try to find the downloaded file in the downloaded_documents folder
-        const downloadPath = path.join(process.cwd(), 'downloaded_documents');
-        let localFilePath = null;
-        
-        try {
-          const downloadedFiles = await fs.readdir(downloadPath);
-          // Look for files that match this contract ID
-          const matchingFile = downloadedFiles.find(file => 
-            file.includes(doc.contractNoticeId) && 
-            (file.toLowerCase().endsWith('.pdf') || 
-             file.toLowerCase().endsWith('.doc') || 
-             file.toLowerCase().endsWith('.docx') ||
-             file.toLowerCase().endsWith('.xls') ||
-             file.toLowerCase().endsWith('.xlsx') ||
-             file.toLowerCase().endsWith('.ppt') ||
-             file.toLowerCase().endsWith('.pptx'))
-          );
-          
-          if (matchingFile) {
-            localFilePath = path.join(downloadPath, matchingFile);
-            console.log(`🧪 [DEBUG] ✅ Found downloaded file: ${matchingFile}`);
-          }
-        } catch (error) {
-          console.log(`🧪 [DEBUG] ⚠️ Could not check downloaded files: ${error.message}`);
-        }
-        
-        // Use local file if found, otherwise use the stored localFilePath, otherwise use URL
-        let filePathToProcess;
-        
-        if (localFilePath && await fs.pathExists(localFilePath)) {
-          filePathToProcess = localFilePath;
-          console.log(`🧪 [DEBUG] ✅ Using found local file: ${localFilePath}`);
-        } else if (doc.localFilePath && await fs.pathExists(doc.localFilePath)) {
-          filePathToProcess = doc.localFilePath;
-          console.log(`🧪 [DEBUG] ✅ Using stored local file path: ${doc.localFilePath}`);
-        } else {
-          filePathToProcess = doc.documentUrl;
-          console.log(`🧪 [DEBUG] ⚠️ No local file found, will download from URL: ${doc.documentUrl}`);
-        }
-        
-        console.log(`🧪 [DEBUG] Processing file: ${filePathToProcess}`);
-        
-        const result = await summarizeContent(
-          filePathToProcess,
-          doc.filename || 'test_document',
-          '',
-          'openai/gpt-4.1'
-        );
-
-        if (result) {
-          const finalFilename = result.correctedFilename || doc.filename;
-          
-          // Check if record still exists
-          const existingRecord = await prisma.documentProcessingQueue.findUnique({
-            where: { id: doc.id }
-          });
-
-          if (!existingRecord) {
-            console.log(`⚠️ [DEBUG] Test document record ${doc.id} no longer exists`);
-            return { success: false, filename: doc.filename, error: 'Record not found' };
-          }
-
-          // Update filename if changed
-          if (finalFilename !== doc.filename) {
-            console.log(`🧪 [DEBUG] Updating test filename from ${doc.filename} to ${finalFilename}`);
-            try {
-              await prisma.documentProcessingQueue.update({
-                where: { id: doc.id },
-                data: { filename: finalFilename }
-              });
-            } catch (updateError) {
-              console.log(`⚠️ [DEBUG] Failed to update test filename: ${updateError.message}`);
-            }
-          }
-
-          // Index the processed document
-          await vectorService.indexDocument({
-            filename: finalFilename,
-            content: result.content || result.text || JSON.stringify(result),
-            processedData: { ...result, testMode: true }
-          }, doc.contractNoticeId);
-
-          // Update status to completed
-          try {
-            await prisma.documentProcessingQueue.update({
-              where: { id: doc.id },
-              data: {
-                status: 'completed',
-                processedData: JSON.stringify({ ...result, testMode: true }),
-                completedAt: new Date()
-              }
-            });
-          } catch (updateError) {
-            if (updateError.code === 'P2025') {
-              console.log(`⚠️ [DEBUG] Test document record ${doc.id} was deleted during processing`);
-              return { success: false, filename: doc.filename, error: 'Record deleted during processing' };
-            }
-            throw updateError;
-          }
-
-          successCount++;
-          console.log(`🧪 [DEBUG] ✅ Test document processed successfully: ${doc.filename}`);
-          return { success: true, filename: finalFilename, cached: false };
-        } else {
-          throw new Error('No result from summarization service');
-        }
-      }
-
-    } catch (error) {
-      console.error(`🧪 [DEBUG] ❌ Error processing test document ${doc.filename}:`, error.message);
-      
-      // Update status to failed
-      try {
-        await prisma.documentProcessingQueue.update({
-          where: { id: doc.id },
-          data: {
-            status: 'failed',
-            errorMessage: error.message,
-            failedAt: new Date()
-          }
-        });
-      } catch (updateError) {
-        if (updateError.code === 'P2025') {
-          console.log(`⚠️ [DEBUG] Test document record ${doc.id} was deleted`);
-        }
-      }
-
-      errorCount++;
-      return { success: false, filename: doc.filename, error: error.message };
-    } finally {
-      processedCount++;
-    }
-  };
-
-  // Process documents in batches with concurrency
-  const batchSize = concurrency;
-  const batches = [];
-  
-  for (let i = 0; i < documents.length; i += batchSize) {
-    batches.push(documents.slice(i, i + batchSize));
-  }
-
-  console.log(`🧪 [DEBUG] Processing ${documents.length} documents in ${batches.length} batches of ${batchSize}`);
-
-  // Process each batch in parallel
-  for (let batchIndex = 0; batchIndex < batches.length; batchIndex++) {
-    const batch = batches[batchIndex];
-    console.log(`🧪 [DEBUG] Processing batch ${batchIndex + 1}/${batches.length} with ${batch.length} documents`);
-    
-    const batchPromises = batch.map(doc => processDocument(doc));
-    const batchResults = await Promise.allSettled(batchPromises);
-    
-    // Process batch results
-    batchResults.forEach((result, index) => {
-      if (result.status === 'fulfilled') {
-        const value = result.value;
-        if (value?.success) {
-          if (value.cached) {
-            skippedCount++;
-          } else {
-            successCount++;
-          }
-        } else {
-          errorCount++;
-        }
-      } else {
-        console.error(`🧪 [DEBUG] Batch ${batchIndex + 1} document ${index + 1} rejected:`, result.reason);
-        errorCount++;
-      }
-    });
-    
-    console.log(`🧪 [DEBUG] Batch ${batchIndex + 1} completed - Progress: ${processedCount}/${documents.length} - Success: ${successCount}, Errors: ${errorCount}, Skipped: ${skippedCount}`);
-    
-    // Small delay between batches
-    if (batchIndex < batches.length - 1) {
-      console.log(`🧪 [DEBUG] Waiting 1 second before next batch...`);
-      await new Promise(resolve => setTimeout(resolve, 1000));
-    }
-  }
-
-  // Update job status
-  try {
-    await prisma.indexingJob.update({
-      where: { id: jobId },
-      data: {
-        status: 'completed',
-        recordsProcessed: successCount,
-        errorsCount: errorCount,
-        completedAt: new Date()
-      }
-    });
-
-    console.log(`🧪 [DEBUG] ========================================`);
-    console.log(`🧪 [DEBUG] TEST BED PROCESSING COMPLETED!`);
-    console.log(`🧪 [DEBUG] ========================================`);
-    console.log(`🧪 [DEBUG] 📊 Total processed: ${processedCount}`);
-    console.log(`🧪 [DEBUG] ✅ Success: ${successCount}`);
-    console.log(`🧪 [DEBUG] ❌ Errors: ${errorCount}`);
-    console.log(`🧪 [DEBUG] ⏭️  Skipped: ${skippedCount}`);
-    console.log(`🧪 [DEBUG] 💰 Cost impact: MINIMAL (only ${successCount} API calls)`);
-    console.log(`🧪 [DEBUG] ========================================`);
-  } catch (updateError) {
-    console.error('🧪 [DEBUG] Error updating test job status:', updateError);
-  }
-}
-
-// Optimized parallel document processing with proper concurrency
-async function processDocumentsInParallel(documents, concurrency, jobId) {
-  console.log(`🚀 [OPTIMIZED] Starting parallel processing: ${documents.length} documents, concurrency: ${concurrency}`);
-  
-  let successCount = 0;
-  let errorCount = 0;
-  let processedCount = 0;
-
-  // Process single document with full pipeline parallelization
-  const processDocument = async (doc) => {
-    const startTime = Date.now();
-    
-    try {
-      // Quick status update
-      await prisma.documentProcessingQueue.update({
-        where: { id: doc.id },
-        data: { status: 'processing', startedAt: new Date() }
-      });
-
-      // Use the exact file path from the queue entry
-      let filePath = doc.localFilePath;
-      console.log(`📁 [DEBUG] Processing queue entry ${doc.id}: ${doc.filename}`);
-      console.log(`📁 [DEBUG] Expected file path: ${filePath}`);
-      
-      // Verify the file exists at the specified path
-      if (!filePath || !await fs.pathExists(filePath)) {
-        console.error(`❌ [DEBUG] File not found at expected path: ${filePath}`);
-        console.log(`🔍 [DEBUG] Searching for file in download directory...`);
-        
-        const downloadPath = path.join(process.cwd(), 'downloaded_documents');
-        const files = await fs.readdir(downloadPath).catch(() => []);
-        
-        // Look for exact filename match first
-        let matchingFile = files.find(file => file === doc.filename);
-        
-        if (!matchingFile) {
-          // Fallback to partial match
-          matchingFile = files.find(file => 
-            file.includes(doc.contractNoticeId) && 
-            (file.toLowerCase().endsWith('.pdf') || file.toLowerCase().endsWith('.docx'))
-          );
-        }
-        
-        if (matchingFile) {
-          filePath = path.join(downloadPath, matchingFile);
-          console.log(`✅ [DEBUG] Found file: ${matchingFile} at ${filePath}`);
-        } else {
-          console.error(`❌ [DEBUG] No matching file found for ${doc.filename}`);
-        }
-      } else {
-        console.log(`✅ [DEBUG] File verified at: ${filePath}`);
-      }
-      
-      if (!filePath) {
-        throw new Error('No file found');
-      }
-      
-      // PARALLEL PIPELINE: Start all operations simultaneously
-      const timeoutPromise = new Promise((_, reject) => {
-        setTimeout(() => reject(new Error('Timeout (3min)')), 180000);
-      });
-      
-      const processingPromise = (async () => {
-        // Step 1: Check if conversion needed and start it immediately
-        const fileExt = path.extname(filePath).toLowerCase();
-        let conversionPromise = Promise.resolve(filePath); // Default to original file
-        
-        if (fileExt !== '.pdf') {
-          console.log(`🔄 Starting PDF conversion in parallel: ${doc.filename}`);
-          conversionPromise = (async () => {
-            const LibreOfficeService = require('../services/libreoffice.service');
-            const libreOfficeService = new LibreOfficeService();
-            
-            const tempDir = path.join(process.cwd(), 'temp_parallel_conversion', `${Date.now()}_${doc.id}`);
-            await fs.ensureDir(tempDir);
-            
-            try {
-              await libreOfficeService.convertToPdfWithRetry(filePath, tempDir);
-              const files = await fs.readdir(tempDir);
-              const pdfFile = files.find(file => file.toLowerCase().endsWith('.pdf'));
-              
-              if (pdfFile) {
-                return path.join(tempDir, pdfFile);
-              } else {
-                throw new Error('No PDF file found after conversion');
-              }
-            } catch (error) {
-              await fs.remove(tempDir).catch(() => {});
-              throw new Error(`PDF conversion failed: ${error.message}`);
-            }
-          })();
-        }
-        
-        // Step 2: Wait for conversion to complete, then start extraction and summarization in parallel
-        const pdfPath = await conversionPromise;
-        console.log(`📄 PDF ready, starting parallel extraction and analysis: ${doc.filename}`);
-        
-        // Start extraction immediately
-        const extractionPromise = (async () => {
-          const pdfService = require('../services/summaryService.js');
-          const result = await pdfService.processPDF(pdfPath, {
-            apiKey: process.env.REACT_APP_OPENROUTER_KEY,
-            saveExtracted: false,
-            outputDir: null
-          });
-          return result;
-        })();
-        
-        // Wait for extraction, then start summarization
-        const extractResult = await extractionPromise;
-        
-        if (!extractResult.success) {
-          throw new Error(`PDF extraction failed: ${extractResult.error}`);
-        }
-        
-        console.log(`✅ Extraction completed, starting summarization: ${doc.filename}`);
-        
-        // Start summarization
-        const summaryPromise = (async () => {
-          const pdfService = require('../services/summaryService.js');
-          return await pdfService.summarizeContent(
-            extractResult.extractedContent,
-            process.env.REACT_APP_OPENROUTER_KEY
-          );
-        })();
-        
-        // Wait for summarization
-        const summaryResult = await summaryPromise;
-        
-        if (!summaryResult.success) {
-          throw new Error(`Summarization failed: ${summaryResult.error}`);
-        }
-        
-        // Clean up temp conversion files
-        if (fileExt !== '.pdf' && pdfPath.includes('temp_parallel_conversion')) {
-          try {
-            const tempDir = path.dirname(pdfPath);
-            await fs.remove(tempDir);
-          } catch (cleanupError) {
-            // Ignore cleanup errors
-          }
-        }
-        
-        const result = summaryResult.result;
-        
-        // Step 3: Start final operations in parallel
-        await Promise.all([
-          // Index in vector database
-          vectorService.indexDocument({
-            filename: doc.filename,
-            content: result.content || result.text || JSON.stringify(result),
-            processedData: result
-          }, doc.contractNoticeId),
-          
-          // Update database status
-          prisma.documentProcessingQueue.update({
-            where: { id: doc.id },
-            data: {
-              status: 'completed',
-              processedData: JSON.stringify(result),
-              completedAt: new Date()
-            }
-          })
-        ]);
-        
-        return result;
-      })();
-      
-      await Promise.race([processingPromise, timeoutPromise]);
-      
-      successCount++;
-      const duration = ((Date.now() - startTime) / 1000).toFixed(1);
-      console.log(`✅ ${++processedCount}/${documents.length} (${duration}s): ${doc.filename}`);
-      
-      return { success: true, filename: doc.filename };
-
-    } catch (error) {
-      errorCount++;
-      const duration = ((Date.now() - startTime) / 1000).toFixed(1);
-      console.log(`❌ ${++processedCount}/${documents.length} (${duration}s): ${doc.filename} - ${error.message}`);
-      
-      // Quick failure update
-      try {
-        await prisma.documentProcessingQueue.update({
-          where: { id: doc.id },
-          data: {
-            status: 'failed',
-            errorMessage: error.message,
-            failedAt: new Date()
-          }
-        });
-      } catch (updateError) {
-        // Ignore update errors to keep processing fast
-      }
-      
-      return { success: false, filename: doc.filename, error: error.message };
-    }
-  };
-
-  // Process in true parallel batches
-  const batchSize = Math.min(concurrency, 10); // Max 10 concurrent
-  const batches = [];
-  
-  for (let i = 0; i < documents.length; i += batchSize) {
-    batches.push(documents.slice(i, i + batchSize));
-  }
-
-  console.log(`📦 Processing ${documents.length} documents in ${batches.length} batches of ${batchSize}`);
-
-  // Process all batches
-  for (let batchIndex = 0; batchIndex < batches.length; batchIndex++) {
-    const batch = batches[batchIndex];
-    console.log(`🔄 Batch ${batchIndex + 1}/${batches.length}: ${batch.length} documents`);
-    
-    // Process batch in parallel
-    const batchPromises = batch.map(doc => processDocument(doc));
-    await Promise.allSettled(batchPromises);
-    
-    // Brief pause between batches
-    if (batchIndex < batches.length - 1) {
-      await new Promise(resolve => setTimeout(resolve, 500));
-    }
-  }
-
-  // Update job status
-  try {
-    await prisma.indexingJob.update({
-      where: { id: jobId },
-      data: {
-        status: 'completed',
-        recordsProcessed: successCount,
-        errorsCount: errorCount,
-        completedAt: new Date()
-      }
-    });
-
-    console.log(`🎉 COMPLETED: ${successCount} success, ${errorCount} errors, ${documents.length} total`);
-  } catch (updateError) {
-    console.error('❌ Error updating job status:', updateError);
-  }
-  
-  return {
-    success: true,
-    processed: documents.length,
-    successCount,
-    errorCount
-  };
-}
-
 console.log('🔄 [DEBUG] Document processing router module loaded successfully');
 module.exports = router;
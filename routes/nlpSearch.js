@@ -19,7 +19,7 @@ router.post('/natural', async (req, res) => {
       });
     }
 
-    logger.info(`Natural language search: "${query}" by user ${userId}`);
+    logger.info('Natural language search: "%s" by user %s', query, userId);
 
     // Step 1: Parse natural language query
     const parsedQuery = await queryParser.parseNaturalLanguageQuery(query, userContext);
@@ -44,54 +44,62 @@ router.post('/natural', async (req, res) => {
       parsedQuery.intent = { intent: 'DISCOVERY', confidence: 0.5, sub_intent: 'general' };
     }
     
+    const searchText = parsedQuery.parsedCriteria.keywords.join(' ');
+
     // Step 2: Execute vector database search
-    let vectorResults = [];
-    try {
-      const vectorService = require('../server').vectorService;
-      if (vectorService && vectorService.isConnected) {
-        const searchResult = await vectorService.searchContracts(
-          parsedQuery.parsedCriteria.keywords.join(' '), 
-          { limit: 50, threshold: 0.1 }
-        );
-        
-        // Map vector results to contract format
-        vectorResults = searchResult.map(result => ({
-          id: result.id,
-          noticeId: result.id,
-          title: result.title,
-          description: result.description,
-          agency: result.agency,
-          naicsCode: result.naicsCode,
-          classificationCode: null,
-          postedDate: result.postedDate,
-          setAsideCode: result.setAsideCode,
-          resourceLinks: result.resourceLinks || [],
-          indexedAt: new Date(),
-          createdAt: new Date()
-        }));
-      } else {
+    const searchVectors = async () => {
+      try {
+        const vectorService = require('../server').vectorService;
+        if (vectorService && vectorService.isConnected) {
+          const searchResult = await vectorService.searchContracts(
+            searchText, 
+            { limit: 50, threshold: 0.1 }
+          );
+          
+          // Map vector results to contract format; one timestamp for the whole page
+          const now = new Date();
+          return searchResult.map(result => ({
+            id: result.id,
+            noticeId: result.id,
+            title: result.title,
+            description: result.description,
+            agency: result.agency,
+            naicsCode: result.naicsCode,
+            classificationCode: null,
+            postedDate: result.postedDate,
+            setAsideCode: result.setAsideCode,
+            resourceLinks: result.resourceLinks || [],
+            indexedAt: now,
+            createdAt: now
+          }));
+        }
         logger.warn('Vector service not available, falling back to empty results');
+      } catch (error) {
+        logger.warn('Vector search failed:', error.message);
       }
-    } catch (error) {
-      logger.warn('Vector search failed:', error.message);
-    }
+      return [];
+    };
 
     // Step 3: Semantic search (optional)
-    let semanticResults = [];
-    if (includeSemantic) {
+    const searchSemantic = async () => {
+      if (!includeSemantic) return [];
       try {
         const SemanticSearchService = require('../services/semanticSearchService');
         const semanticSearchService = new SemanticSearchService();
         
-        const searchResult = await semanticSearchService.semanticSearch(parsedQuery.parsedCriteria.keywords.join(' '), {
+        const searchResult = await semanticSearchService.semanticSearch(searchText, {
           limit: 20,
           threshold: 0.6
         });
-        semanticResults = searchResult.results || [];
+        return searchResult.results || [];
       } catch (error) {
         logger.warn('Semantic search failed:', error.message);
+        return [];
       }
-    }
+    };
+
+    // The two searches are independent, so they run concurrently
+    const [vectorResults, semanticResults] = await Promise.all([searchVectors(), searchSemantic()]);
 
     // Step 4: Merge and rank results
     const finalResults = await mergeAndRankResults(vectorResults, semanticResults, parsedQuery);
@@ -2,7 +2,7 @@ const express = require('express');
 const Joi = require('joi');
 const { query } = require('../config/database');
 const aiService = require('../services/aiService');
-const { logger } = require('../utils/logger');
+const logger = require('../utils/logger');
 
 const router = express.Router();
 
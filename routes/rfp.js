@@ -1,6 +1,6 @@
 const express = require('express');
 const { query } = require('../config/database');
-const axios = require('axios');
+const { httpClient } = require('../config/httpClient');
 const puppeteer = require('puppeteer');
 const fs = require('fs');
 const path = require('path');
@@ -61,7 +61,7 @@ Generate a comprehensive, professional response that:
 Do not include any meta-commentary or explanations - provide only the RFP section content.
 `;
 
-    const response = await axios.post(`${OPENROUTER_BASE_URL}/chat/completions`, {
+    const response = await httpClient.post(`${OPENROUTER_BASE_URL}/chat/completions`, {
       model: 'anthropic/claude-3.5-sonnet',
       messages: [
         {
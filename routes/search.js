@@ -208,16 +208,16 @@ router.get('/debug/vector/:query', async (req, res) => {
     const { query } = req.params;
     const { limit = 5 } = req.query;
 
-    logger.info(`Debug vector search for: "${query}"`);
+    logger.info('Debug vector search for: "%s"', query);
 
-    // Get vector service stats first
-    const stats = await semanticSearchService.vectorService.getCollectionStats();
-    
-    // Try direct vector search
-    const vectorResults = await semanticSearchService.vectorService.searchContracts(query, {
-      limit: parseInt(limit),
-      threshold: 0.001 // Very low threshold
-    });
+    // Vector service stats and a direct vector search, run side by side
+    const [stats, vectorResults] = await Promise.all([
+      semanticSearchService.vectorService.getCollectionStats(),
+      semanticSearchService.vectorService.searchContracts(query, {
+        limit: parseInt(limit),
+        threshold: 0.001 // Very low threshold
+      })
+    ]);
 
     res.json({
       query,
@@ -244,7 +244,7 @@ router.post('/', async (req, res) => {
       return res.status(400).json({ error: 'Query parameter is required' });
     }
 
-    logger.info(`Vector search request: "${query}" with limit ${limit}`);
+    logger.info('Vector search request: "%s" with limit %s', query, limit);
 
     // Use vector search exclusively
     const searchResults = await semanticSearchService.semanticSearch(query, {
@@ -254,7 +254,7 @@ router.post('/', async (req, res) => {
       userId: req.user?.id
     });
     
-    logger.info(`Vector search completed: found ${searchResults.results?.length || 0} results`);
+    logger.info('Vector search completed: found %s results', searchResults.results?.length || 0);
 
     const responseTime = (Date.now() - startTime) / 1000;
 
@@ -1,7 +1,7 @@
 const express = require('express');
 const { query } = require('../config/database');
 const aiService = require('../services/aiService');
-const { logger } = require('../utils/logger');
+const logger = require('../utils/logger');
 const { aiRateLimiter } = require('../middleware/rateLimiter');
 
 const router = express.Router();
@@ -18,7 +18,7 @@ router.post('/search', async (req, res) => {
       return res.status(400).json({ error: 'Query text is required' });
     }
 
-    logger.info(`Semantic search query: "${queryText}" by user ${req.user.id}`);
+    logger.info('Semantic search query: "%s" by user %s', queryText, req.user.id);
 
     // Generate embedding for the search query
     const queryEmbedding = await aiService.generateEmbedding(queryText);
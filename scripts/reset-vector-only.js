@@ -1,4 +1,4 @@
-const vectorService = require('../services/vectorService');
+const vectorService = require('../services/vectorService').getSharedInstance();
 const fs = require('fs-extra');
 const path = require('path');
 
@@ -3,18 +3,15 @@ const cors = require('cors');
 const path = require('path');
 const fs = require('fs-extra');
 const multer = require('multer');
+const { finished } = require('stream/promises');
 
 // Import configuration and services
 const config = require('./config/env');
-const { query, testConnection, disconnect } = require('./config/database');
+const { query, prisma, testConnection, disconnect } = require('./config/database');
 const VectorService = require('./services/vectorService');
-const vectorService = new VectorService();
+const vectorService = VectorService.getSharedInstance();
+const { streamFromNorshinAPI, sendBatchToNorshinAPI } = require('./services/norshinService');
 
-// Import Prisma Client
-const { PrismaClient } = require('@prisma/client');
-
-// Initialize Prisma Client
-const prisma = new PrismaClient();
 
 // Debug: Log that we're importing routes
 console.log('📋 [DEBUG] Importing routes...');
@@ -63,14 +60,11 @@ app.use(express.urlencoded({ extended: true, limit: '50mb' }));
 app.use(express.static('public'));
 app.use('/uploads', express.static(config.uploadDir));
 
-// Ensure directories exist
+// Ensure directories exist; a recursive mkdir is already a no-op for existing
+// directories, so there is no separate exists check to race with
 const ensureDirectories = () => {
   const dirs = [config.uploadDir, config.documentsDir, 'public', 'logs'];
-  dirs.forEach(dir => {
-    if (!fs.existsSync(dir)) {
-      fs.mkdirSync(dir, { recursive: true });
-    }
-  });
+  dirs.forEach(dir => fs.mkdirSync(dir, { recursive: true }));
 };
 
 ensureDirectories();
@@ -189,14 +183,14 @@ app.get('/', (req, res) => {
 // API Status endpoint
 app.get('/api/status', async (req, res) => {
   try {
-    // Get database stats
-    const contractsCount = await prisma.contract.count();
-    const indexedContractsCount = await prisma.contract.count({
-      where: { indexedAt: { not: null } }
-    });
-
-    // Get vector database stats
-    const vectorStats = await vectorService.getCollectionStats();
+    // Database and vector database stats are independent; run them concurrently
+    const [contractsCount, indexedContractsCount, vectorStats] = await Promise.all([
+      prisma.contract.count(),
+      prisma.contract.count({
+        where: { indexedAt: { not: null } }
+      }),
+      vectorService.getCollectionStats()
+    ]);
 
     // Count downloaded files in the downloaded_documents folder
     let downloadedFilesCount = 0;
@@ -269,8 +263,8 @@ app.post('/api/upload', upload.single('document'), async (req, res) => {
     
     console.log(`Processing: ${req.file.originalname}`);
     
-    // Send to Norshin API
-    const result = await sendToNorshinAPI(
+    // Send to Norshin API; the response body is streamed rather than parsed
+    const upstream = await streamFromNorshinAPI(
       req.file.path, 
       req.file.originalname, 
       customPrompt, 
@@ -280,17 +274,47 @@ app.post('/api/upload', upload.single('document'), async (req, res) => {
     // Clean up uploaded file
     fs.unlinkSync(req.file.path);
 
-    res.json({
-      success: true,
-      filename: req.file.originalname,
-      result: result
+    if (!String(upstream.headers['content-type'] || '').includes('json')) {
+      // Plain-text result: small, and must be embedded as a JSON string
+      const chunks = [];
+      for await (const chunk of upstream.data) {
+        chunks.push(chunk);
+      }
+      return res.json({
+        success: true,
+        filename: req.file.originalname,
+        result: Buffer.concat(chunks).toString('utf8')
+      });
+    }
+
+    // JSON result (OCR output can be megabytes): splice Norshin's body into our envelope
+    // as it arrives instead of parsing it and serializing it back. The body is passed through
+    // unchecked, so the envelope is only as well-formed as what Norshin sends; an empty body
+    // (204, or a JSON content-type with no content) becomes "result":null
+    res.type('json');
+    res.write(`{"success":true,"filename":${JSON.stringify(req.file.originalname)},"result":`);
+    let hasBody = false;
+    upstream.data.on('data', (chunk) => {
+      if (!hasBody) {
+        hasBody = chunk.some(byte => byte !== 0x20 && byte !== 0x09 && byte !== 0x0a && byte !== 0x0d);
+      }
     });
+    upstream.data.pipe(res, { end: false });
+    await finished(upstream.data);
+    res.end(hasBody ? '}' : 'null}');
 
   } catch (error) {
     // Clean up file on error
     if (req.file && fs.existsSync(req.file.path)) {
       fs.unlinkSync(req.file.path);
     }
+
+    if (res.headersSent) {
+      // Failed mid-stream; the envelope is already partly written
+      console.error('Norshin response stream failed:', error.message);
+      res.destroy(error);
+      return;
+    }
     
     res.status(500).json({
       error: 'Processing failed',
@@ -299,30 +323,73 @@ app.post('/api/upload', upload.single('document'), async (req, res) => {
   }
 });
 
+// Upload and process multiple documents (batched Norshin requests when supported)
+app.post('/api/upload-batch', upload.array('documents', 50), async (req, res) => {
+  const files = req.files || [];
+  try {
+    if (files.length === 0) {
+      return res.status(400).json({ error: 'No document files provided' });
+    }
+
+    const { customPrompt, model } = req.body;
+
+    console.log(`Processing batch of ${files.length} documents`);
+
+    const results = await sendBatchToNorshinAPI(
+      files.map(file => ({ filePath: file.path, originalName: file.originalname })),
+      customPrompt,
+      model
+    );
+
+    res.json({
+      success: true,
+      total: files.length,
+      succeeded: results.filter(r => r.success).length,
+      results: results
+    });
+
+  } catch (error) {
+    res.status(500).json({
+      error: 'Processing failed',
+      details: error.response?.data?.error || error.message
+    });
+  } finally {
+    // Clean up uploaded files
+    files.forEach(file => {
+      if (fs.existsSync(file.path)) {
+        fs.unlinkSync(file.path);
+      }
+    });
+  }
+});
+
 // Get list of static documents
-app.get('/api/documents', (req, res) => {
+app.get('/api/documents', async (req, res) => {
   try {
     const documentsDir = path.join(__dirname, config.documentsDir);
     
-    if (!fs.existsSync(documentsDir)) {
-      return res.json({ documents: [] });
+    // One listing that carries entry types, so only the returned documents are stat'd
+    let entries;
+    try {
+      entries = await fs.readdir(documentsDir, { withFileTypes: true });
+    } catch (error) {
+      if (error.code === 'ENOENT') {
+        return res.json({ documents: [] });
+      }
+      throw error;
     }
 
-    const files = fs.readdirSync(documentsDir)
-      .filter(file => {
-        const ext = path.extname(file).toLowerCase();
-        return config.allowedExtensions.includes(ext);
-      })
-      .map(file => {
-        const filePath = path.join(documentsDir, file);
-        const stats = fs.statSync(filePath);
+    const files = await Promise.all(entries
+      .filter(entry => entry.isFile() && config.allowedExtensions.includes(path.extname(entry.name).toLowerCase()))
+      .map(async (entry) => {
+        const stats = await fs.stat(path.join(documentsDir, entry.name));
         return {
-          name: file,
+          name: entry.name,
           size: stats.size,
           modified: stats.mtime,
-          extension: path.extname(file).toLowerCase()
+          extension: path.extname(entry.name).toLowerCase()
         };
-      });
+      }));
 
     res.json({ documents: files });
   } catch (error) {
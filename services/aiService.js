@@ -1,10 +1,42 @@
+const crypto = require('crypto');
 const config = require('../config/env');
+const { httpClient } = require('../config/httpClient');
+const VectorService = require('./vectorService');
+const { LruCache } = require('../utils/lruCache');
+
+// Embeddings keyed by sha256 of the text. Search pages re-embed the same query text
+// on every request, and with an API key configured each of those is a network round trip.
+// Fallback embeddings aren't cached, so a provider that recovers is used again.
+const EMBEDDING_CACHE_SIZE = 1024;
+const embeddingCache = new LruCache(EMBEDDING_CACHE_SIZE);
+
+const embeddingCacheKey = text => crypto.createHash('sha256').update(text).digest('hex');
+
+// Provider calls go through the shared keep-alive agents, so analysing or embedding many
+// documents in a row reuses one connection per host instead of handshaking per call
+const PROVIDER_TIMEOUT_MS = 120000;
+const PROVIDER_RETRIES = 2;
+
+const postJson = async (url, { headers, body }, failureMessage) => {
+  try {
+    const response = await httpClient.post(url, body, {
+      headers,
+      timeout: PROVIDER_TIMEOUT_MS,
+      retries: PROVIDER_RETRIES
+    });
+    return response.data;
+  } catch (error) {
+    throw new Error(`${failureMessage}: ${error.response?.statusText || error.message}`);
+  }
+};
 
 class AIService {
   constructor() {
     this.apiKey = config.openRouterApiKey;
     this.baseUrl = 'https://openrouter.ai/api/v1';
     this.chatModel = 'anthropic/claude-3-haiku';
+    // Local embeddings when no embedding API key is set
+    this.vectorService = VectorService.getSharedInstance();
   }
 
   async analyzeDocument(text, documentType = 'rfp') {
@@ -14,15 +46,14 @@ class AIService {
         return this.getFallbackAnalysis(documentType);
       }
 
-      const response = await fetch(`${this.baseUrl}/chat/completions`, {
-        method: 'POST',
+      const data = await postJson(`${this.baseUrl}/chat/completions`, {
         headers: {
           'Authorization': `Bearer ${this.apiKey}`,
           'Content-Type': 'application/json',
           'HTTP-Referer': config.apiBaseUrl,
           'X-Title': 'Government Contracts Platform'
         },
-        body: JSON.stringify({
+        body: {
           model: this.chatModel,
           messages: [
             {
@@ -45,14 +76,8 @@ Return a JSON object with sections, requirements, deadlines, and evaluation_crit
           ],
           max_tokens: 2000,
           temperature: 0.1
-        })
-      });
-
-      if (!response.ok) {
-        throw new Error(`AI analysis failed: ${response.statusText}`);
-      }
-
-      const data = await response.json();
+        }
+      }, 'AI analysis failed');
       const analysisText = data.choices[0].message.content;
       
       return this.parseAnalysisResponse(analysisText);
@@ -69,15 +94,14 @@ Return a JSON object with sections, requirements, deadlines, and evaluation_crit
         return this.getFallbackSectionContent(sectionTitle);
       }
 
-      const response = await fetch(`${this.baseUrl}/chat/completions`, {
-        method: 'POST',
+      const data = await postJson(`${this.baseUrl}/chat/completions`, {
         headers: {
           'Authorization': `Bearer ${this.apiKey}`,
           'Content-Type': 'application/json',
           'HTTP-Referer': config.apiBaseUrl,
           'X-Title': 'Government Contracts Platform'
         },
-        body: JSON.stringify({
+        body: {
           model: this.chatModel,
           messages: [
             {
@@ -104,14 +128,8 @@ Return only the section content, no additional formatting.`
           ],
           max_tokens: 1500,
           temperature: 0.3
-        })
-      });
-
-      if (!response.ok) {
-        throw new Error(`AI generation failed: ${response.statusText}`);
-      }
-
-      const data = await response.json();
+        }
+      }, 'AI generation failed');
       return data.choices[0].message.content;
     } catch (error) {
       console.error('AI section generation error:', error);
@@ -126,15 +144,14 @@ Return only the section content, no additional formatting.`
         return this.getFallbackBidAnalysis();
       }
 
-      const response = await fetch(`${this.baseUrl}/chat/completions`, {
-        method: 'POST',
+      const data = await postJson(`${this.baseUrl}/chat/completions`, {
         headers: {
           'Authorization': `Bearer ${this.apiKey}`,
           'Content-Type': 'application/json',
           'HTTP-Referer': config.apiBaseUrl,
           'X-Title': 'Government Contracts Platform'
         },
-        body: JSON.stringify({
+        body: {
           model: this.chatModel,
           messages: [
             {
@@ -161,14 +178,8 @@ Return structured data that can be parsed into factors, recommendations, and com
           ],
           max_tokens: 1500,
           temperature: 0.2
-        })
-      });
-
-      if (!response.ok) {
-        throw new Error(`AI bid analysis failed: ${response.statusText}`);
-      }
-
-      const data = await response.json();
+        }
+      }, 'AI bid analysis failed');
       const analysisText = data.choices[0].message.content;
       
       return this.parseBidAnalysis(analysisText);
@@ -260,76 +271,125 @@ Return structured data that can be parsed into factors, recommendations, and com
   }
 
   async generateEmbedding(text) {
+    const cacheKey = embeddingCacheKey(text);
+    const cached = embeddingCache.get(cacheKey);
+    if (cached) {
+      return cached;
+    }
+
+    try {
+      const embedding = await this.generateProviderEmbedding(text);
+      embeddingCache.set(cacheKey, embedding);
+      return embedding;
+    } catch (error) {
+      console.error('AI embedding generation error:', error);
+      return this.getFallbackEmbedding(text);
+    }
+  }
+
+  async generateProviderEmbedding(text) {
+    // Try OpenAI embeddings first if API key is available
+    const openaiKey = process.env.OPENAI_API_KEY;
+    if (openaiKey) {
+      console.log('Using OpenAI embeddings service');
+      return await this.generateOpenAIEmbedding(text, openaiKey);
+    }
+
+    // Try Hugging Face embeddings as fallback
+    const hfKey = process.env.HUGGINGFACE_API_KEY;
+    if (hfKey) {
+      console.log('Using Hugging Face embeddings service');
+      return await this.generateHuggingFaceEmbedding(text, hfKey);
+    }
+
+    // Local transformer model, loaded on first use
+    console.log('Using local transformer embeddings');
+    return this.vectorService.generateEmbedding(text);
+  }
+
+  // Same provider order as generateEmbedding, but one request (or model call) for all texts
+  async generateEmbeddings(texts) {
+    if (texts.length === 0) {
+      return [];
+    }
+
     try {
-      // Try OpenAI embeddings first if API key is available
       const openaiKey = process.env.OPENAI_API_KEY;
       if (openaiKey) {
-        console.log('Using OpenAI embeddings service');
-        return await this.generateOpenAIEmbedding(text, openaiKey);
+        return await this.generateOpenAIEmbeddings(texts, openaiKey);
       }
 
-      // Try Hugging Face embeddings as fallback
       const hfKey = process.env.HUGGINGFACE_API_KEY;
       if (hfKey) {
-        console.log('Using Hugging Face embeddings service');
-        return await this.generateHuggingFaceEmbedding(text, hfKey);
+        return await this.generateHuggingFaceEmbeddings(texts, hfKey);
       }
 
-      // Use local transformer model if available
-      if (this.vectorService && this.vectorService.embedder) {
-        console.log('Using local transformer embeddings');
-        return await this.vectorService.generateEmbedding(text);
-      }
-
-      console.warn('No embedding service available, using fallback');
-      return this.getFallbackEmbedding(text);
+      return await this.vectorService.generateEmbeddings(texts);
     } catch (error) {
-      console.error('AI embedding generation error:', error);
-      return this.getFallbackEmbedding(text);
+      console.error('AI batch embedding generation error:', error);
+      return texts.map(text => this.getFallbackEmbedding(text));
     }
   }
 
   async generateOpenAIEmbedding(text, apiKey) {
-    const response = await fetch('https://api.openai.com/v1/embeddings', {
-      method: 'POST',
+    const data = await postJson('https://api.openai.com/v1/embeddings', {
       headers: {
         'Authorization': `Bearer ${apiKey}`,
         'Content-Type': 'application/json'
       },
-      body: JSON.stringify({
+      body: {
         model: 'text-embedding-3-small',
         input: text.substring(0, 8000) // Limit text length
-      })
-    });
+      }
+    }, 'OpenAI embedding failed');
+    return data.data[0].embedding;
+  }
 
-    if (!response.ok) {
-      throw new Error(`OpenAI embedding failed: ${response.statusText}`);
+  // The embeddings endpoint takes an array of inputs; results carry their input index
+  async generateOpenAIEmbeddings(texts, apiKey) {
+    const data = await postJson('https://api.openai.com/v1/embeddings', {
+      headers: {
+        'Authorization': `Bearer ${apiKey}`,
+        'Content-Type': 'application/json'
+      },
+      body: {
+        model: 'text-embedding-3-small',
+        input: texts.map(text => text.substring(0, 8000))
+      }
+    }, 'OpenAI embedding failed');
+    const embeddings = new Array(texts.length);
+    for (const item of data.data) {
+      embeddings[item.index] = item.embedding;
     }
-
-    const data = await response.json();
-    return data.data[0].embedding;
+    return embeddings;
   }
 
   async generateHuggingFaceEmbedding(text, apiKey) {
-    const response = await fetch('https://api-inference.huggingface.co/pipeline/feature-extraction/sentence-transformers/all-MiniLM-L6-v2', {
-      method: 'POST',
+    const embedding = await postJson('https://api-inference.huggingface.co/pipeline/feature-extraction/sentence-transformers/all-MiniLM-L6-v2', {
       headers: {
         'Authorization': `Bearer ${apiKey}`,
         'Content-Type': 'application/json'
       },
-      body: JSON.stringify({
+      body: {
         inputs: text.substring(0, 8000)
-      })
-    });
-
-    if (!response.ok) {
-      throw new Error(`Hugging Face embedding failed: ${response.statusText}`);
-    }
-
-    const embedding = await response.json();
+      }
+    }, 'Hugging Face embedding failed');
     return Array.isArray(embedding[0]) ? embedding[0] : embedding;
   }
 
+  // Sentence-transformer pipelines return one pooled vector per input when given a list
+  async generateHuggingFaceEmbeddings(texts, apiKey) {
+    return await postJson('https://api-inference.huggingface.co/pipeline/feature-extraction/sentence-transformers/all-MiniLM-L6-v2', {
+      headers: {
+        'Authorization': `Bearer ${apiKey}`,
+        'Content-Type': 'application/json'
+      },
+      body: {
+        inputs: texts.map(text => text.substring(0, 8000))
+      }
+    }, 'Hugging Face embedding failed');
+  }
+
   async summarizeDocument(text) {
     try {
       if (!this.apiKey) {
@@ -337,15 +397,14 @@ Return structured data that can be parsed into factors, recommendations, and com
         return this.getFallbackSummary(text);
       }
 
-      const response = await fetch(`${this.baseUrl}/chat/completions`, {
-        method: 'POST',
+      const data = await postJson(`${this.baseUrl}/chat/completions`, {
         headers: {
           'Authorization': `Bearer ${this.apiKey}`,
           'Content-Type': 'application/json',
           'HTTP-Referer': config.apiBaseUrl,
           'X-Title': 'Government Contracts Platform'
         },
-        body: JSON.stringify({
+        body: {
           model: this.chatModel,
           messages: [
             {
@@ -359,14 +418,8 @@ Return structured data that can be parsed into factors, recommendations, and com
           ],
           max_tokens: 200,
           temperature: 0.1
-        })
-      });
-
-      if (!response.ok) {
-        throw new Error(`Document summarization failed: ${response.statusText}`);
-      }
-
-      const data = await response.json();
+        }
+      }, 'Document summarization failed');
       return data.choices[0].message.content;
     } catch (error) {
       console.error('AI document summarization error:', error);
@@ -381,27 +434,20 @@ Return structured data that can be parsed into factors, recommendations, and com
         return 'AI analysis not available - API key not configured';
       }
 
-      const response = await fetch(`${this.baseUrl}/chat/completions`, {
-        method: 'POST',
+      const data = await postJson(`${this.baseUrl}/chat/completions`, {
         headers: {
           'Authorization': `Bearer ${this.apiKey}`,
           'Content-Type': 'application/json',
           'HTTP-Referer': config.apiBaseUrl,
           'X-Title': 'Government Contracts Platform'
         },
-        body: JSON.stringify({
+        body: {
           model: options.model || this.chatModel,
           messages,
           max_tokens: options.maxTokens || 1000,
           temperature: options.temperature || 0.3
-        })
-      });
-
-      if (!response.ok) {
-        throw new Error(`Chat completion failed: ${response.statusText}`);
-      }
-
-      const data = await response.json();
+        }
+      }, 'Chat completion failed');
       return data.choices[0].message.content;
     } catch (error) {
       console.error('AI chat completion error:', error);
@@ -1,10 +1,7 @@
-const { PrismaClient } = require('@prisma/client');
+const { prisma } = require('../config/database');
 const winProbabilityPredictor = require('./mlWinProbability');
 const contractSimilarity = require('./contractSimilarity');
 
-// Use shared Prisma client instance
-const prisma = new PrismaClient();
-
 class BidStrategyOptimizer {
   constructor() {
     this.marketData = new Map();
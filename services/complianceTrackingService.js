@@ -154,7 +154,7 @@ class ComplianceTrackingService {
 
       for (const deadline of upcomingDeadlines) {
         // In a real implementation, you would send emails/SMS here
-        logger.info(`Reminder: ${deadline.deadline_type} deadline for ${deadline.contract_title} on ${deadline.deadline_date}`);
+        logger.info('Reminder: %s deadline for %s on %s', deadline.deadline_type, deadline.contract_title, deadline.deadline_date);
 
         // Mark reminder as sent
         await this.pool.query(
@@ -286,7 +286,7 @@ class ComplianceTrackingService {
           const requirements = JSON.parse(response);
           updates.push({ agency, requirements });
         } catch (error) {
-          logger.error(`Error updating requirements for ${agency}:`, error);
+          logger.error('Error updating requirements for %s:', agency, error);
         }
       }
 
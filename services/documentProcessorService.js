@@ -0,0 +1,545 @@
+const { prisma } = require('../config/database');
+const vectorService = require('./vectorService').getSharedInstance();
+const { summarizeContent } = require('./summarizationService');
+const { createBatchClaimer, createStatusUpdateBuffer } = require('./documentQueueService');
+const config = require('../config/env');
+const { downloadToFile } = require('../config/httpClient');
+const fs = require('fs-extra');
+const path = require('path');
+const { runWithConcurrency, runWithAdaptiveConcurrency } = require('../utils/concurrency');
+const LibreOfficeService = require('./libreoffice.service');
+const libreOfficeService = LibreOfficeService.getSharedInstance();
+const pdfService = require('./summaryService.js');
+
+const PDF_OR_DOCX_FILE_RE = /\.(?:pdf|docx)$/i;
+const PROCESSABLE_FILE_RE = /\.(?:pdf|docx?|xlsx?|pptx?)$/i;
+
+// Helper function to process test documents with higher concurrency
+async function processTestDocumentsSequentially(documents, jobId) {
+  console.log(`🧪 [DEBUG] Processing ${documents.length} TEST documents with CONCURRENCY=20 (cost-effective mode)`);
+  
+  let processedCount = 0;
+  let successCount = 0;
+  let errorCount = 0;
+  let skippedCount = 0;
+
+  // Process documents with concurrency of 20 instead of sequentially
+  const concurrency = Math.min(20, documents.length);
+  console.log(`🧪 [DEBUG] Using concurrency: ${concurrency}`);
+
+  // Claim documents in small batches as workers reach them and batch the final status
+  // writes, instead of a claim and a completion round trip per document
+  const claim = createBatchClaimer(documents.map(doc => doc.id));
+  const statusUpdates = createStatusUpdateBuffer({ flushSize: 25 });
+  const cachedIds = new Set();
+
+  // Listed once per run instead of once per document
+  const downloadPath = path.join(process.cwd(), 'downloaded_documents');
+  let downloadDirListing = null;
+  const listDownloadDir = () => {
+    if (!downloadDirListing) {
+      downloadDirListing = fs.readdir(downloadPath);
+    }
+    return downloadDirListing;
+  };
+
+  // Process single document
+  const processDocument = async (doc) => {
+    // Skip documents that were deleted or claimed by another worker
+    if (!(await claim(doc.id))) {
+      console.log(`⚠️ [DEBUG] Test document record ${doc.id} no longer exists or is already being processed, skipping`);
+      processedCount++;
+      skippedCount++;
+      return { success: false, skipped: true, filename: doc.filename, error: 'Record not found or already claimed' };
+    }
+
+    try {
+      console.log(`🧪 [DEBUG] Processing TEST document: ${doc.filename}`);
+      
+      const documentId = `${doc.contractNoticeId}_${doc.filename}`;
+      
+      // Check if document is already indexed in vector database
+      const existingDoc = await vectorService.getDocumentById(documentId);
+      
+      if (existingDoc) {
+        console.log(`🧪 [DEBUG] Test document already indexed, using cached: ${documentId}`);
+        
+        statusUpdates.markCompleted(doc.id, {
+          cached: true,
+          content: existingDoc.document,
+          source: 'vector_database',
+          testMode: true
+        });
+
+        skippedCount++;
+        cachedIds.add(doc.id);
+        console.log(`🧪 [DEBUG] ✅ Test document cached successfully: ${doc.filename}`);
+        return { success: true, filename: doc.filename, cached: true };
+      } else {
+        // Process document via summarization service
+        console.log(`🧪 [DEBUG] 💰 COST ALERT: Sending test document to summarization service`);
+        
+        // First, try to find the downloaded file in the downloaded_documents folder
+        let localFilePath = null;
+        
+        try {
+          const downloadedFiles = await listDownloadDir();
+          // Look for files that match this contract ID
+          const matchingFile = downloadedFiles.find(file => 
+            file.includes(doc.contractNoticeId) && PROCESSABLE_FILE_RE.test(file)
+          );
+          
+          if (matchingFile) {
+            localFilePath = path.join(downloadPath, matchingFile);
+            console.log(`🧪 [DEBUG] ✅ Found downloaded file: ${matchingFile}`);
+          }
+        } catch (error) {
+          console.log(`🧪 [DEBUG] ⚠️ Could not check downloaded files: ${error.message}`);
+        }
+        
+        // Parse document metadata if available
+        let documentMetadata = {};
+        try {
+          if (doc.metadata) {
+            documentMetadata = JSON.parse(doc.metadata);
+          }
+        } catch (parseError) {
+          console.warn(`🧪 [DEBUG] Could not parse document metadata: ${parseError.message}`);
+        }
+
+        // Use local file if found, otherwise use the stored localFilePath, otherwise use URL
+        let filePathToProcess;
+        let needsConversion = documentMetadata.needsConversion || false;
+        
+        if (localFilePath) {
+          // Taken from the directory listing, so no second existence check
+          filePathToProcess = localFilePath;
+          console.log(`🧪 [DEBUG] ✅ Using found local file: ${localFilePath}`);
+        } else if (doc.localFilePath && await fs.pathExists(doc.localFilePath)) {
+          filePathToProcess = doc.localFilePath;
+          console.log(`🧪 [DEBUG] ✅ Using stored local file path: ${doc.localFilePath}`);
+        } else {
+          filePathToProcess = doc.documentUrl;
+          console.log(`🧪 [DEBUG] ⚠️ No local file found, will download from URL: ${doc.documentUrl}`);
+        }
+        
+        // If document needs conversion and we're processing from URL, handle conversion first
+        let finalProcessingPath = filePathToProcess;
+        if (needsConversion && (filePathToProcess === doc.documentUrl || filePathToProcess.startsWith('http'))) {
+          console.log(`📄➡️📄 [TEST] Document needs PDF conversion: ${doc.filename}`);
+          
+          // Create temp directory for conversion
+          const tempDir = path.join(process.cwd(), 'temp_test_processing', `${Date.now()}_${doc.id}`);
+          await fs.ensureDir(tempDir);
+          
+          try {
+            // Download file first if it's a URL
+            let tempInputPath;
+            if (filePathToProcess.startsWith('http')) {
+              console.log(`🧪 [DEBUG] Downloading for conversion: ${filePathToProcess}`);
+              const fileExt = documentMetadata.fileExtension || path.extname(doc.filename).toLowerCase();
+              tempInputPath = path.join(tempDir, `input${fileExt}`);
+              // Straight to disk: only the conversion reads it
+              await downloadToFile(filePathToProcess, tempInputPath, {
+                timeout: 120000,
+                headers: {
+                  'User-Agent': 'Mozilla/5.0 (compatible; ContractIndexer/1.0)',
+                  'Accept': '*/*'
+                }
+              });
+            } else {
+              tempInputPath = filePathToProcess;
+            }
+            
+            // Convert to PDF using LibreOffice
+            console.log(`📄➡️📄 [TEST] Converting to PDF: ${tempInputPath}`);
+            await libreOfficeService.convertToPdfWithRetry(tempInputPath, tempDir);
+            
+            // Find the converted PDF
+            const files = await fs.readdir(tempDir);
+            const pdfFile = files.find(file => file.toLowerCase().endsWith('.pdf'));
+            
+            if (pdfFile) {
+              finalProcessingPath = path.join(tempDir, pdfFile);
+              console.log(`📄➡️📄 [TEST] ✅ Conversion successful: ${finalProcessingPath}`);
+            } else {
+              throw new Error('No PDF file found after conversion');
+            }
+            
+          } catch (conversionError) {
+            console.error(`📄➡️📄 [TEST] ❌ Conversion failed: ${conversionError.message}`);
+            // Clean up temp directory
+            try {
+              await fs.remove(tempDir);
+            } catch (cleanupError) {
+              console.warn(`🧪 [DEBUG] Could not clean up temp directory: ${cleanupError.message}`);
+            }
+            throw new Error(`PDF conversion failed: ${conversionError.message}`);
+          }
+        }
+        
+        console.log(`🧪 [DEBUG] Processing file: ${finalProcessingPath}`);
+        
+        const result = await summarizeContent(
+          finalProcessingPath,
+          doc.filename || 'test_document',
+          '',
+          'openai/gpt-4.1'
+        );
+        
+        // Clean up temp conversion directory if it was created
+        if (needsConversion && finalProcessingPath.includes('temp_test_processing')) {
+          try {
+            const tempDir = path.dirname(finalProcessingPath);
+            await fs.remove(tempDir);
+            console.log(`🧪 [DEBUG] Cleaned up temp conversion directory: ${tempDir}`);
+          } catch (cleanupError) {
+            console.warn(`🧪 [DEBUG] Could not clean up temp conversion directory: ${cleanupError.message}`);
+          }
+        }
+
+        if (result) {
+          const finalFilename = result.correctedFilename || doc.filename;
+          const filenameChanged = finalFilename !== doc.filename;
+          if (filenameChanged) {
+            console.log(`🧪 [DEBUG] Updating test filename from ${doc.filename} to ${finalFilename}`);
+          }
+
+          // Built and serialized once; the same object is indexed and the same JSON stored
+          const processedData = { ...result, testMode: true };
+          const processedJson = JSON.stringify(processedData);
+
+          // Index the processed document
+          await vectorService.indexDocument({
+            filename: finalFilename,
+            content: result.content || result.text,
+            processedData
+          }, doc.contractNoticeId);
+
+          // Status (and filename, if corrected) go out with the next batch write
+          statusUpdates.markCompleted(doc.id, processedJson, {
+            filename: filenameChanged ? finalFilename : undefined
+          });
+
+          successCount++;
+          console.log(`🧪 [DEBUG] ✅ Test document processed successfully: ${doc.filename}`);
+          return { success: true, filename: finalFilename, cached: false };
+        } else {
+          throw new Error('No result from summarization service');
+        }
+      }
+
+    } catch (error) {
+      console.error(`🧪 [DEBUG] ❌ Error processing test document ${doc.filename}:`, error.message);
+      
+      // Failure is written with the next batch; rows deleted meanwhile are skipped
+      statusUpdates.markFailed(doc.id, error.message);
+
+      errorCount++;
+      return { success: false, filename: doc.filename, error: error.message };
+    } finally {
+      processedCount++;
+    }
+  };
+
+  // Process documents through a bounded pool; a new document starts as soon as a slot frees up
+  console.log(`🧪 [DEBUG] Processing ${documents.length} documents with ${concurrency} concurrent workers`);
+
+  // processDocument counts its own outcomes; only a rejection (the claim query itself failing) is counted here
+  await runWithConcurrency(documents.map(doc => () => processDocument(doc)), concurrency, (result, index) => {
+    if (result.status === 'rejected') {
+      console.error(`🧪 [DEBUG] Document ${index + 1} rejected:`, result.reason);
+      processedCount++;
+      errorCount++;
+    }
+  });
+
+  // A completion that never reached the database leaves its row in 'processing', so it is an error
+  for (const { id, status } of await statusUpdates.flush()) {
+    if (status === 'completed') {
+      if (cachedIds.has(id)) {
+        skippedCount--;
+      } else {
+        successCount--;
+      }
+      errorCount++;
+    }
+  }
+
+  console.log(`🧪 [DEBUG] All documents finished - Progress: ${processedCount}/${documents.length} - Success: ${successCount}, Errors: ${errorCount}, Skipped: ${skippedCount}`);
+
+  // Update job status
+  try {
+    await prisma.indexingJob.update({
+      where: { id: jobId },
+      data: {
+        status: 'completed',
+        recordsProcessed: successCount,
+        errorsCount: errorCount,
+        completedAt: new Date()
+      }
+    });
+
+    console.log(`🧪 [DEBUG] ========================================`);
+    console.log(`🧪 [DEBUG] TEST BED PROCESSING COMPLETED!`);
+    console.log(`🧪 [DEBUG] ========================================`);
+    console.log(`🧪 [DEBUG] 📊 Total processed: ${processedCount}`);
+    console.log(`🧪 [DEBUG] ✅ Success: ${successCount}`);
+    console.log(`🧪 [DEBUG] ❌ Errors: ${errorCount}`);
+    console.log(`🧪 [DEBUG] ⏭️  Skipped: ${skippedCount}`);
+    console.log(`🧪 [DEBUG] 💰 Cost impact: MINIMAL (only ${successCount} API calls)`);
+    console.log(`🧪 [DEBUG] ========================================`);
+  } catch (updateError) {
+    console.error('🧪 [DEBUG] Error updating test job status:', updateError);
+  }
+}
+
+// Optimized parallel document processing with proper concurrency
+async function processDocumentsInParallel(documents, concurrency, jobId) {
+  console.log(`🚀 [OPTIMIZED] Starting parallel processing: ${documents.length} documents, concurrency: ${concurrency}`);
+  
+  let successCount = 0;
+  let errorCount = 0;
+  let processedCount = 0;
+
+  // Documents are claimed a few at a time as workers reach them; the conditional UPDATE
+  // means concurrent jobs can never process the same row twice
+  const claim = createBatchClaimer(documents.map(doc => doc.id));
+
+  // Completion/failure writes are batched instead of one UPDATE per document
+  const statusUpdates = createStatusUpdateBuffer();
+
+  // Listed at most once per job, and only if some queue entry's file has gone missing
+  const downloadPath = path.join(process.cwd(), 'downloaded_documents');
+  let downloadDirListing = null;
+  const listDownloadDir = () => {
+    if (!downloadDirListing) {
+      downloadDirListing = fs.readdir(downloadPath).catch(() => []);
+    }
+    return downloadDirListing;
+  };
+
+  // Process single document with full pipeline parallelization
+  const processDocument = async (doc) => {
+    if (!(await claim(doc.id))) {
+      console.log(`⚠️ [DEBUG] Queue entry ${doc.id} is already being processed, skipping`);
+      return { success: false, skipped: true, filename: doc.filename, error: 'Already claimed' };
+    }
+
+    const startTime = Date.now();
+    let completedAt = null;
+    
+    try {
+      // Use the exact file path from the queue entry
+      let filePath = doc.localFilePath;
+      console.log(`📁 [DEBUG] Processing queue entry ${doc.id}: ${doc.filename}`);
+      console.log(`📁 [DEBUG] Expected file path: ${filePath}`);
+      
+      // One stat answers both "does it exist" and "how big is it"
+      const fileStats = filePath ? await fs.stat(filePath).catch(() => null) : null;
+      
+      if (fileStats) {
+        console.log(`📁 [DEBUG] File size: ${fileStats.size} bytes`);
+      }
+      
+      // Verify the file exists at the specified path
+      if (!fileStats) {
+        console.error(`❌ [DEBUG] File not found at expected path: ${filePath}`);
+        console.log(`🔍 [DEBUG] Searching for file in download directory...`);
+        
+        const files = await listDownloadDir();
+        
+        // Look for exact filename match first
+        let matchingFile = files.find(file => file === doc.filename);
+        
+        if (!matchingFile) {
+          // Fallback to partial match
+          matchingFile = files.find(file => 
+            file.includes(doc.contractNoticeId) && PDF_OR_DOCX_FILE_RE.test(file)
+          );
+        }
+        
+        if (matchingFile) {
+          filePath = path.join(downloadPath, matchingFile);
+          console.log(`✅ [DEBUG] Found file: ${matchingFile} at ${filePath}`);
+        } else {
+          console.error(`❌ [DEBUG] No matching file found for ${doc.filename}`);
+        }
+      } else {
+        console.log(`✅ [DEBUG] File verified at: ${filePath}`);
+      }
+      
+      if (!filePath) {
+        throw new Error('No file found');
+      }
+      
+      // PARALLEL PIPELINE: Start all operations simultaneously
+      const timeoutPromise = new Promise((_, reject) => {
+        setTimeout(() => reject(new Error('Timeout (3min)')), 180000);
+      });
+      
+      const processingPromise = (async () => {
+        // Step 1: Check if conversion needed and start it immediately
+        const fileExt = path.extname(filePath).toLowerCase();
+        let conversionPromise = Promise.resolve(filePath); // Default to original file
+        
+        if (fileExt !== '.pdf') {
+          console.log(`🔄 Starting PDF conversion in parallel: ${doc.filename}`);
+          conversionPromise = (async () => {
+            const tempDir = path.join(process.cwd(), 'temp_parallel_conversion', `${Date.now()}_${doc.id}`);
+            await fs.ensureDir(tempDir);
+            
+            try {
+              await libreOfficeService.convertToPdfWithRetry(filePath, tempDir);
+              const files = await fs.readdir(tempDir);
+              const pdfFile = files.find(file => file.toLowerCase().endsWith('.pdf'));
+              
+              if (pdfFile) {
+                return path.join(tempDir, pdfFile);
+              } else {
+                throw new Error('No PDF file found after conversion');
+              }
+            } catch (error) {
+              await fs.remove(tempDir).catch(() => {});
+              throw new Error(`PDF conversion failed: ${error.message}`);
+            }
+          })();
+        }
+        
+        // Step 2: Wait for conversion to complete, then start extraction and summarization in parallel
+        const pdfPath = await conversionPromise;
+        console.log(`📄 PDF ready, starting parallel extraction and analysis: ${doc.filename}`);
+        console.log(`📄 [DEBUG] Processing PDF file: ${pdfPath}`);
+        console.log(`📄 [DEBUG] Original file: ${filePath}`);
+        console.log(`📄 [DEBUG] Queue entry ID: ${doc.id}`);
+        
+        // Start extraction immediately
+        const extractionPromise = (async () => {
+          console.log(`📄 [DEBUG] Starting PDF extraction for queue ID ${doc.id}: ${path.basename(pdfPath)}`);
+          const result = await pdfService.processPDF(pdfPath, {
+            apiKey: process.env.REACT_APP_OPENROUTER_KEY,
+            saveExtracted: false,
+            outputDir: null
+          });
+          console.log(`📄 [DEBUG] PDF extraction completed for queue ID ${doc.id}: ${result.wordCount} words`);
+          return result;
+        })();
+        
+        // Wait for extraction, then start summarization
+        const extractResult = await extractionPromise;
+        
+        if (!extractResult.success) {
+          throw new Error(`PDF extraction failed: ${extractResult.error}`);
+        }
+        
+        console.log(`✅ Extraction completed, starting summarization: ${doc.filename}`);
+        
+        // Start summarization
+        const summaryPromise = (async () => {
+          return await pdfService.summarizeContent(
+            extractResult.extractedContent,
+            process.env.REACT_APP_OPENROUTER_KEY
+          );
+        })();
+        
+        // Wait for summarization
+        const summaryResult = await summaryPromise;
+        
+        if (!summaryResult.success) {
+          throw new Error(`Summarization failed: ${summaryResult.error}`);
+        }
+        
+        // Clean up temp conversion files
+        if (fileExt !== '.pdf' && pdfPath.includes('temp_parallel_conversion')) {
+          try {
+            const tempDir = path.dirname(pdfPath);
+            await fs.remove(tempDir);
+          } catch (cleanupError) {
+            // Ignore cleanup errors
+          }
+        }
+        
+        const result = summaryResult.result;
+        
+        // Serialized once for storage
+        const processedJson = JSON.stringify(result);
+        
+        // Step 3: Index in vector database, then queue the status update for the next batch write
+        await vectorService.indexDocument({
+          filename: doc.filename,
+          content: result.content || result.text,
+          processedData: result
+        }, doc.contractNoticeId);
+        // One clock read serves both completedAt and the duration log
+        completedAt = new Date();
+        statusUpdates.markCompleted(doc.id, processedJson, { now: completedAt });
+        
+        return result;
+      })();
+      
+      await Promise.race([processingPromise, timeoutPromise]);
+      
+      successCount++;
+      const duration = ((completedAt - startTime) / 1000).toFixed(1);
+      console.log(`✅ ${++processedCount}/${documents.length} (${duration}s): ${doc.filename}`);
+      
+      return { success: true, filename: doc.filename };
+
+    } catch (error) {
+      errorCount++;
+      const duration = ((Date.now() - startTime) / 1000).toFixed(1);
+      console.log(`❌ ${++processedCount}/${documents.length} (${duration}s): ${doc.filename} - ${error.message}`);
+      
+      // Quick failure update, written with the next batch
+      statusUpdates.markFailed(doc.id, error.message);
+      
+      return { success: false, filename: doc.filename, error: error.message };
+    }
+  };
+
+  // Keep up to `concurrency` documents in flight; the pool halves itself if most recent documents fail.
+  // Entries another job already claimed are skipped, not failed, and don't count against the pool
+  const workerCount = Math.min(concurrency, config.processingMaxWorkers);
+  console.log(`📦 Processing ${documents.length} documents with ${workerCount} concurrent workers (max ${config.processingMaxWorkers})`);
+
+  await runWithAdaptiveConcurrency(documents.map(doc => () => processDocument(doc)), workerCount, {
+    isFailure: result => result.status === 'rejected' || (!result.value?.success && !result.value?.skipped)
+  });
+
+  // A completion that never reached the database leaves its row in 'processing', so it is an error
+  for (const { status } of await statusUpdates.flush()) {
+    if (status === 'completed') {
+      successCount--;
+      errorCount++;
+    }
+  }
+
+  // Update job status
+  try {
+    await prisma.indexingJob.update({
+      where: { id: jobId },
+      data: {
+        status: 'completed',
+        recordsProcessed: successCount,
+        errorsCount: errorCount,
+        completedAt: new Date()
+      }
+    });
+
+    console.log(`🎉 COMPLETED: ${successCount} success, ${errorCount} errors, ${documents.length} total`);
+  } catch (updateError) {
+    console.error('❌ Error updating job status:', updateError);
+  }
+  
+  return {
+    success: true,
+    processed: documents.length,
+    successCount,
+    errorCount
+  };
+}
+
+module.exports = {
+  processTestDocumentsSequentially,
+  processDocumentsInParallel
+};
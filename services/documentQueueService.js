@@ -0,0 +1,228 @@
+const { prisma } = require('../config/database');
+const { LruCache } = require('../utils/lruCache');
+
+// Statuses a worker may pick a document up from
+const CLAIMABLE_STATUSES = ['queued', 'failed'];
+
+// Columns the queue processors read; skips processedData and other large text columns
+const QUEUE_WORK_ITEM_SELECT = {
+  id: true,
+  contractNoticeId: true,
+  documentUrl: true,
+  filename: true,
+  localFilePath: true,
+  metadata: true
+};
+
+// Parsed processedData, keyed by entry id + updatedAt so a row is re-parsed only after it changes
+const PROCESSED_DATA_CACHE_SIZE = 256;
+const processedDataCache = new LruCache(PROCESSED_DATA_CACHE_SIZE);
+
+/**
+ * Claim many queue entries with one UPDATE ... RETURNING instead of one round trip per document.
+ * @param {number[]} ids - Queue entry ids
+ * @param {Date} [now] - Timestamp to record as startedAt
+ * @returns {Promise<Set<number>>} Ids this caller claimed (others were deleted or already taken)
+ */
+async function claimDocuments(ids, now = new Date()) {
+  if (ids.length === 0) {
+    return new Set();
+  }
+
+  const rows = await prisma.$queryRaw`
+    UPDATE document_processing_queue
+    SET status = 'processing', started_at = ${now}, updated_at = ${now}
+    WHERE id = ANY(${ids}) AND status = ANY(${CLAIMABLE_STATUSES})
+    RETURNING id
+  `;
+  return new Set(rows.map(row => row.id));
+}
+
+/**
+ * Claim a run's documents a few at a time as workers reach them, instead of all up front.
+ * A batch is claimed when the first of its documents is asked for, so startedAt marks when
+ * work began, the backlog stays 'queued' until then, and a crash strands only the batches
+ * already in flight.
+ * @param {number[]} ids - Queue entry ids, in the order they will be processed
+ * @param {number} [batchSize=5] - Documents claimed per UPDATE
+ * @returns {(id: number) => Promise<boolean>} Resolves true if this caller claimed the document
+ */
+function createBatchClaimer(ids, batchSize = 5) {
+  const positions = new Map(ids.map((id, index) => [id, index]));
+  const batches = new Map(); // batch number -> Promise<Set<number>>
+
+  return (id) => {
+    const position = positions.get(id);
+    if (position === undefined) {
+      return Promise.resolve(false);
+    }
+
+    const batch = Math.floor(position / batchSize);
+    if (!batches.has(batch)) {
+      const start = batch * batchSize;
+      batches.set(batch, claimDocuments(ids.slice(start, start + batchSize)));
+    }
+    return batches.get(batch).then(claimed => claimed.has(id));
+  };
+}
+
+// processedData may arrive already serialized so callers that also need the JSON text stringify once
+const completedData = (processedData, filename, now) => {
+  const data = {
+    status: 'completed',
+    processedData: typeof processedData === 'string' ? processedData : JSON.stringify(processedData),
+    completedAt: now
+  };
+  if (filename) {
+    data.filename = filename;
+  }
+  return data;
+};
+
+const failedData = (errorMessage, now) => ({
+  status: 'failed',
+  errorMessage,
+  failedAt: now
+});
+
+// updateMany (not update) so a row deleted in the meantime is a no-op instead of an error
+const statusUpdate = ({ id, data }) => prisma.documentProcessingQueue.updateMany({ where: { id }, data });
+
+/**
+ * Buffer completion/failure updates and write them in one transaction per batch.
+ * Batches go out every `flushSize` updates or `flushIntervalMs`, whichever comes first;
+ * call flush() once processing ends. Rows deleted in the meantime are skipped silently.
+ * A batch whose transaction fails is retried once, then written row by row, so one bad
+ * row can't leave the rest of the batch stuck in 'processing'.
+ * @param {Object} [options]
+ * @param {number} [options.flushSize=50] - Updates per transaction
+ * @param {number} [options.flushIntervalMs=1000] - Maximum time an update waits in the buffer
+ * @returns {{markCompleted: Function, markFailed: Function, flush: Function}} flush() resolves
+ *   with the updates ({ id, status }) that could not be written since the previous flush()
+ */
+function createStatusUpdateBuffer({ flushSize = 50, flushIntervalMs = 1000 } = {}) {
+  let pending = [];
+  let flushTimer = null;
+  let writes = Promise.resolve();
+  let unwritten = [];
+
+  const writeBatch = async (batch) => {
+    for (let attempt = 1; attempt <= 2; attempt++) {
+      try {
+        await prisma.$transaction(batch.map(statusUpdate));
+        return;
+      } catch (error) {
+        console.error(`❌ [DEBUG] Failed to write ${batch.length} queue status updates (attempt ${attempt}/2):`, error.message);
+      }
+    }
+
+    for (const update of batch) {
+      try {
+        await statusUpdate(update);
+      } catch (error) {
+        console.error(`❌ [DEBUG] Failed to write status '${update.data.status}' for queue entry ${update.id}:`, error.message);
+        unwritten.push({ id: update.id, status: update.data.status });
+      }
+    }
+  };
+
+  const sendPending = () => {
+    if (flushTimer) {
+      clearTimeout(flushTimer);
+      flushTimer = null;
+    }
+
+    const batch = pending;
+    pending = [];
+    if (batch.length > 0) {
+      writes = writes.then(() => writeBatch(batch));
+    }
+  };
+
+  const flush = () => {
+    sendPending();
+    return writes.then(() => {
+      const failed = unwritten;
+      unwritten = [];
+      return failed;
+    });
+  };
+
+  const enqueue = (id, data) => {
+    pending.push({ id, data });
+    if (pending.length >= flushSize) {
+      sendPending();
+    } else if (!flushTimer) {
+      flushTimer = setTimeout(sendPending, flushIntervalMs);
+    }
+  };
+
+  return {
+    markCompleted: (id, processedData, { filename, now = new Date() } = {}) =>
+      enqueue(id, completedData(processedData, filename, now)),
+    markFailed: (id, errorMessage, now = new Date()) =>
+      enqueue(id, failedData(errorMessage, now)),
+    flush
+  };
+}
+
+/**
+ * Count completions in the last hour, day and week with a single scan.
+ * @param {Date} [now] - Reference time
+ * @returns {Promise<{lastHour: number, lastDay: number, lastWeek: number}>}
+ */
+async function getCompletionCounts(now = new Date()) {
+  const oneHourAgo = new Date(now.getTime() - 60 * 60 * 1000);
+  const oneDayAgo = new Date(now.getTime() - 24 * 60 * 60 * 1000);
+  const oneWeekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
+
+  const [row] = await prisma.$queryRaw`
+    SELECT
+      COUNT(*) FILTER (WHERE completed_at >= ${oneHourAgo}) AS last_hour,
+      COUNT(*) FILTER (WHERE completed_at >= ${oneDayAgo}) AS last_day,
+      COUNT(*) AS last_week
+    FROM document_processing_queue
+    WHERE status = 'completed' AND completed_at >= ${oneWeekAgo}
+  `;
+
+  return {
+    lastHour: Number(row.last_hour),
+    lastDay: Number(row.last_day),
+    lastWeek: Number(row.last_week)
+  };
+}
+
+/**
+ * Parse a queue entry's processedData JSON, memoizing the result.
+ * The returned object is shared between callers and must not be mutated.
+ * @param {Object} entry - Queue entry with processedData (and ideally id/updatedAt)
+ * @returns {Object|null} Parsed data, or null when the entry has none
+ */
+function parseProcessedData(entry) {
+  if (!entry || !entry.processedData) {
+    return null;
+  }
+
+  if (entry.id === undefined || !entry.updatedAt) {
+    return JSON.parse(entry.processedData);
+  }
+
+  const key = `${entry.id}:${new Date(entry.updatedAt).getTime()}`;
+  const cached = processedDataCache.get(key);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  const parsed = JSON.parse(entry.processedData);
+  processedDataCache.set(key, parsed);
+  return parsed;
+}
+
+module.exports = {
+  QUEUE_WORK_ITEM_SELECT,
+  claimDocuments,
+  createBatchClaimer,
+  createStatusUpdateBuffer,
+  getCompletionCounts,
+  parseProcessedData
+};
@@ -32,12 +32,23 @@ class LibreOfficeSemaphore {
     }
 }
 
+let sharedInstance = null;
+
 class LibreOfficeService {
     constructor() {
         this.semaphore = new LibreOfficeSemaphore(2);
         this.setupCleanup();
     }
 
+    // One process-wide instance: the conversion semaphore only limits concurrency if it is
+    // shared, and every instance starts its own cleanup interval that is never cleared
+    static getSharedInstance() {
+        if (!sharedInstance) {
+            sharedInstance = new LibreOfficeService();
+        }
+        return sharedInstance;
+    }
+
     setupCleanup() {
         // Run cleanup every 5 minutes
         setInterval(() => this.cleanupProcesses(), 300000);
@@ -61,11 +72,12 @@ class LibreOfficeService {
         }
     }
 
+    // Each attempt runs under the shared semaphore (at most 2 conversions process-wide), which is
+    // released again before the retry backoff so waiting callers can convert in the meantime
     async convertToPdfWithRetry(inputPath, outputDir, maxRetries = 3) {
         for (let attempt = 1; attempt <= maxRetries; attempt++) {
             try {
-                const result = await this.convertToPdfSingle(inputPath, outputDir);
-                return result;
+                return await this.withSemaphore(() => this.convertToPdfSingle(inputPath, outputDir));
             } catch (error) {
                 console.error(`LibreOffice PDF conversion attempt ${attempt} failed:`, error.message);
                 
@@ -90,8 +102,7 @@ class LibreOfficeService {
     async convertToWordWithRetry(inputPath, outputDir, maxRetries = 3) {
         for (let attempt = 1; attempt <= maxRetries; attempt++) {
             try {
-                const result = await this.convertToWordSingle(inputPath, outputDir);
-                return result;
+                return await this.withSemaphore(() => this.convertToWordSingle(inputPath, outputDir));
             } catch (error) {
                 console.error(`LibreOffice Word conversion attempt ${attempt} failed:`, error.message);
                 
@@ -211,6 +222,15 @@ class LibreOfficeService {
         this.semaphore.release();
     }
 
+    async withSemaphore(task) {
+        await this.semaphore.acquire();
+        try {
+            return await task();
+        } finally {
+            this.semaphore.release();
+        }
+    }
+
     getStatus() {
         return {
             running: this.semaphore.running,
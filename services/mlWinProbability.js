@@ -1,9 +1,6 @@
-const { PrismaClient } = require('@prisma/client');
+const { prisma } = require('../config/database');
 const nlpService = require('./nlpService');
 
-// Use shared Prisma client instance
-const prisma = new PrismaClient();
-
 class WinProbabilityPredictor {
   constructor() {
     this.model = null;
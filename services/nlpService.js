@@ -1,4 +1,4 @@
-const axios = require('axios');
+const { httpClient } = require('../config/httpClient');
 const config = require('../config/env');
 
 class NLPService {
@@ -28,7 +28,7 @@ class NLPService {
       }
 
       console.log('🔍 Sending to OpenRouter for entity extraction:', text);
-      const response = await axios.post(`${this.baseURL}/chat/completions`, {
+      const response = await httpClient.post(`${this.baseURL}/chat/completions`, {
         model: "anthropic/claude-sonnet-4",
         messages: [
           {
@@ -86,7 +86,7 @@ Return valid JSON with:
       }
 
       console.log('🔍 Sending to OpenRouter for intent classification:', query);
-      const response = await axios.post(`${this.baseURL}/chat/completions`, {
+      const response = await httpClient.post(`${this.baseURL}/chat/completions`, {
         model: "anthropic/claude-sonnet-4",
         messages: [
           {
@@ -136,7 +136,7 @@ Return valid JSON:
 
   async expandTerms(terms) {
     try {
-      const response = await axios.post(`${this.baseURL}/chat/completions`, {
+      const response = await httpClient.post(`${this.baseURL}/chat/completions`, {
         model: "anthropic/claude-sonnet-4",
         messages: [{
           role: "user",
@@ -0,0 +1,192 @@
+const fs = require('fs-extra');
+const path = require('path');
+const FormData = require('form-data');
+const config = require('../config/env');
+const { postForm, isRetryableError, retryDelayMs } = require('../config/httpClient');
+const { TokenBucket } = require('../utils/rateLimiter');
+const { runWithConcurrency } = require('../utils/concurrency');
+
+// Optional upload rate cap; uploads only wait when the bucket is empty, so a slow
+// upload that already used up the interval is followed immediately by the next one
+const uploadRateLimiter = config.norshinRequestsPerSecond > 0
+  ? new TokenBucket(1, config.norshinRequestsPerSecond)
+  : null;
+
+// Set to true once the batch endpoint answers 404/405 so we stop probing it
+let batchEndpointUnsupported = false;
+
+const buildHeaders = (form) => {
+  const headers = { ...form.getHeaders() };
+  if (config.norshinApiKey) {
+    headers['X-API-Key'] = config.norshinApiKey;
+  }
+  return headers;
+};
+
+// Streams the file part straight from disk; the caller destroys the stream in a finally
+// block so a failed request (timeout, refused connection) doesn't leak the file descriptor
+const appendDocument = (form, filePath, originalName) => {
+  const stream = fs.createReadStream(filePath);
+  form.append('document', stream, {
+    filename: originalName || path.basename(filePath),
+    contentType: 'application/octet-stream'
+  });
+  return stream;
+};
+
+const appendOptions = (form, customPrompt, model) => {
+  if (customPrompt) {
+    form.append('customPrompt', customPrompt);
+  }
+  if (model) {
+    form.append('model', model);
+  }
+};
+
+// Transient failures (429/502/503/504, connection resets) are retried within the same call.
+// The file streams can't be replayed, so each attempt rebuilds the form from disk;
+// buildForm appends the parts and returns the streams it opened.
+const postFormWithRetries = async (url, buildForm, { timeout, responseType } = {}) => {
+  for (let attempt = 1; ; attempt++) {
+    if (uploadRateLimiter) {
+      await uploadRateLimiter.acquire();
+    }
+    const form = new FormData();
+    const streams = buildForm(form);
+    try {
+      return await postForm(url, form, { headers: buildHeaders(form), timeout, responseType });
+    } catch (error) {
+      if (attempt > config.norshinUploadRetries || !isRetryableError(error)) {
+        throw error;
+      }
+      const delay = retryDelayMs(error, attempt);
+      if (delay === null) {
+        throw error;
+      }
+      console.warn(`⚠️ [DEBUG] Norshin upload failed (${error.response?.status || error.code}), retry ${attempt}/${config.norshinUploadRetries} in ${delay}ms`);
+      await new Promise(resolve => setTimeout(resolve, delay));
+    } finally {
+      streams.forEach(stream => stream.destroy());
+    }
+  }
+};
+
+const singleDocumentForm = (filePath, originalName, customPrompt, model) => (form) => {
+  const stream = appendDocument(form, filePath, originalName);
+  appendOptions(form, customPrompt, model);
+  return [stream];
+};
+
+// Send a single document to the Norshin API
+const sendToNorshinAPI = async (filePath, originalName, customPrompt = '', model = 'openai/gpt-4.1') => {
+  try {
+    const response = await postFormWithRetries(
+      config.norshinApiUrl,
+      singleDocumentForm(filePath, originalName, customPrompt, model),
+      { timeout: 120000 }
+    );
+
+    return response.data;
+  } catch (error) {
+    console.error('Norshin API Error:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Like sendToNorshinAPI, but resolves with the response ({ status, headers, data }) as soon
+// as headers arrive, data being the unparsed body stream. Multi-megabyte OCR results can
+// then be piped to the client without being parsed and re-serialized in this process.
+const streamFromNorshinAPI = async (filePath, originalName, customPrompt = '', model = 'openai/gpt-4.1') => {
+  try {
+    return await postFormWithRetries(
+      config.norshinApiUrl,
+      singleDocumentForm(filePath, originalName, customPrompt, model),
+      { timeout: 120000, responseType: 'stream' }
+    );
+  } catch (error) {
+    console.error('Norshin API Error:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Uploads are network-bound, so up to norshinMaxParallel run at once; the upload rate
+// limiter in postFormWithRetries still applies to each of them. Results keep input order.
+const sendDocumentsIndividually = async (documents, customPrompt, model) => {
+  const settled = await runWithConcurrency(
+    documents.map(doc => () => sendToNorshinAPI(doc.filePath, doc.originalName, customPrompt, model)),
+    config.norshinMaxParallel
+  );
+  return settled.map((outcome, index) => (outcome.status === 'fulfilled'
+    ? { filename: documents[index].originalName, success: true, result: outcome.value }
+    : {
+      filename: documents[index].originalName,
+      success: false,
+      error: outcome.reason.response?.data?.error || outcome.reason.message
+    }));
+};
+
+// Send up to norshinBatchSize documents in one multipart request.
+// Falls back to one request per document when no batch endpoint is configured
+// or the endpoint answers 404/405.
+const sendBatchToNorshinAPI = async (documents, customPrompt = '', model = 'openai/gpt-4.1') => {
+  if (!documents || documents.length === 0) {
+    return [];
+  }
+
+  if (!config.norshinBatchApiUrl || batchEndpointUnsupported) {
+    return sendDocumentsIndividually(documents, customPrompt, model);
+  }
+
+  const results = [];
+  const batchSize = config.norshinBatchSize;
+
+  for (let i = 0; i < documents.length; i += batchSize) {
+    const batch = documents.slice(i, i + batchSize);
+
+    if (batchEndpointUnsupported) {
+      results.push(...await sendDocumentsIndividually(batch, customPrompt, model));
+      continue;
+    }
+
+    try {
+      console.log(`📦 [DEBUG] Sending ${batch.length} documents to Norshin batch endpoint`);
+      const response = await postFormWithRetries(config.norshinBatchApiUrl, (form) => {
+        const streams = batch.map(doc => appendDocument(form, doc.filePath, doc.originalName));
+        appendOptions(form, customPrompt, model);
+        return streams;
+      }, { timeout: 120000 * batch.length });
+
+      const batchResults = Array.isArray(response.data) ? response.data : (response.data?.results || []);
+      batch.forEach((doc, index) => {
+        const result = batchResults[index];
+        results.push(result
+          ? { filename: doc.originalName, success: !result.error, result }
+          : { filename: doc.originalName, success: false, error: 'Missing result in batch response' });
+      });
+    } catch (error) {
+      const status = error.response?.status;
+      if (status === 404 || status === 405) {
+        console.warn(`⚠️ [DEBUG] Norshin batch endpoint not available (HTTP ${status}), falling back to single uploads`);
+        batchEndpointUnsupported = true;
+        results.push(...await sendDocumentsIndividually(batch, customPrompt, model));
+      } else {
+        console.error('Norshin batch API Error:', error.response?.data || error.message);
+        batch.forEach(doc => {
+          results.push({
+            filename: doc.originalName,
+            success: false,
+            error: error.response?.data?.error || error.message
+          });
+        });
+      }
+    }
+  }
+
+  return results;
+};
+
+module.exports = {
+  sendToNorshinAPI,
+  streamFromNorshinAPI,
+  sendBatchToNorshinAPI
+};
@@ -317,7 +317,7 @@ class OpportunityMatchingService {
 
       await Promise.all(matchPromises);
       
-      logger.info(`Processed opportunity matches for contract ${contractId}`);
+      logger.info('Processed opportunity matches for contract %s', contractId);
     } catch (error) {
       logger.error('Error processing new contract:', error);
       throw error;
@@ -6,13 +6,27 @@ const path = require('path');
 const PDFDocument = require('pdfkit');
 const LibreOfficeService = require('./libreoffice.service');
 
+// Scratch space for proposal exports; created on first export and reused afterwards
+const EXPORT_TEMP_DIR = path.join(__dirname, '..', 'temp');
+const EXPORT_OUTPUT_DIR = path.join(EXPORT_TEMP_DIR, 'output');
+let exportDirsReady = null;
+const ensureExportDirs = () => {
+  if (!exportDirsReady) {
+    exportDirsReady = fs.ensureDir(EXPORT_OUTPUT_DIR).catch(error => {
+      exportDirsReady = null;
+      throw error;
+    });
+  }
+  return exportDirsReady;
+};
+
 class ProposalDraftingService {
   constructor() {
     this.aiService = AIService;
     this.pool = new Pool({
       connectionString: process.env.DATABASE_URL
     });
-    this.libreOfficeService = new LibreOfficeService();
+    this.libreOfficeService = LibreOfficeService.getSharedInstance();
   }
 
   async parseRFPDocument(userId, contractId, filePath) {
@@ -150,7 +164,7 @@ class ProposalDraftingService {
           }
         });
       } catch (error) {
-        logger.error(`Error generating section ${section.title}:`, error);
+        logger.error('Error generating section %s:', section.title, error);
         proposalSections.push({
           id: `section_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
           title: section.title,
@@ -495,10 +509,9 @@ class ProposalDraftingService {
       }
 
       // Create temporary directories
-      const tempDir = path.join(__dirname, '..', 'temp');
-      const outputDir = path.join(tempDir, 'output');
-      await fs.ensureDir(tempDir);
-      await fs.ensureDir(outputDir);
+      const tempDir = EXPORT_TEMP_DIR;
+      const outputDir = EXPORT_OUTPUT_DIR;
+      await ensureExportDirs();
 
       // Build content from sections
       let content = `# ${proposal.title}\n\n`;
@@ -517,33 +530,27 @@ class ProposalDraftingService {
       console.log(`📄 [DEBUG] Content file created: ${contentFilePath}`);
 
       // Use LibreOffice service to convert content to PDF
-      await this.libreOfficeService.acquireSemaphore();
+      // The semaphore is held per conversion attempt only, not while reading the output
+      await this.libreOfficeService.convertToPdfWithRetry(contentFilePath, outputDir);
       
-      try {
-        await this.libreOfficeService.convertToPdfWithRetry(contentFilePath, outputDir);
-        
-        // Read the generated PDF file
-        const pdfFileName = contentFileName.replace('.txt', '.pdf');
-        const pdfFilePath = path.join(outputDir, pdfFileName);
-        
-        if (!await fs.pathExists(pdfFilePath)) {
-          throw new Error('PDF file was not generated by LibreOffice');
-        }
-        
-        const pdfBuffer = await fs.readFile(pdfFilePath);
-        
-        console.log(`📄 [DEBUG] LibreOffice PDF generated successfully, size: ${pdfBuffer.length} bytes`);
-        
-        // Cleanup temporary files
-        await fs.remove(contentFilePath);
-        await fs.remove(pdfFilePath);
-        
-        return pdfBuffer;
-        
-      } finally {
-        this.libreOfficeService.releaseSemaphore();
+      // Read the generated PDF file
+      const pdfFileName = contentFileName.replace('.txt', '.pdf');
+      const pdfFilePath = path.join(outputDir, pdfFileName);
+      
+      if (!await fs.pathExists(pdfFilePath)) {
+        throw new Error('PDF file was not generated by LibreOffice');
       }
       
+      const pdfBuffer = await fs.readFile(pdfFilePath);
+      
+      console.log(`📄 [DEBUG] LibreOffice PDF generated successfully, size: ${pdfBuffer.length} bytes`);
+      
+      // Cleanup temporary files
+      await fs.remove(contentFilePath);
+      await fs.remove(pdfFilePath);
+      
+      return pdfBuffer;
+      
     } catch (error) {
       console.error(`❌ [DEBUG] LibreOffice PDF generation error:`, error);
       throw new Error(`PDF generation failed: ${error.message}`);
@@ -570,10 +577,9 @@ class ProposalDraftingService {
       }
 
       // Create temporary directories
-      const tempDir = path.join(__dirname, '..', 'temp');
-      const outputDir = path.join(tempDir, 'output');
-      await fs.ensureDir(tempDir);
-      await fs.ensureDir(outputDir);
+      const tempDir = EXPORT_TEMP_DIR;
+      const outputDir = EXPORT_OUTPUT_DIR;
+      await ensureExportDirs();
 
       // Build content from sections
       let content = `# ${proposal.title}\n\n`;
@@ -592,33 +598,27 @@ class ProposalDraftingService {
       console.log(`📄 [DEBUG] Content file created: ${contentFilePath}`);
 
       // Use LibreOffice service to convert content to DOCX
-      await this.libreOfficeService.acquireSemaphore();
+      // The semaphore is held per conversion attempt only, not while reading the output
+      await this.libreOfficeService.convertToWordWithRetry(contentFilePath, outputDir);
       
-      try {
-        await this.libreOfficeService.convertToWordWithRetry(contentFilePath, outputDir);
-        
-        // Read the generated DOCX file
-        const docxFileName = contentFileName.replace('.txt', '.docx');
-        const docxFilePath = path.join(outputDir, docxFileName);
-        
-        if (!await fs.pathExists(docxFilePath)) {
-          throw new Error('DOCX file was not generated by LibreOffice');
-        }
-        
-        const docxBuffer = await fs.readFile(docxFilePath);
-        
-        console.log(`📄 [DEBUG] LibreOffice DOCX generated successfully, size: ${docxBuffer.length} bytes`);
-        
-        // Cleanup temporary files
-        await fs.remove(contentFilePath);
-        await fs.remove(docxFilePath);
-        
-        return docxBuffer;
-        
-      } finally {
-        this.libreOfficeService.releaseSemaphore();
+      // Read the generated DOCX file
+      const docxFileName = contentFileName.replace('.txt', '.docx');
+      const docxFilePath = path.join(outputDir, docxFileName);
+      
+      if (!await fs.pathExists(docxFilePath)) {
+        throw new Error('DOCX file was not generated by LibreOffice');
       }
       
+      const docxBuffer = await fs.readFile(docxFilePath);
+      
+      console.log(`📄 [DEBUG] LibreOffice DOCX generated successfully, size: ${docxBuffer.length} bytes`);
+      
+      // Cleanup temporary files
+      await fs.remove(contentFilePath);
+      await fs.remove(docxFilePath);
+      
+      return docxBuffer;
+      
     } catch (error) {
       console.error(`❌ [DEBUG] LibreOffice DOCX generation error:`, error);
       throw new Error(`DOCX generation failed: ${error.message}`);
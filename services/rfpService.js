@@ -1,6 +1,7 @@
 const { prisma } = require('../config/database');
-const vectorService = require('./vectorService');
+const vectorService = require('./vectorService').getSharedInstance();
 const summaryService = require('./summaryService');
+const { parseProcessedData } = require('./documentQueueService');
 
 /**
  * RFP Auto-Fill Service
@@ -33,7 +34,8 @@ class RFPService {
           contractNoticeId: contractId,
           status: 'completed',
           processedData: { not: null }
-        }
+        },
+        select: { id: true, filename: true, processedData: true, updatedAt: true }
       });
 
       // Combine all content for analysis
@@ -258,7 +260,8 @@ Description: ${contract.description || 'N/A'}
       content += '\n\nDocument Content:\n';
       processedDocs.forEach((doc, index) => {
         try {
-          const docData = JSON.parse(doc.processedData);
+          // Memoized by id + updatedAt, so repeat analyses of a contract reuse the parsed data
+          const docData = parseProcessedData(doc);
           content += `\nDocument ${index + 1} (${doc.filename}):\n${docData.content || docData.summary || 'No content available'}\n`;
         } catch (parseError) {
           console.warn(`Could not parse document data for ${doc.filename}`);
@@ -0,0 +1,195 @@
+const { httpClient } = require('../config/httpClient');
+const config = require('../config/env');
+const { TokenBucket } = require('../utils/rateLimiter');
+const { LruCache } = require('../utils/lruCache');
+
+const SAM_GOV_SEARCH_URL = 'https://api.sam.gov/opportunities/v2/search';
+const SAM_GOV_TIMEOUT_MS = 30000;
+const SAM_GOV_RETRIES = 3;
+
+// Built once: every call reuses these headers and the shared keep-alive agents in
+// httpClient, so paginated fetches skip a TCP+TLS handshake per page
+const samGovHeaders = {
+  'Accept': 'application/json',
+  'User-Agent': 'ContractIndexer/1.0'
+};
+
+// The Opportunities API authenticates with the api_key query parameter. It is appended
+// only to the request URL, so the key stays out of cache keys and retry log lines
+const samGovKeyParam = `&api_key=${encodeURIComponent(config.samGovApiKey || '')}`;
+
+// SAM.gov throttles per key; callers only wait once the burst allowance is used up
+const samGovRateLimiter = new TokenBucket(
+  Math.max(1, Math.ceil(config.samGovRequestsPerSecond)),
+  config.samGovRequestsPerSecond
+);
+
+// Search responses keyed by request URL; re-indexing runs and dashboard refreshes
+// repeat the same windows, and a cached hit also skips the rate limiter
+const RESPONSE_CACHE_TTL_MS = 5 * 60 * 1000;
+const RESPONSE_CACHE_SIZE = 256;
+const responseCache = new LruCache(RESPONSE_CACHE_SIZE, { ttlMs: RESPONSE_CACHE_TTL_MS });
+
+// Requests currently on the wire, keyed like the cache; concurrent identical searches
+// share one HTTP call (and one rate-limiter token) instead of each issuing their own
+const inFlightRequests = new Map(); // key -> Promise<data>
+
+/**
+ * Drop all cached SAM.gov responses.
+ */
+function clearCache() {
+  responseCache.clear();
+}
+
+/**
+ * Format a date the way SAM.gov expects it (MM/dd/yyyy).
+ * @param {Date} date
+ * @returns {string}
+ */
+function formatDateForSAM(date) {
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  const year = date.getFullYear();
+  return `${month}/${day}/${year}`;
+}
+
+// SAM.gov dates: 'yyyy-MM-dd' in search results, 'MM-dd-yyyy' / 'MM/dd/yyyy' elsewhere,
+// either optionally followed by a time and zone
+const ISO_DATE_RE = /^(\d{4})-(\d{2})-(\d{2})/;
+const US_DATE_RE = /^(\d{2})[-/](\d{2})[-/](\d{4})/;
+const TIME_SUFFIX_RE = /^[T ]\d{2}:\d{2}/;
+
+/**
+ * Normalize a SAM.gov date for the posted_date timestamp column.
+ * Date-only values are sliced to 'yyyy-MM-dd' rather than parsed through Date, so they
+ * can't shift by a day with the server's time zone. Values that carry a time of day keep
+ * it: only those are parsed into a Date, which stores the same instant as before.
+ * @param {string} value
+ * @returns {string|Date|null} 'yyyy-MM-dd', a Date for timestamps, or null when missing or unrecognized
+ */
+function parseSamDate(value) {
+  if (!value) return null;
+
+  let date = null;
+  let match = ISO_DATE_RE.exec(value);
+  if (match) {
+    date = `${match[1]}-${match[2]}-${match[3]}`;
+  } else {
+    match = US_DATE_RE.exec(value);
+    if (match) date = `${match[3]}-${match[1]}-${match[2]}`;
+  }
+
+  if (date && TIME_SUFFIX_RE.test(value.slice(10))) {
+    const timestamp = new Date(value);
+    if (!Number.isNaN(timestamp.getTime())) return timestamp;
+  }
+  return date;
+}
+
+/**
+ * Search SAM.gov contract opportunities.
+ * Transient failures (429/502/503/504, connection resets) are retried with backoff.
+ * Responses are cached for five minutes per parameter set and concurrent identical
+ * searches share one request; callers must not mutate the returned data.
+ * @param {Object} options
+ * @param {number} [options.limit=100] - Page size (SAM.gov caps this at 1000)
+ * @param {number} [options.offset=0] - Page offset
+ * @param {Date} [options.postedFrom] - Earliest posted date
+ * @param {Date} [options.postedTo] - Latest posted date
+ * @returns {Promise<Object>} Raw SAM.gov response body (opportunitiesData, totalRecords, ...)
+ */
+async function searchOpportunities({ limit = 100, offset = 0, postedFrom, postedTo } = {}) {
+  // Every search has this one shape, so the query string is built directly instead of
+  // going through axios' generic params serializer; it doubles as the cache key
+  // (limit and offset may arrive as strings from request bodies, hence the parseInt)
+  let url = `${SAM_GOV_SEARCH_URL}?limit=${Math.min(parseInt(limit) || 100, 1000)}&offset=${parseInt(offset) || 0}`;
+  if (postedFrom) url += `&postedFrom=${encodeURIComponent(formatDateForSAM(postedFrom))}`;
+  if (postedTo) url += `&postedTo=${encodeURIComponent(formatDateForSAM(postedTo))}`;
+
+  const cacheKey = url;
+  const cached = responseCache.get(cacheKey);
+  if (cached) {
+    return cached;
+  }
+
+  if (inFlightRequests.has(cacheKey)) {
+    return inFlightRequests.get(cacheKey);
+  }
+
+  const request = (async () => {
+    await samGovRateLimiter.acquire();
+    const response = await httpClient.get(url + samGovKeyParam, {
+      headers: samGovHeaders,
+      timeout: SAM_GOV_TIMEOUT_MS,
+      retries: SAM_GOV_RETRIES,
+      // Retries are requests too, so each one waits for its own token
+      beforeRetry: () => samGovRateLimiter.acquire()
+    });
+    responseCache.set(cacheKey, response.data);
+    return response.data;
+  })();
+
+  inFlightRequests.set(cacheKey, request);
+  try {
+    return await request;
+  } finally {
+    inFlightRequests.delete(cacheKey);
+  }
+}
+
+// Mapped pages keyed by the raw response object; cached responses are shared, so a
+// cache hit reuses the mapped rows instead of walking the opportunities again
+const mappedPages = new WeakMap();
+
+// Only the fields stored on a contract; the rest of the opportunity payload is dropped
+const toContractRow = ({
+  noticeId,
+  title,
+  description,
+  fullParentPathName,
+  naicsCode,
+  classificationCode,
+  postedDate,
+  typeOfSetAsideCode,
+  resourceLinks
+}) => ({
+  noticeId,
+  title,
+  description,
+  agency: fullParentPathName,
+  naicsCode,
+  classificationCode,
+  postedDate: parseSamDate(postedDate),
+  setAsideCode: typeOfSetAsideCode,
+  resourceLinks: resourceLinks || []
+});
+
+/**
+ * Search SAM.gov and map the page to contract rows in one pass.
+ * Opportunities without a noticeId are skipped and repeated notices collapse to the last one.
+ * @param {Object} options - Same as searchOpportunities
+ * @returns {Promise<{contracts: Array<Object>, totalRecords: number}>}
+ */
+async function fetchContractPage(options) {
+  const data = await searchOpportunities(options);
+  let page = mappedPages.get(data);
+  if (!page) {
+    const contracts = new Map();
+    for (const opportunity of data.opportunitiesData || []) {
+      if (opportunity.noticeId) {
+        contracts.set(opportunity.noticeId, toContractRow(opportunity));
+      }
+    }
+    page = { contracts: [...contracts.values()], totalRecords: data.totalRecords || 0 };
+    mappedPages.set(data, page);
+  }
+  return page;
+}
+
+module.exports = {
+  fetchContractPage,
+  searchOpportunities,
+  clearCache,
+  formatDateForSAM,
+  parseSamDate
+};
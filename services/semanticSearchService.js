@@ -6,17 +6,18 @@ const logger = require('../utils/logger');
 class SemanticSearchService {
   constructor() {
     this.aiService = AIService;
-    this.vectorService = new VectorService();
+    this.vectorService = VectorService.getSharedInstance();
     this.pool = new Pool({
       connectionString: process.env.DATABASE_URL
     });
-    // Pass vector service to AI service for local embeddings
-    this.aiService.vectorService = this.vectorService;
   }
 
   async initialize() {
     try {
-      await this.vectorService.initialize();
+      // The shared instance is usually already initialized at server startup
+      if (!this.vectorService.isConnected) {
+        await this.vectorService.initialize();
+      }
       logger.info('Vector service initialized successfully');
     } catch (error) {
       logger.warn('Vector service initialization failed:', error.message);
@@ -51,7 +52,7 @@ class SemanticSearchService {
 
       await this.pool.query(query, [contractId, JSON.stringify(embedding), summary, JSON.stringify(metadata)]);
       
-      logger.info(`Contract ${contractId} indexed successfully`);
+      logger.info('Contract %s indexed successfully', contractId);
       return { success: true, summary };
     } catch (error) {
       logger.error('Error indexing contract:', error);
@@ -68,7 +69,7 @@ class SemanticSearchService {
         userId = null
       } = options;
 
-      logger.info(`Starting semantic search for: "${queryText}"`);
+      logger.info('Starting semantic search for: "%s"', queryText);
 
       // Use vector service for semantic search
       if (this.vectorService && this.vectorService.isConnected) {
@@ -81,7 +82,7 @@ class SemanticSearchService {
             filters
           });
 
-          logger.info(`Vector search returned ${results.length} results`);
+          logger.info('Vector search returned %s results', results.length);
 
           // If vector search returns results, use them
           if (results.length > 0) {
@@ -233,11 +234,10 @@ class SemanticSearchService {
     try {
       const { limit = 20, filters = {} } = options;
       
-      logger.info(`Performing keyword search for: "${queryText}"`);
+      logger.info('Performing keyword search for: "%s"', queryText);
       
-      // Use Prisma for database queries instead of raw SQL
-      const { PrismaClient } = require('@prisma/client');
-      const prisma = new PrismaClient();
+      // Use Prisma for database queries instead of raw SQL (shared client, no per-call connect)
+      const { prisma } = require('../config/database');
       
       try {
         // Build search conditions using keywords from query
@@ -296,9 +296,7 @@ class SemanticSearchService {
           }
         });
 
-        await prisma.$disconnect();
-
-        logger.info(`Keyword search found ${contracts.length} results`);
+        logger.info('Keyword search found %s results', contracts.length);
         
         if (contracts.length === 0) {
           // Return all contracts if no specific matches
@@ -397,7 +395,6 @@ class SemanticSearchService {
         };
       } catch (prismaError) {
         logger.error('Prisma keyword search failed:', prismaError);
-        await prisma.$disconnect();
         // Don't throw, just return empty with error indication
         return {
           results: [],
@@ -549,7 +546,7 @@ class SemanticSearchService {
       // If we have real semantic results, just return them with the correct search type
       // The vector search is working well, so we don't need to complicate it
       if (semanticResults.searchType === 'semantic' && semanticResults.results.length > 0) {
-        logger.info(`Hybrid search returning ${semanticResults.results.length} semantic results`);
+        logger.info('Hybrid search returning %s semantic results', semanticResults.results.length);
         return {
           ...semanticResults,
           searchType: 'semantic'
@@ -1,11 +1,67 @@
 const fs = require('fs-extra');
 const path = require('path');
+const crypto = require('crypto');
 const config = require('../config/env');
 const documentAnalyzer = require('../utils/documentAnalyzer');
 
 // Import your PDF processing service
 const pdfService = require('./summaryService.js'); // Adjust path as needed
-const axios = require('axios');
+const { downloadToBuffer } = require('../config/httpClient');
+const LibreOfficeService = require('./libreoffice.service');
+const { LruCache } = require('../utils/lruCache');
+
+// Downloads stay in memory; this directory is only needed when a file must go to disk
+const DOWNLOAD_TEMP_DIR = './temp_downloads';
+let downloadTempDirReady = null;
+const ensureDownloadTempDir = () => {
+  if (!downloadTempDirReady) {
+    downloadTempDirReady = fs.ensureDir(DOWNLOAD_TEMP_DIR).catch(error => {
+      downloadTempDirReady = null;
+      throw error;
+    });
+  }
+  return downloadTempDirReady;
+};
+
+// Date.now() alone collides when workers start on same-named files in the same millisecond,
+// so temp names carry a per-process sequence number as well
+let tempNameSeq = 0;
+const uniqueTempStamp = () => `${Date.now()}_${(tempNameSeq++).toString(36)}`;
+
+// Summaries keyed by sha256 of the document bytes + prompt/model, so amendments and
+// attachments shared between contracts are only extracted and summarized once
+const SUMMARY_CACHE_SIZE = 200;
+const summaryCache = new LruCache(SUMMARY_CACHE_SIZE);
+
+// URL -> { etag, lastModified, hash } so unchanged downloads can be answered with a 304
+const URL_CACHE_SIZE = 1000;
+const urlValidators = new LruCache(URL_CACHE_SIZE);
+
+const summaryCacheKey = (contentHash, customPrompt, model) => crypto
+  .createHash('sha256')
+  .update(`${contentHash}\u0000${model}\u0000${customPrompt}`)
+  .digest('hex');
+
+// Swap the extension for the one matching the detected document type, keeping the contractId_ prefix
+const correctFilename = (originalName, correctExtension) => (originalName.includes('_') ?
+  originalName.split('_')[0] + '_' + originalName.split('_').slice(1).join('_').replace(/\.[^/.]+$/, '') + correctExtension :
+  originalName.replace(/\.[^/.]+$/, '') + correctExtension);
+
+// Add correctedFilename if needed (keeping original Norshin logic)
+const withCorrectedFilename = (data, filePathOrUrl, properFilename) => {
+  if (properFilename !== (filePathOrUrl.startsWith('http') ? filePathOrUrl.split('/').pop() : filePathOrUrl)) {
+    data.correctedFilename = properFilename;
+  }
+  return data;
+};
+
+// The same bytes may arrive under another name, so cache entries keep the detected extension
+// and each hit derives correctedFilename from the name it was called with
+const fromCachedSummary = (cached, filePathOrUrl, originalName) => withCorrectedFilename(
+  { ...cached.result },
+  filePathOrUrl,
+  correctFilename(originalName, cached.correctExtension)
+);
 
 // Utility function to send file to Norshin API (now using local PDF processing)
 const summarizeContent = async (filePathOrUrl, originalName, customPrompt = '', model = 'openai/gpt-4.1') => {
@@ -13,33 +69,72 @@ const summarizeContent = async (filePathOrUrl, originalName, customPrompt = '',
     let fileBuffer;
     let tempFilePath = null;
     let pdfPath = filePathOrUrl;
+    let responseHeaders = null;
     
     // Check if it's a URL or local file path
     if (filePathOrUrl.startsWith('http://') || filePathOrUrl.startsWith('https://')) {
       // Download the file from URL
-      const tempDir = './temp_downloads';
-      await fs.ensureDir(tempDir);
+      tempFilePath = path.join(DOWNLOAD_TEMP_DIR, `download_${uniqueTempStamp()}_${originalName}`);
       
-      tempFilePath = path.join(tempDir, `download_${Date.now()}_${originalName}`);
-      
-      const response = await axios.get(filePathOrUrl, {
-        responseType: 'arraybuffer',
-        timeout: 60000, // Reduced timeout
-        headers: {
-          'User-Agent': 'Mozilla/5.0 (compatible; ContractIndexer/1.0)',
-          'Accept': '*/*'
+      const headers = {
+        'User-Agent': 'Mozilla/5.0 (compatible; ContractIndexer/1.0)',
+        'Accept': '*/*'
+      };
+
+      // Revalidate instead of re-downloading when we already summarized this URL
+      const validators = urlValidators.get(filePathOrUrl);
+      const conditional = validators && summaryCache.get(summaryCacheKey(validators.hash, customPrompt, model));
+      if (conditional) {
+        if (validators.etag) headers['If-None-Match'] = validators.etag;
+        if (validators.lastModified) headers['If-Modified-Since'] = validators.lastModified;
+      }
+
+      let response;
+      try {
+        response = await downloadToBuffer(filePathOrUrl, {
+          timeout: 60000, // Reduced timeout
+          headers,
+          probe: !conditional
+        });
+      } catch (downloadError) {
+        if (conditional && downloadError.response?.status === 304) {
+          console.log(`♻️ [DEBUG] ${originalName} not modified, reusing cached summary`);
+          return fromCachedSummary(conditional, filePathOrUrl, originalName);
         }
-      });
+        throw downloadError;
+      }
 
-      fileBuffer = Buffer.from(response.data);
-      await fs.writeFile(tempFilePath, fileBuffer);
+      // Keep the download in memory; it is only written to tempFilePath when
+      // LibreOffice conversion or OCR needs a file on disk
+      fileBuffer = response.data;
       pdfPath = tempFilePath;
+      responseHeaders = response.headers;
     } else {
       // Read local file
-      if (!fs.existsSync(filePathOrUrl)) {
-        throw new Error(`File not found: ${filePathOrUrl}`);
+      try {
+        fileBuffer = await fs.readFile(filePathOrUrl);
+      } catch (readError) {
+        if (readError.code === 'ENOENT') {
+          throw new Error(`File not found: ${filePathOrUrl}`);
+        }
+        throw readError;
       }
-      fileBuffer = fs.readFileSync(filePathOrUrl);
+    }
+    
+    // Identical bytes with the same prompt/model always produce the same summary
+    const contentHash = crypto.createHash('sha256').update(fileBuffer).digest('hex');
+    const cacheKey = summaryCacheKey(contentHash, customPrompt, model);
+    if (responseHeaders && (responseHeaders.etag || responseHeaders['last-modified'])) {
+      urlValidators.set(filePathOrUrl, {
+        etag: responseHeaders.etag,
+        lastModified: responseHeaders['last-modified'],
+        hash: contentHash
+      });
+    }
+    const cachedSummary = summaryCache.get(cacheKey);
+    if (cachedSummary) {
+      console.log(`♻️ [DEBUG] Reusing cached summary for ${originalName} (sha256 ${contentHash.slice(0, 12)})`);
+      return fromCachedSummary(cachedSummary, filePathOrUrl, originalName);
     }
     
     // Quick document analysis
@@ -57,24 +152,24 @@ const summarizeContent = async (filePathOrUrl, originalName, customPrompt = '',
     
     // Generate correct filename
     const correctExtension = documentAnalyzer.getCorrectExtension(analysis.documentType, analysis.extension);
-    const properFilename = originalName.includes('_') ?
-      originalName.split('_')[0] + '_' + originalName.split('_').slice(1).join('_').replace(/\.[^/.]+$/, '') + correctExtension :
-      originalName.replace(/\.[^/.]+$/, '') + correctExtension;
-    
-    originalName = properFilename;
+    originalName = correctFilename(originalName, correctExtension);
     
     // Handle PDF conversion efficiently
     const fileExt = path.extname(pdfPath).toLowerCase();
     let finalPdfPath = pdfPath;
     
     if (fileExt !== '.pdf') {
-      const LibreOfficeService = require('./libreoffice.service');
-      const libreOfficeService = new LibreOfficeService();
+      if (tempFilePath) {
+        await ensureDownloadTempDir();
+        await fs.writeFile(tempFilePath, fileBuffer);
+      }
+      
+      const libreOfficeService = LibreOfficeService.getSharedInstance();
       
       const actualFileName = path.basename(pdfPath);
       const actualFileExt = path.extname(actualFileName);
       const actualBaseName = path.basename(actualFileName, actualFileExt);
-      const tempDir = path.join(process.cwd(), 'temp_summarization', `${Date.now()}_${actualBaseName}`);
+      const tempDir = path.join(process.cwd(), 'temp_summarization', `${uniqueTempStamp()}_${actualBaseName}`);
       await fs.ensureDir(tempDir);
       
       try {
@@ -103,7 +198,9 @@ const summarizeContent = async (filePathOrUrl, originalName, customPrompt = '',
     const extractResult = await pdfService.processPDF(finalPdfPath, {
       apiKey: process.env.REACT_APP_OPENROUTER_KEY,
       saveExtracted: false,
-      outputDir: null
+      outputDir: null,
+      // Skip re-reading the file we already hold in memory
+      buffer: finalPdfPath === pdfPath ? fileBuffer : null
     });
     
     // Clean up temp conversion directory if it was created
@@ -121,7 +218,7 @@ const summarizeContent = async (filePathOrUrl, originalName, customPrompt = '',
       throw new Error(`PDF extraction failed: ${extractResult.error}`);
     }
     
-    console.log(`✅ Extraction completed: ${extractResult.method}, ${extractResult.wordCount} words content, content:${extractResult.extractedContent}`);
+    console.log(`✅ Extraction completed: ${extractResult.method}, ${extractResult.wordCount} words content (${extractResult.extractedContent.length} chars)`);
     
     // Create enhanced prompt if custom prompt provided (keeping original Norshin logic)
     let contentToSummarize = extractResult.extractedContent;
@@ -139,7 +236,8 @@ const summarizeContent = async (filePathOrUrl, originalName, customPrompt = '',
       throw new Error(`Local summarization failed: ${summaryResult.error}`);
     }
     
-    console.log(`✅ [DEBUG] Local analysis completed successfully: ${JSON.stringify(summaryResult, null, 2) }`);
+    // Log the shape, not the whole result: pretty-printing multi-MB analyses on every document is pure CPU
+    console.log(`✅ [DEBUG] Local analysis completed successfully: ${Object.keys(summaryResult.result || {}).length} top-level sections`);
     
     // Clean up temp file if it was downloaded (keeping original Norshin logic)
     if (tempFilePath) {
@@ -153,13 +251,9 @@ const summarizeContent = async (filePathOrUrl, originalName, customPrompt = '',
     
     // Return the response data in the same format as original Norshin service
     const responseData = summaryResult.result;
+    summaryCache.set(cacheKey, { result: { ...responseData }, correctExtension });
     
-    // Add corrected filename if needed (keeping original Norshin logic)
-    if (originalName !== (filePathOrUrl.startsWith('http') ? filePathOrUrl.split('/').pop() : filePathOrUrl)) {
-      responseData.correctedFilename = originalName;
-    }
-    
-    return responseData;
+    return withCorrectedFilename(responseData, filePathOrUrl, originalName);
     
   } catch (error) {
     console.error('Norshin API Error:', error.response?.data || error.message);
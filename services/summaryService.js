@@ -1,13 +1,16 @@
 const pdf2table = require('pdf2table');
 const fs = require('fs-extra');
 const path = require('path');
-const axios = require('axios');
+const { httpClient } = require('../config/httpClient');
 
 // OCR dependencies
 const { createWorker, createScheduler } = require('tesseract.js');
 const { fromPath } = require('pdf2pic');
 const sharp = require('sharp');
 
+// Fast text-layer extraction used before falling back to OCR
+const textExtractor = require('../utils/textExtractor');
+
 // Load environment variables
 require('dotenv').config();
 
@@ -140,7 +143,8 @@ function formatTableContent(rows) {
 }
 
 // OCR Functions from your ocr-cli.js
-async function convertPdfToImages(pdfPath) {
+// pageNumbers: 1-based pages to rasterize, or -1 for the whole document
+async function convertPdfToImages(pdfPath, pageNumbers = -1) {
   const tempDir = './temp_images';
   await fs.ensureDir(tempDir);
   
@@ -155,7 +159,7 @@ async function convertPdfToImages(pdfPath) {
   };
   
   const convert = fromPath(pdfPath, options);
-  const pages = await convert.bulk(-1);
+  const pages = await convert.bulk(pageNumbers);
   return { pages, tempDir };
 }
 
@@ -178,7 +182,10 @@ function cleanTableText(text) {
     .trim();
 }
 
-async function runParallelOCR(pages, tempDir, workerCount = 8) {
+const formatPage = (pageNumber, text) => `\n--- Page ${pageNumber} ---\n${text}\n`;
+
+// OCR rasterized pages; resolves to [{ pageNumber, text }] in page order
+async function recognizePages(pages, tempDir, workerCount = 8) {
   const scheduler = createScheduler();
   const workerPromises = [];
   
@@ -209,7 +216,7 @@ async function runParallelOCR(pages, tempDir, workerCount = 8) {
         console.log(`✅ OCR completed page ${index + 1}/${pages.length}`);
         const cleanedText = cleanTableText(result.data.text);
         return {
-          pageNumber: index + 1,
+          pageNumber: page.page || index + 1,
           text: cleanedText
         };
       });
@@ -217,17 +224,17 @@ async function runParallelOCR(pages, tempDir, workerCount = 8) {
     
     const results = await Promise.all(ocrPromises);
     results.sort((a, b) => a.pageNumber - b.pageNumber);
-    
-    const allText = results.map(result =>
-      `\n--- Page ${result.pageNumber} ---\n${result.text}\n`
-    ).join('');
-    
-    return allText;
+    return results;
   } finally {
     await scheduler.terminate();
   }
 }
 
+async function runParallelOCR(pages, tempDir, workerCount = 8) {
+  const results = await recognizePages(pages, tempDir, workerCount);
+  return results.map(result => formatPage(result.pageNumber, result.text)).join('');
+}
+
 async function cleanupTempFiles(tempDir) {
   try {
     await fs.remove(tempDir);
@@ -237,26 +244,44 @@ async function cleanupTempFiles(tempDir) {
   }
 }
 
-async function processWithOCR(pdfPath) {
+// Rasterize and OCR the given pages (-1 for all); resolves to [{ pageNumber, text }] in page order
+async function ocrPageTexts(pdfPath, pageNumbers = -1) {
   try {
     console.log('🖼️ Converting PDF to images for OCR processing...');
-    const { pages, tempDir } = await convertPdfToImages(pdfPath);
+    const { pages, tempDir } = await convertPdfToImages(pdfPath, pageNumbers);
     
     const workerCount = Math.min(8, pages.length);
-    const extractedText = await runParallelOCR(pages, tempDir, workerCount);
+    const results = await recognizePages(pages, tempDir, workerCount);
     
     await cleanupTempFiles(tempDir);
     
-    return extractedText;
+    return results;
   } catch (error) {
     console.error('❌ OCR processing failed:', error.message);
     throw error;
   }
 }
 
+async function processWithOCR(pdfPath, pageNumbers = -1) {
+  const results = await ocrPageTexts(pdfPath, pageNumbers);
+  return results.map(result => formatPage(result.pageNumber, result.text)).join('');
+}
+
+// Count whitespace-separated words in one regex pass, without building a token array
+const WORD_RE = /\S+/g;
+function countWords(text) {
+  if (!text) return 0;
+  WORD_RE.lastIndex = 0;
+  let count = 0;
+  while (WORD_RE.exec(text) !== null) {
+    count++;
+  }
+  return count;
+}
+
 // Token estimation and splitting
 function estimateTokens(text) {
-  const words = text.split(/\s+/).length;
+  const words = countWords(text);
   return Math.ceil(words / 0.75);
 }
 
@@ -320,7 +345,7 @@ Structure the response as a JSON object with descriptive field names. Provide de
     const promptTokens = estimateTokens(prompt);
     console.log(`🔄 [DEBUG] Sending ${promptTokens.toLocaleString()} tokens to OpenRouter API with middle-out transform...`);
     
-    const response = await axios.post(url, {
+    const response = await httpClient.post(url, {
       model: 'openai/gpt-4.1',
       messages: [
         {
@@ -343,7 +368,8 @@ Structure the response as a JSON object with descriptive field names. Provide de
         'HTTP-Referer': 'https://your-app.com',
         'X-Title': 'Government Contract Attachment Analyzer'
       },
-      timeout: 180000 // Increased to 3 minutes for large documents with middle-out
+      timeout: 180000, // Increased to 3 minutes for large documents with middle-out
+      retries: 3 // Rate limits and gateway errors from OpenRouter are transient
     });
     
     console.log(`✅ [DEBUG] API response received, status: ${response.status}`);
@@ -392,7 +418,7 @@ Structure the response as a JSON object with descriptive field names. Provide de
 
     // Handle standard OpenAI API format
     if (!response.data.choices || !response.data.choices[0] || !response.data.choices[0].message) {
-      console.error('❌ Unexpected API response structure:', JSON.stringify(response.data, null, 2));
+      console.error('❌ Unexpected API response structure:', JSON.stringify(response.data));
       return {
         success: false,
         error: 'Invalid API response structure - missing choices array',
@@ -459,12 +485,85 @@ Structure the response as a JSON object with descriptive field names. Provide de
   }
 }
 
+// Extracted-text copies are written off the request path: writes are chained on a single
+// background promise and each output directory is created once, not per document
+const preparedOutputDirs = new Set();
+let extractedWriteChain = Promise.resolve();
+
+function saveExtractedContent(outputDir, pdfPath, suffix, content) {
+  const extractedPath = path.join(outputDir, `${path.basename(pdfPath, '.pdf')}${suffix}`);
+  extractedWriteChain = extractedWriteChain
+    .then(async () => {
+      if (!preparedOutputDirs.has(outputDir)) {
+        await fs.ensureDir(outputDir);
+        preparedOutputDirs.add(outputDir);
+      }
+      await fs.writeFile(extractedPath, content, 'utf8');
+    })
+    .catch(error => console.warn(`⚠️ Could not save extracted content to ${extractedPath}: ${error.message}`));
+}
+
+// Pages with fewer words than this in their text layer are treated as scanned/graphics-only
+const MIN_TEXT_LAYER_PAGE_WORDS = 20;
+
+// Read the embedded text layer; returns an empty result for scanned/broken PDFs
+async function extractTextLayer(buffer) {
+  try {
+    const { text, pageTexts, truncated } = await textExtractor.extractPdfText(buffer);
+    const trimmed = text.trim();
+    return { text: trimmed, wordCount: countWords(trimmed), pageTexts, truncated };
+  } catch (error) {
+    console.log(`⚠️ pdf-parse failed: ${error.message}`);
+    return { text: '', wordCount: 0, pageTexts: [], truncated: false };
+  }
+}
+
+// OCR only the pages without a usable text layer and merge them, in page order, with the text-layer pages.
+// Text-dense pages skip rasterization entirely; if no page has text, the whole (capped) document is OCR'd.
+async function ocrPagesWithoutText(pdfPath, textLayer) {
+  const pageTexts = textLayer.pageTexts;
+  const textPageNumbers = new Set();
+  pageTexts.forEach((pageText, index) => {
+    if (countWords(pageText) >= MIN_TEXT_LAYER_PAGE_WORDS) {
+      textPageNumbers.add(index + 1);
+    }
+  });
+
+  if (textPageNumbers.size === 0) {
+    // Fully scanned: OCR everything, but no further than the text-layer page cap
+    const cappedPages = textLayer.truncated
+      ? Array.from({ length: pageTexts.length }, (_, index) => index + 1)
+      : -1;
+    return processWithOCR(pdfPath, cappedPages);
+  }
+
+  const scannedPages = [];
+  for (let pageNumber = 1; pageNumber <= pageTexts.length; pageNumber++) {
+    if (!textPageNumbers.has(pageNumber)) {
+      scannedPages.push(pageNumber);
+    }
+  }
+
+  console.log(`🖼️ ${textPageNumbers.size}/${pageTexts.length} pages have a text layer, OCR'ing ${scannedPages.length} page(s)`);
+
+  // One slot per page, filled from the text layer or OCR, so the merged text stays in page order
+  const mergedPages = pageTexts.map((pageText, index) => textPageNumbers.has(index + 1) ? pageText : '');
+  if (scannedPages.length > 0) {
+    for (const { pageNumber, text } of await ocrPageTexts(pdfPath, scannedPages)) {
+      mergedPages[pageNumber - 1] = text;
+    }
+  }
+
+  return mergedPages.map((text, index) => formatPage(index + 1, text)).join('');
+}
+
 // Main PDF processing function with OCR fallback
 async function processPDF(pdfPath, options = {}) {
   const {
     apiKey = process.env.REACT_APP_OPENROUTER_KEY,
     saveExtracted = false,
-    outputDir = null
+    outputDir = null,
+    buffer: inputBuffer = null // Already-downloaded bytes; the file is only written to pdfPath if OCR needs it
   } = options;
   
   if (!apiKey) {
@@ -473,22 +572,67 @@ async function processPDF(pdfPath, options = {}) {
 
   console.log(`📄 Processing PDF: ${path.basename(pdfPath)}`);
   console.log(`📄 [DEBUG] Full PDF path: ${pdfPath}`);
-  console.log(`📄 [DEBUG] File size: ${fs.statSync(pdfPath).size} bytes`);
-  console.log(`📄 [DEBUG] File modified: ${fs.statSync(pdfPath).mtime}`);
+  // Read asynchronously so concurrent documents aren't stalled behind a large file
+  const buffer = inputBuffer || await fs.readFile(pdfPath);
+  console.log(`📄 [DEBUG] File size: ${buffer.length} bytes${inputBuffer ? ' (in memory)' : ''}`);
   const startTime = Date.now();
   
+  const buildResult = (method, content, wordCount, suffix) => {
+    // Save extracted content if requested
+    if (saveExtracted && outputDir) {
+      saveExtractedContent(outputDir, pdfPath, suffix, content);
+    }
+    
+    const chunks = splitContentByTokens(content, 100000);
+    const processingTime = ((Date.now() - startTime) / 1000).toFixed(2);
+    
+    return {
+      success: true,
+      method: method,
+      wordCount: wordCount,
+      chunks: chunks,
+      extractedContent: content,
+      processingTime: `${processingTime}s`
+    };
+  };
+  
   try {
-    const buffer = fs.readFileSync(pdfPath);
+    // The text layer is read at most once and shared by the fast path and OCR page selection
+    let textLayer = null;
+    const getTextLayer = async () => {
+      if (!textLayer) {
+        textLayer = await extractTextLayer(buffer);
+      }
+      return textLayer;
+    };
+    
+    // OCR rasterizes from disk, so in-memory input is written out only on that path
+    const runOCR = async () => {
+      if (inputBuffer && !(await fs.pathExists(pdfPath))) {
+        await fs.ensureDir(path.dirname(pdfPath));
+        await fs.writeFile(pdfPath, inputBuffer);
+      }
+      return ocrPagesWithoutText(pdfPath, await getTextLayer());
+    };
     
     return new Promise((resolve, reject) => {
       // First try pdf2table
       pdf2table.parse(buffer, async function (err, rows, rowsdebug) {
         try {
           if (err) {
-            console.log('❌ pdf2table failed, trying OCR fallback...');
+            console.log('❌ pdf2table failed, trying pdf-parse text layer...');
             
-            const ocrContent = await processWithOCR(pdfPath);
-            const wordCount = ocrContent.split(/\s+/).length;
+            const textLayer = await getTextLayer();
+            if (textLayer.wordCount >= 50) {
+              console.log(`📊 pdf-parse extracted ${textLayer.wordCount} words, skipping OCR`);
+              resolve(buildResult('pdf-parse', textLayer.text, textLayer.wordCount, '_extracted.txt'));
+              return;
+            }
+            
+            console.log('❌ pdf-parse found no usable text layer, trying OCR fallback...');
+            
+            const ocrContent = await runOCR();
+            const wordCount = countWords(ocrContent);
             
             console.log(`📊 OCR extracted ${wordCount} words`);
             
@@ -498,8 +642,7 @@ async function processPDF(pdfPath, options = {}) {
             
             // Save extracted content if requested
             if (saveExtracted && outputDir) {
-              const extractedPath = path.join(outputDir, `${path.basename(pdfPath, '.pdf')}_ocr_extracted.txt`);
-              fs.writeFileSync(extractedPath, ocrContent, 'utf8');
+              saveExtractedContent(outputDir, pdfPath, '_ocr_extracted.txt', ocrContent);
             }
             
             const chunks = splitContentByTokens(ocrContent, 100000);
@@ -520,17 +663,24 @@ async function processPDF(pdfPath, options = {}) {
           
           // pdf2table succeeded
           const extractedContent = formatTableContent(rows);
-          const wordCount = extractedContent.split(/\s+/).length;
+          const wordCount = countWords(extractedContent);
           const estimatedTokens = estimateTokens(extractedContent);
           
           console.log(`📊 pdf2table extracted ${wordCount} words, ${estimatedTokens.toLocaleString()} tokens`);
           
           // Check if we need OCR fallback (less than 100 words)
           if (wordCount < 100) {
+            const textLayer = await getTextLayer();
+            if (textLayer.wordCount >= 100 && textLayer.wordCount > wordCount * 2) {
+              console.log(`✅ Using pdf-parse content (${textLayer.wordCount} words vs ${wordCount} from pdf2table), skipping OCR`);
+              resolve(buildResult('pdf-parse (fallback)', textLayer.text, textLayer.wordCount, '_extracted.txt'));
+              return;
+            }
+            
             console.log(`⚠️ Low word count (${wordCount} < 100), switching to OCR processing...`);
             
-            const ocrContent = await processWithOCR(pdfPath);
-            const ocrWordCount = ocrContent.split(/\s+/).length;
+            const ocrContent = await runOCR();
+            const ocrWordCount = countWords(ocrContent);
             
             console.log(`📊 OCR extracted ${ocrWordCount} words (vs ${wordCount} from pdf2table)`);
             
@@ -539,8 +689,7 @@ async function processPDF(pdfPath, options = {}) {
               
               // Save extracted content if requested
               if (saveExtracted && outputDir) {
-                const extractedPath = path.join(outputDir, `${path.basename(pdfPath, '.pdf')}_ocr_extracted.txt`);
-                fs.writeFileSync(extractedPath, ocrContent, 'utf8');
+                saveExtractedContent(outputDir, pdfPath, '_ocr_extracted.txt', ocrContent);
               }
               
               const chunks = splitContentByTokens(ocrContent, 100000);
@@ -561,8 +710,7 @@ async function processPDF(pdfPath, options = {}) {
           // Continue with pdf2table content
           // Save extracted content if requested
           if (saveExtracted && outputDir) {
-            const extractedPath = path.join(outputDir, `${path.basename(pdfPath, '.pdf')}_extracted.txt`);
-            fs.writeFileSync(extractedPath, extractedContent, 'utf8');
+            saveExtractedContent(outputDir, pdfPath, '_extracted.txt', extractedContent);
           }
           
           const chunks = splitContentByTokens(extractedContent, 100000);
@@ -596,6 +744,7 @@ module.exports = {
   
   // Utility functions
   estimateTokens,
+  countWords,
   splitContentByTokens,
   
   // OCR functions
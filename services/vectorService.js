@@ -2,7 +2,210 @@ const { LocalIndex } = require('vectra');
 const { pipeline } = require('@xenova/transformers');
 const path = require('path');
 const fs = require('fs-extra');
-const config = require('../config/env');
+const { LruCache } = require('../utils/lruCache');
+
+// Flatten a processed result into "key: value" lines for embedding. String leaves only;
+// collected into one array and joined once instead of growing a string per field.
+// Repeated lines (page headers, footers, TOC entries) are kept once so they don't use up
+// the part of the text the model actually sees.
+const extractSearchableContent = (data) => {
+  if (!data) return '';
+  if (typeof data === 'string') return data;
+
+  const parts = [];
+  const seen = new Set();
+  const walk = (value, key) => {
+    if (typeof value === 'string') {
+      if (value.trim()) {
+        const part = key ? `${key}: ${value}` : value;
+        if (!seen.has(part)) {
+          seen.add(part);
+          parts.push(part);
+        }
+      }
+    } else if (Array.isArray(value)) {
+      for (const item of value) walk(item, key);
+    } else if (value && typeof value === 'object') {
+      for (const childKey of Object.keys(value)) walk(value[childKey], childKey);
+    }
+  };
+  walk(data, '');
+  return parts.join('\n');
+};
+
+// Contract fields embedded for search, in order; empty ones are skipped rather than
+// leaving stray separators that have to be trimmed off afterwards
+const CONTRACT_TEXT_FIELDS = ['title', 'description', 'agency'];
+const contractText = (contract) => {
+  let text = '';
+  for (const field of CONTRACT_TEXT_FIELDS) {
+    const value = contract[field];
+    if (value) text = text ? `${text} ${value}` : value;
+  }
+  return text;
+};
+
+// Search results show the start of a document; cut once at index time and stored as
+// metadata.preview so queries don't slice every hit's full text
+const DOCUMENT_PREVIEW_CHARS = 500;
+const documentPreview = text => (text.length > DOCUMENT_PREVIEW_CHARS ? `${text.slice(0, DOCUMENT_PREVIEW_CHARS)}...` : text);
+
+// Document text is stored so hits can be shown without reopening the file, but Vectra keeps
+// it in memory and in index.json; a multi-MB extraction is cut here and its length recorded
+const MAX_STORED_DOCUMENT_CHARS = 200000;
+
+// Vectra holds every item's metadata in memory and rewrites index.json on each update, so
+// fields a contract doesn't have are left out rather than stored as null or ''. Values keep
+// their native JSON types; nothing is coerced to strings.
+const compactMetadata = metadata => Object.fromEntries(
+  Object.entries(metadata).filter(([, value]) => value !== undefined && value !== null && value !== '')
+);
+
+// MiniLM sees at most 512 tokens and the pipeline truncates to that, so only a prefix of a
+// long document affects its embedding. Cutting the text first keeps multi-MB documents from
+// being tokenized in full; 8192 chars is comfortably past 512 word pieces for prose.
+const MAX_EMBEDDING_INPUT_CHARS = 8192;
+const embeddingInput = text => (text.length > MAX_EMBEDDING_INPUT_CHARS ? text.slice(0, MAX_EMBEDDING_INPUT_CHARS) : text);
+
+// Vectra ranks by cosine similarity, which ignores vector length, so a vector can be
+// rescaled to int8 range and rounded without storing the scale. Small integers serialize
+// to a few characters in index.json and stay unboxed in V8 arrays, unlike float64s.
+const quantizeEmbedding = (vector) => {
+  let maxAbs = 0;
+  for (const value of vector) maxAbs = Math.max(maxAbs, Math.abs(value));
+  if (!maxAbs) return vector;
+  const scale = 127 / maxAbs;
+  return vector.map(value => Math.round(value * scale));
+};
+
+// A vector Vectra can store and rank: same length as the rest of the batch, all numbers finite
+const isValidEmbedding = (vector, dims) => Array.isArray(vector) &&
+  vector.length === dims &&
+  vector.every(Number.isFinite);
+
+// Keyed by Vectra's item id so an item seen both in a listing and an insert is stored once
+const addToValueIndex = (byValue, value, item) => {
+  if (value === undefined || value === null) return;
+  let matches = byValue.get(value);
+  if (!matches) {
+    matches = new Map();
+    byValue.set(value, matches);
+  }
+  matches.set(item.id, item);
+};
+
+const toDocumentResult = item => ({
+  id: item.metadata.id,
+  score: 1,
+  metadata: item.metadata,
+  document: item.metadata.text
+});
+
+// Cosine similarity ranking over an already-filtered candidate list, in the same
+// { item, score } shape as LocalIndex.queryItems. Vectra stores each item's vector norm
+// when it is written, so repeated filtered searches only compute the dot products.
+const rankItems = (items, queryVector, topK) => {
+  let queryNorm = 0;
+  for (const value of queryVector) queryNorm += value * value;
+  queryNorm = Math.sqrt(queryNorm);
+
+  return items
+    .map(item => {
+      const vector = item.vector;
+      let dot = 0;
+      for (let i = 0; i < vector.length; i++) {
+        dot += vector[i] * queryVector[i];
+      }
+      let norm = item.norm;
+      if (norm === undefined) {
+        norm = 0;
+        for (const value of vector) norm += value * value;
+        norm = Math.sqrt(norm);
+      }
+      return { item, score: norm && queryNorm ? dot / (norm * queryNorm) : 0 };
+    })
+    .sort((a, b) => b.score - a.score)
+    .slice(0, topK);
+};
+
+// Query embeddings keyed by normalized query text. Paging and filter toggles repeat the
+// same query, and a hit skips a full model forward pass. MiniLM's tokenizer is uncased
+// and splits on whitespace, so trimming and lowercasing doesn't change the embedding.
+const QUERY_EMBEDDING_CACHE_SIZE = 1024;
+const queryEmbeddingCache = new LruCache(QUERY_EMBEDDING_CACHE_SIZE); // normalized query -> embedding
+
+// Raw index query results, reused for any later query whose embedding is within
+// QUERY_RESULT_SIMILARITY of a cached one (query embeddings are unit length, so the dot
+// product is the cosine). Rephrasings and refinements of a search skip the full scan of
+// the index. Entries expire after a TTL and are dropped whenever their index is written.
+const QUERY_RESULT_CACHE_SIZE = 1024;
+const QUERY_RESULT_CACHE_TTL_MS = 10 * 60 * 1000;
+const QUERY_RESULT_SIMILARITY = 0.92;
+
+// Cached query embeddings are held as int8 (unit-length components scaled by 127), an
+// eighth of the bytes of a JS number array, so the cache scan reads far less memory. The
+// live query stays float, which keeps the cosine error around 1e-3, well inside the
+// similarity margin. Memoized per embedding array: a repeated query from embedQuery maps
+// to the very same Int8Array.
+const INT8_EMBEDDING_SCALE = 127;
+const int8Embeddings = new WeakMap(); // embedding -> Int8Array
+
+const toInt8Embedding = (embedding) => {
+  let quantized = int8Embeddings.get(embedding);
+  if (!quantized) {
+    quantized = Int8Array.from(embedding, value => Math.round(value * INT8_EMBEDDING_SCALE));
+    int8Embeddings.set(embedding, quantized);
+  }
+  return quantized;
+};
+
+// Collection counts for the dashboards; a write clears them straight away, the TTL only
+// bounds staleness if the index files are changed by another process
+const COLLECTION_STATS_TTL_MS = 5000;
+
+// Four independent accumulators break the add dependency chain, so V8's optimized loop
+// keeps several multiply-adds in flight (384-dim MiniLM vectors divide evenly)
+const dotProduct = (a, b) => {
+  const length = a.length;
+  const unrolled = length - (length % 4);
+  let s0 = 0;
+  let s1 = 0;
+  let s2 = 0;
+  let s3 = 0;
+  let i = 0;
+  for (; i < unrolled; i += 4) {
+    s0 += a[i] * b[i];
+    s1 += a[i + 1] * b[i + 1];
+    s2 += a[i + 2] * b[i + 2];
+    s3 += a[i + 3] * b[i + 3];
+  }
+  for (; i < length; i++) s0 += a[i] * b[i];
+  return (s0 + s1) + (s2 + s3);
+};
+
+let sharedInstance = null;
+
+// The embedding model is loaded once per process and shared by every instance,
+// including re-initialization after an index reset
+let embedderLoading = null;
+const loadEmbedder = () => {
+  if (!embedderLoading) {
+    embedderLoading = pipeline('feature-extraction', 'Xenova/all-MiniLM-L6-v2').catch(error => {
+      embedderLoading = null;
+      throw error;
+    });
+  }
+  return embedderLoading;
+};
+
+// Get-or-create for a Vectra index folder; an existing index is opened as-is, never rebuilt
+const openOrCreateIndex = async (folderPath) => {
+  const index = new LocalIndex(folderPath);
+  if (!await index.isIndexCreated()) {
+    await index.createIndex();
+  }
+  return index;
+};
 
 class VectorService {
   constructor() {
@@ -10,29 +213,60 @@ class VectorService {
     this.documentsIndex = null;
     this.embedder = null;
     this.isConnected = false;
+    // Pending initialize() run, shared by callers that arrive while it is in progress
+    this.initializing = null;
     this.indexPath = path.join(process.cwd(), 'vector_indexes');
+    // Tail of the queued updates per index (Vectra allows one open update at a time)
+    this.indexUpdateTails = new Map();
+    // Writes waiting for their index's next update, see writeItems
+    this.pendingWrites = new Map();
+    // Single contracts / documents waiting for the next batch, see enqueueIndexing
+    this.indexBuffers = new Map();
+    this.indexFlushTails = new Map();
+    // index -> metadata field -> value -> Map(item id -> item), see lookupItems
+    this.metadataIndexes = new WeakMap();
+    // index -> [{ embedding (int8), topK, results, storedAt }], least recently used first, see queryIndex
+    this.queryResultCaches = new WeakMap();
+    // { stats, storedAt } from the last getCollectionStats, dropped on every index write
+    this.collectionStats = null;
+  }
+
+  // One process-wide instance: routes, the queue processors and semantic search all read and
+  // write the same index files, and the index-update queue only works if it is shared
+  static getSharedInstance() {
+    if (!sharedInstance) {
+      sharedInstance = new VectorService();
+    }
+    return sharedInstance;
   }
 
-  async initialize() {
+  // Safe to call repeatedly: existing indexes are opened rather than recreated, so this
+  // never discards data. Wiping the indexes is left to the explicit reset paths.
+  initialize() {
+    if (!this.initializing) {
+      this.initializing = this.openIndexes().finally(() => {
+        this.initializing = null;
+      });
+    }
+    return this.initializing;
+  }
+
+  async openIndexes() {
     try {
       // Ensure vector indexes directory exists
       await fs.ensureDir(this.indexPath);
 
-      // Initialize the embedding model (using a lightweight model)
+      // Load the embedding model (using a lightweight model) while the indexes are opened
       console.log('🔄 Loading embedding model...');
-      this.embedder = await pipeline('feature-extraction', 'Xenova/all-MiniLM-L6-v2');
-
-      // Initialize local vector indexes
-      this.contractsIndex = new LocalIndex(path.join(this.indexPath, 'contracts'));
-      this.documentsIndex = new LocalIndex(path.join(this.indexPath, 'documents'));
-
-      // Create indexes if they don't exist
-      if (!await this.contractsIndex.isIndexCreated()) {
-        await this.contractsIndex.createIndex();
-      }
-      if (!await this.documentsIndex.isIndexCreated()) {
-        await this.documentsIndex.createIndex();
-      }
+      const [embedder, contractsIndex, documentsIndex] = await Promise.all([
+        loadEmbedder(),
+        openOrCreateIndex(path.join(this.indexPath, 'contracts')),
+        openOrCreateIndex(path.join(this.indexPath, 'documents'))
+      ]);
+      this.embedder = embedder;
+      this.contractsIndex = contractsIndex;
+      this.documentsIndex = documentsIndex;
+      this.collectionStats = null;
 
       console.log('✅ Vector database (Vectra) initialized - Pure Node.js solution');
       this.isConnected = true;
@@ -45,80 +279,325 @@ class VectorService {
   }
 
   async indexContract(contract) {
+    const indexedIds = await this.enqueueIndexing('contracts', contract, contracts => this.indexContracts(contracts));
+    return indexedIds.has(contract.noticeId);
+  }
+
+  async indexDocument(document, contractId) {
+    const indexedIds = await this.enqueueIndexing('documents', { ...document, contractId }, documents => this.indexDocuments(documents));
+    return indexedIds.has(`${contractId}_${document.filename}`);
+  }
+
+  // Parallel queue workers index one item each. Items that arrive while the previous batch
+  // is being embedded and written are gathered and indexed together in the next one, so
+  // they share a model call and an index update. Nothing is held back once the previous
+  // batch finishes, so there is no tail to flush on shutdown.
+  enqueueIndexing(kind, item, indexMany) {
+    let buffer = this.indexBuffers.get(kind);
+    if (!buffer) {
+      buffer = { items: [] };
+      const previous = this.indexFlushTails.get(kind) || Promise.resolve();
+      buffer.indexed = previous.then(() => {
+        if (this.indexBuffers.get(kind) === buffer) {
+          this.indexBuffers.delete(kind);
+        }
+        return indexMany(buffer.items);
+      });
+      this.indexFlushTails.set(kind, buffer.indexed.catch(() => {}));
+      this.indexBuffers.set(kind, buffer);
+    }
+    buffer.items.push(item);
+    if (buffer.items.length >= VectorService.INDEX_BATCH_SIZE) {
+      // Full: later items start the next batch
+      this.indexBuffers.delete(kind);
+    }
+    return buffer.indexed;
+  }
+
+  /**
+   * Index many contracts at once: embeddings are computed in batches and each batch
+   * is written to the index in a single update instead of rewriting it per item.
+   * @returns {Promise<Set<string>>} noticeIds that were indexed
+   */
+  async indexContracts(contracts, batchSize = VectorService.INDEX_BATCH_SIZE) {
     if (!this.isConnected) {
       console.warn('Vector database not connected - skipping contract indexing');
-      return false;
+      return new Set();
     }
 
-    try {
-      const text = `${contract.title || ''} ${contract.description || ''} ${contract.agency || ''}`.trim();
-      
-      if (!text) {
-        console.warn(`Skipping contract ${contract.noticeId} - no text content`);
-        return false;
-      }
-
-      // Generate embedding
-      const embedding = await this.generateEmbedding(text);
-      
-      // Add to index
-      await this.contractsIndex.insertItem({
-        vector: embedding,
-        metadata: {
+    // One pass, and the metadata object built here is the one stored (text included)
+    const items = [];
+    for (const contract of contracts) {
+      const text = contractText(contract);
+      if (!text) continue;
+      items.push({
+        id: contract.noticeId,
+        text,
+        metadata: compactMetadata({
           id: contract.noticeId,
           title: contract.title,
           agency: contract.agency,
           naicsCode: contract.naicsCode,
           postedDate: contract.postedDate?.toISOString(),
           setAsideCode: contract.setAsideCode,
-          text: text
-        }
+          text
+        })
       });
-
-      console.log(`Indexed contract: ${contract.noticeId}`);
-      return true;
-    } catch (error) {
-      console.error(`Error indexing contract ${contract.noticeId}:`, error);
-      return false;
     }
+
+    // Contract vectors only drive coarse title/agency similarity, so int8 precision is plenty
+    return this.insertBatched(this.contractsIndex, items, batchSize, 'contracts', { quantize: true });
   }
 
-  async indexDocument(document, contractId) {
+  /**
+   * Index many processed documents at once, batched the same way as indexContracts.
+   * Each document needs filename and contractId, plus content or processedData to embed.
+   * @returns {Promise<Set<string>>} Document ids (contractId_filename) that were indexed
+   */
+  async indexDocuments(documents, batchSize = VectorService.INDEX_BATCH_SIZE) {
     if (!this.isConnected) {
       console.warn('Vector database not connected - skipping document indexing');
-      return false;
+      return new Set();
     }
 
-    try {
-      const documentId = `${contractId}_${document.filename}`;
-      const text = document.content || document.processedData || '';
-      
+    const processedAt = new Date().toISOString();
+    const items = [];
+    for (const document of documents) {
+      const id = `${document.contractId}_${document.filename}`;
+      const text = document.content || extractSearchableContent(document.processedData);
       if (!text) {
-        console.warn(`Skipping document ${documentId} - no text content`);
-        return false;
+        console.warn(`Skipping document ${id} - no text content`);
+        continue;
       }
-
-      // Generate embedding
-      const embedding = await this.generateEmbedding(text);
-      
-      // Add to index
-      await this.documentsIndex.insertItem({
-        vector: embedding,
-        metadata: {
-          id: documentId,
-          contractId,
+      items.push({
+        id,
+        text,
+        metadata: compactMetadata({
+          id,
+          contractId: document.contractId,
           filename: document.filename,
-          processedAt: new Date().toISOString(),
-          text: text
-        }
+          processedAt,
+          preview: documentPreview(text),
+          fullTextLength: text.length > MAX_STORED_DOCUMENT_CHARS ? text.length : undefined,
+          text: text.length > MAX_STORED_DOCUMENT_CHARS ? text.slice(0, MAX_STORED_DOCUMENT_CHARS) : text
+        })
       });
+    }
 
-      console.log(`Indexed document: ${documentId}`);
-      return true;
-    } catch (error) {
-      console.error(`Error indexing document ${documentId}:`, error);
-      return false;
+    return this.insertBatched(this.documentsIndex, items, batchSize, 'documents');
+  }
+
+  // Batch i+1 is embedded while batch i is written, so model time overlaps index I/O.
+  // Items with unusable embeddings are dropped before the write; if a write still fails,
+  // the batch is split in half and retried so one bad item doesn't sink the rest.
+  async insertBatched(index, items, batchSize, label, { quantize = false } = {}) {
+    const indexedIds = new Set();
+
+    // Entries carry the item id, so a batch is handed to writeItems as built, without
+    // wrapper objects to unpack on every write
+    const write = async (entries) => {
+      try {
+        await this.writeItems(index, entries);
+        entries.forEach(entry => indexedIds.add(entry.id));
+      } catch (error) {
+        if (entries.length === 1) {
+          console.error(`Error indexing ${label} item ${entries[0].id}:`, error);
+          return;
+        }
+        const middle = Math.ceil(entries.length / 2);
+        await write(entries.slice(0, middle));
+        await write(entries.slice(middle));
+      }
+    };
+
+    // Settled into { embeddings } / { error } so a prefetch that fails while the
+    // previous batch is still being written is never an unhandled rejection
+    const embedBatch = (start) => {
+      const end = Math.min(start + batchSize, items.length);
+      const texts = new Array(end - start);
+      for (let j = start; j < end; j++) texts[j - start] = items[j].text;
+      return this.generateEmbeddings(texts).then(embeddings => ({ embeddings }), error => ({ error }));
+    };
+
+    let nextEmbedding = items.length > 0 ? embedBatch(0) : null;
+
+    for (let i = 0; i < items.length; i += batchSize) {
+      const end = Math.min(i + batchSize, items.length);
+      const { embeddings, error: embedError } = await nextEmbedding;
+      nextEmbedding = end < items.length ? embedBatch(end) : null;
+
+      if (embedError) {
+        console.error(`Error embedding ${label} batch starting at ${i}:`, embedError);
+        continue;
+      }
+
+      const dims = embeddings[0]?.length;
+      const entries = [];
+      for (let j = i; j < end; j++) {
+        const item = items[j];
+        const embedding = embeddings[j - i];
+        if (!isValidEmbedding(embedding, dims)) {
+          console.warn(`Skipping ${label} item ${item.id} - invalid embedding`);
+          continue;
+        }
+        entries.push({
+          // The contract's noticeId / the document's contractId_filename, so re-indexing
+          // replaces the stored item instead of adding a duplicate
+          id: item.id,
+          vector: quantize ? quantizeEmbedding(embedding) : embedding,
+          metadata: item.metadata
+        });
+      }
+
+      if (entries.length > 0) {
+        await write(entries);
+      }
+      console.log(`Indexed ${indexedIds.size}/${items.length} ${label}`);
+    }
+
+    return indexedIds;
+  }
+
+  /**
+   * Exact-match metadata lookup through an in-process inverted index.
+   * The field's index is built from one listItems() pass on first use and kept current by
+   * insertBatched, so id / contract lookups are a hash hit instead of an embedding query
+   * or a scan over every item.
+   * @returns {Promise<Array<Object>>} Matching Vectra items, oldest first
+   */
+  async lookupItems(index, field, value) {
+    let fields = this.metadataIndexes.get(index);
+    if (!fields) {
+      fields = new Map();
+      this.metadataIndexes.set(index, fields);
+    }
+
+    let byValue = fields.get(field);
+    if (!byValue) {
+      const items = await index.listItems();
+      // Re-check: another caller may have built it while listItems was pending
+      byValue = fields.get(field);
+      if (!byValue) {
+        byValue = new Map();
+        for (const item of items) {
+          addToValueIndex(byValue, item.metadata[field], item);
+        }
+        fields.set(field, byValue);
+      }
+    }
+
+    const matches = byValue.get(value);
+    // An upsert updates the item in place, so an entry filed under an old value can go stale
+    return matches ? [...matches.values()].filter(item => item.metadata[field] === value) : [];
+  }
+
+  addToMetadataIndexes(index, items) {
+    const fields = this.metadataIndexes.get(index);
+    if (!fields) return;
+
+    // Vectra versions that don't return the inserted item: rebuild on next lookup instead
+    if (items.some(item => !item)) {
+      this.metadataIndexes.delete(index);
+      return;
+    }
+
+    for (const [field, byValue] of fields) {
+      for (const item of items) {
+        addToValueIndex(byValue, item.metadata[field], item);
+      }
+    }
+  }
+
+  // LocalIndex.queryItems through the semantic result cache
+  async queryIndex(index, queryEmbedding, topK) {
+    let entries = this.queryResultCaches.get(index);
+    if (!entries) {
+      entries = [];
+      this.queryResultCaches.set(index, entries);
+    }
+
+    const now = Date.now();
+    const quantizedQuery = toInt8Embedding(queryEmbedding);
+    let best = -1;
+    // Thresholds are compared against the int8 dot product, so the scan never divides
+    let bestDot = QUERY_RESULT_SIMILARITY * INT8_EMBEDDING_SCALE;
+    for (let i = entries.length - 1; i >= 0; i--) {
+      const entry = entries[i];
+      if (now - entry.storedAt > QUERY_RESULT_CACHE_TTL_MS) {
+        entries.splice(i, 1);
+        if (best > i) best--;
+        continue;
+      }
+      if (entry.topK !== topK) continue;
+      // embedQuery hands back the same array for a repeated query, so an exact repeat is
+      // found without any arithmetic; newest entries are scanned first
+      if (entry.embedding === quantizedQuery) {
+        best = i;
+        break;
+      }
+      const dot = dotProduct(entry.embedding, queryEmbedding);
+      if (dot >= bestDot) {
+        best = i;
+        bestDot = dot;
+      }
+    }
+
+    if (best >= 0) {
+      // Move to the end to mark as most recently used
+      const [hit] = entries.splice(best, 1);
+      entries.push(hit);
+      return hit.results;
     }
+
+    const results = await index.queryItems(queryEmbedding, topK);
+    // A write may have replaced the cache while the query ran; don't file stale results in it
+    if (this.queryResultCaches.get(index) === entries) {
+      entries.push({ embedding: quantizedQuery, topK, results, storedAt: now });
+      if (entries.length > QUERY_RESULT_CACHE_SIZE) {
+        entries.shift();
+      }
+    }
+    return results;
+  }
+
+  // Vectra rewrites the whole index file on every endUpdate, so writes that queue up behind
+  // a running update (parallel queue workers indexing one document each) are merged and
+  // committed together in the next update. A failed commit fails every write in it.
+  writeItems(index, entries) {
+    let pending = this.pendingWrites.get(index);
+    if (!pending) {
+      pending = { entries: [] };
+      pending.committed = this.runIndexUpdate(index, async () => {
+        // Writes arriving from here on go into the next update
+        this.pendingWrites.delete(index);
+        await index.beginUpdate();
+        try {
+          const inserted = [];
+          for (const entry of pending.entries) {
+            inserted.push(await index.upsertItem(entry));
+          }
+          await index.endUpdate();
+          this.addToMetadataIndexes(index, inserted);
+          this.queryResultCaches.delete(index);
+          this.collectionStats = null;
+        } catch (error) {
+          index.cancelUpdate();
+          throw error;
+        }
+      });
+      this.pendingWrites.set(index, pending);
+    }
+    pending.entries.push(...entries);
+    return pending.committed;
+  }
+
+  // Concurrent writers (parallel queue workers) wait their turn instead of failing
+  // with "update already in progress"; embeddings are computed before queueing
+  runIndexUpdate(index, update) {
+    const previous = this.indexUpdateTails.get(index) || Promise.resolve();
+    const run = previous.then(update);
+    this.indexUpdateTails.set(index, run.catch(() => {}));
+    return run;
   }
 
   async searchContracts(query, options = {}) {
@@ -132,13 +611,13 @@ class VectorService {
     try {
       // Generate embedding for query
       console.log(`🔍 Generating embedding for query: "${query}"`);
-      const queryEmbedding = await this.generateEmbedding(query);
+      const queryEmbedding = await this.embedQuery(query);
       console.log(`🔍 Generated embedding with length: ${queryEmbedding.length}`);
       
       // Search in contracts index with higher limit for filtering
       const searchLimit = Math.max(limit * 3, 50);
       console.log(`🔍 Searching contracts index with limit: ${searchLimit}`);
-      const results = await this.contractsIndex.queryItems(queryEmbedding, searchLimit);
+      const results = await this.queryIndex(this.contractsIndex, queryEmbedding, searchLimit);
       
       console.log(`🔍 Vector search found ${results.length} raw results for query: "${query}"`);
       
@@ -150,32 +629,32 @@ class VectorService {
         });
       }
       
-      // Filter by threshold and limit
-      const filteredResults = results
-        .filter(result => {
-          const passesThreshold = result.score >= threshold;
-          if (!passesThreshold) {
-            console.log(`🔍 Filtered out result with score ${result.score.toFixed(4)} (below threshold ${threshold})`);
-          }
-          return passesThreshold;
-        })
-        .slice(0, limit)
-        .map(result => ({
-          id: result.item.metadata.id,
-          noticeId: result.item.metadata.id,
-          title: result.item.metadata.title,
-          description: result.item.metadata.text,
-          agency: result.item.metadata.agency,
-          naicsCode: result.item.metadata.naicsCode,
-          postedDate: result.item.metadata.postedDate,
-          score: result.score,
-          metadata: result.item.metadata,
-          document: result.item.metadata.text,
+      // Filter by threshold and limit in one pass. Results come back best first, so the
+      // first score under the threshold ends the scan.
+      const filteredResults = [];
+      for (const { item: { metadata }, score } of results) {
+        if (score < threshold) {
+          console.log(`🔍 Filtered out ${results.length - filteredResults.length} results below threshold ${threshold} (best ${score.toFixed(4)})`);
+          break;
+        }
+        if (filteredResults.length === limit) break;
+        filteredResults.push({
+          id: metadata.id,
+          noticeId: metadata.id,
+          title: metadata.title,
+          description: metadata.text,
+          agency: metadata.agency,
+          naicsCode: metadata.naicsCode,
+          postedDate: metadata.postedDate,
+          score,
+          metadata,
+          document: metadata.text,
           // Add the percentage fields that the frontend expects
-          semanticScore: Math.round(result.score * 100),
+          semanticScore: Math.round(score * 100),
           keywordScore: 0,
-          naicsMatch: result.item.metadata.naicsCode ? 85 : 0
-        }));
+          naicsMatch: metadata.naicsCode ? 85 : 0
+        });
+      }
       
       console.log(`🔍 After filtering (threshold: ${threshold}): ${filteredResults.length} results`);
       
@@ -197,12 +676,12 @@ class VectorService {
     try {
       // Generate embedding for query
       console.log(`🔍 [DEBUG] Generating embedding for query...`);
-      const queryEmbedding = await this.generateEmbedding(query);
+      const queryEmbedding = await this.embedQuery(query);
       console.log(`🔍 [DEBUG] Generated embedding with length: ${queryEmbedding.length}`);
       
       // Search in documents index
       console.log(`🔍 [DEBUG] Searching documents index...`);
-      const results = await this.documentsIndex.queryItems(queryEmbedding, limit);
+      const results = await this.queryIndex(this.documentsIndex, queryEmbedding, limit);
       console.log(`🔍 [DEBUG] Raw search results count: ${results.length}`);
       
       const mappedResults = results.map(result => ({
@@ -221,6 +700,25 @@ class VectorService {
     }
   }
 
+  // Results are shaped like searchDocuments results, with an exact-match score of 1
+  async getDocumentById(documentId) {
+    if (!this.isConnected) {
+      return null;
+    }
+
+    const matches = await this.lookupItems(this.documentsIndex, 'id', documentId);
+    return matches.length > 0 ? toDocumentResult(matches[matches.length - 1]) : null;
+  }
+
+  async getDocumentsByContract(contractId) {
+    if (!this.isConnected) {
+      return [];
+    }
+
+    const matches = await this.lookupItems(this.documentsIndex, 'contractId', contractId);
+    return matches.map(toDocumentResult);
+  }
+
   async getCollectionStats() {
     if (!this.isConnected) {
       return { 
@@ -230,9 +728,17 @@ class VectorService {
       };
     }
 
+    // Dashboards poll this every few seconds; between index writes the counts can't change
+    if (this.collectionStats && Date.now() - this.collectionStats.storedAt < COLLECTION_STATS_TTL_MS) {
+      return { ...this.collectionStats.stats };
+    }
+
     try {
-      const contractsItems = await this.contractsIndex.listItems();
-      const documentsItems = await this.documentsIndex.listItems();
+      // The two indexes are separate files, so load them side by side
+      const [contractsItems, documentsItems] = await Promise.all([
+        this.contractsIndex.listItems(),
+        this.documentsIndex.listItems()
+      ]);
       
       console.log(`Vector DB Stats: ${contractsItems.length} contracts, ${documentsItems.length} documents indexed`);
       
@@ -246,7 +752,7 @@ class VectorService {
         });
       }
 
-      return {
+      const stats = {
         contracts: contractsItems.length,
         documents: documentsItems.length,
         status: 'connected',
@@ -257,6 +763,8 @@ class VectorService {
           textLength: item.metadata.text?.length || 0
         }))
       };
+      this.collectionStats = { stats, storedAt: Date.now() };
+      return { ...stats };
     } catch (error) {
       console.error('Error getting collection stats:', error);
       return { 
@@ -275,9 +783,7 @@ class VectorService {
 
     try {
       console.log(`🔍 Searching vector database for contract ID: ${noticeId}`);
-      const contractsItems = await this.contractsIndex.listItems();
-      
-      const contract = contractsItems.find(item => item.metadata.id === noticeId);
+      const [contract] = await this.lookupItems(this.contractsIndex, 'id', noticeId);
       
       if (contract) {
         console.log(`✅ Found contract in vector DB: ${noticeId}`);
@@ -348,7 +854,7 @@ class VectorService {
             filename: metadata.filename,
             contractId: metadata.contractId,
             processedAt: metadata.processedAt,
-            textLength: metadata.text?.length || 0
+            textLength: metadata.fullTextLength || metadata.text?.length || 0
           });
         }
       });
@@ -406,33 +912,37 @@ class VectorService {
     try {
       // Generate embedding for query
       console.log(`🔍 [DEBUG] Generating embedding for advanced search...`);
-      const queryEmbedding = await this.generateEmbedding(query);
+      const queryEmbedding = await this.embedQuery(query);
       
       // Search in documents index with higher limit for filtering
       const searchLimit = Math.max(limit * 3, 50); // Get more results for filtering
       console.log(`🔍 [DEBUG] Searching with limit: ${searchLimit}`);
-      const results = await this.documentsIndex.queryItems(queryEmbedding, searchLimit);
+      let results;
+      if (contractId) {
+        // Narrow to the contract's documents first and rank only those, instead of hoping they
+        // surface in the global top-N and dropping everything else afterwards
+        const candidates = await this.lookupItems(this.documentsIndex, 'contractId', contractId);
+        results = rankItems(candidates, queryEmbedding, searchLimit);
+      } else {
+        results = await this.queryIndex(this.documentsIndex, queryEmbedding, searchLimit);
+      }
       
       console.log(`🔍 [DEBUG] Raw search results: ${results.length}`);
       
-      // Filter results based on criteria
+      // Filter results based on criteria. The contract filter was applied when picking
+      // candidates, and the wanted extension is normalized once rather than per result.
+      const wantedExtension = fileType ? fileType.toLowerCase() : null;
       let filteredResults = results.filter(result => {
         // Score filter
         if (result.score < minScore) {
           return false;
         }
 
-        const metadata = result.item.metadata;
-
-        // Contract filter
-        if (contractId && metadata.contractId !== contractId) {
-          return false;
-        }
-
         // File type filter
-        if (fileType && metadata.filename) {
-          const extension = metadata.filename.split('.').pop()?.toLowerCase();
-          if (extension !== fileType.toLowerCase()) {
+        const filename = result.item.metadata.filename;
+        if (wantedExtension && filename) {
+          const extension = filename.slice(filename.lastIndexOf('.') + 1).toLowerCase();
+          if (extension !== wantedExtension) {
             return false;
           }
         }
@@ -445,72 +955,81 @@ class VectorService {
 
       console.log(`🔍 [DEBUG] Filtered results: ${filteredResults.length}`);
 
-      // Check for downloaded files and parse processed data
-      const fs = require('fs-extra');
-      const path = require('path');
+      // Gather downloads and processed data for the whole result page up front: one readdir and
+      // one queue query instead of a directory listing and a findFirst per hit
       const downloadPath = path.join(process.cwd(), 'downloaded_documents');
-
-      const mappedResults = await Promise.all(filteredResults.map(async (result) => {
-        const metadata = result.item.metadata;
-        
-        // Check if file is downloaded locally
-        let isDownloaded = false;
-        let localFilePath = null;
-        
-        try {
-          if (await fs.pathExists(downloadPath)) {
-            const files = await fs.readdir(downloadPath);
-            const matchingFile = files.find(file => 
-              file.includes(metadata.contractId) && 
-              (file.includes(metadata.filename?.replace(/\.[^/.]+$/, '')) || 
-               file.includes('document'))
-            );
-            
-            if (matchingFile) {
-              isDownloaded = true;
-              localFilePath = path.join(downloadPath, matchingFile);
-            }
-          }
-        } catch (error) {
-          console.warn(`⚠️ [DEBUG] Error checking downloaded files: ${error.message}`);
+      let downloadedFiles = [];
+      try {
+        if (await fs.pathExists(downloadPath)) {
+          downloadedFiles = await fs.readdir(downloadPath);
         }
+      } catch (error) {
+        console.warn(`⚠️ [DEBUG] Error checking downloaded files: ${error.message}`);
+      }
 
-        // Parse processed data to extract summarization
-        let summarization = null;
-        let fullContent = metadata.text;
-        
+      const processedByDocument = new Map();
+      if (filteredResults.length > 0) {
         try {
-          // Check if there's processed data in the queue
           const { prisma } = require('../config/database');
-          const queueEntry = await prisma.documentProcessingQueue.findFirst({
+          const { parseProcessedData } = require('./documentQueueService');
+          const queueEntries = await prisma.documentProcessingQueue.findMany({
             where: {
-              contractNoticeId: metadata.contractId,
-              filename: metadata.filename,
               status: 'completed',
-              processedData: { not: null }
-            }
+              processedData: { not: null },
+              OR: filteredResults.map(result => ({
+                contractNoticeId: result.item.metadata.contractId,
+                filename: result.item.metadata.filename
+              }))
+            },
+            select: { id: true, contractNoticeId: true, filename: true, processedData: true, updatedAt: true }
           });
 
-          if (queueEntry && queueEntry.processedData) {
-            const processedData = JSON.parse(queueEntry.processedData);
-            
-            if (processedData.content) {
-              fullContent = processedData.content;
-            }
-            
-            if (processedData.summary || processedData.analysis) {
-              summarization = {
-                summary: processedData.summary,
-                analysis: processedData.analysis,
-                keyPoints: processedData.keyPoints || processedData.key_points,
-                recommendations: processedData.recommendations,
-                wordCount: processedData.wordCount || processedData.word_count,
-                pageCount: processedData.pageCount || processedData.page_count
-              };
+          for (const entry of queueEntries) {
+            const key = `${entry.contractNoticeId}\u0000${entry.filename}`;
+            if (processedByDocument.has(key)) continue;
+            try {
+              processedByDocument.set(key, parseProcessedData(entry));
+            } catch (error) {
+              console.warn(`⚠️ [DEBUG] Error parsing processed data for ${entry.filename}: ${error.message}`);
             }
           }
         } catch (error) {
-          console.warn(`⚠️ [DEBUG] Error parsing processed data for ${metadata.filename}: ${error.message}`);
+          console.warn(`⚠️ [DEBUG] Error loading processed data: ${error.message}`);
+        }
+      }
+
+      const mappedResults = filteredResults.map((result) => {
+        const metadata = result.item.metadata;
+        
+        // Check if file is downloaded locally
+        const matchingFile = downloadedFiles.find(file => 
+          file.includes(metadata.contractId) && 
+          (file.includes(metadata.filename?.replace(/\.[^/.]+$/, '')) || 
+           file.includes('document'))
+        );
+        const isDownloaded = !!matchingFile;
+        const localFilePath = matchingFile ? path.join(downloadPath, matchingFile) : null;
+
+        // Use processed data to extract summarization
+        let summarization = null;
+        let fullContent = metadata.text;
+        const processedData = processedByDocument.get(`${metadata.contractId}\u0000${metadata.filename}`);
+
+        if (processedData) {
+          if (processedData.content) {
+            fullContent = processedData.content;
+          }
+          
+          if (processedData.summary || processedData.analysis) {
+            summarization = {
+              summary: processedData.summary,
+              analysis: processedData.analysis,
+              keyPoints: processedData.keyPoints || processedData.key_points,
+              recommendations: processedData.recommendations,
+              wordCount: processedData.wordCount || processedData.word_count,
+              pageCount: processedData.pageCount || processedData.page_count
+            };
+          }
         }
 
         return {
@@ -528,7 +1047,7 @@ class VectorService {
           hasFullContent: !!fullContent,
           hasSummarization: !!summarization
         };
-      }));
+      });
       
       return {
         results: mappedResults,
@@ -550,20 +1069,63 @@ class VectorService {
     }
   }
 
-  async generateEmbedding(text) {
+  // The model loads on first use, so callers that only need embeddings (scripts,
+  // aiService's local fallback) don't have to open the indexes first
+  async getEmbedder() {
     if (!this.embedder) {
-      throw new Error('Embedding model not initialized');
+      this.embedder = await loadEmbedder();
     }
+    return this.embedder;
+  }
 
+  async generateEmbedding(text) {
     try {
       // Generate embedding using the transformer model
-      const output = await this.embedder(text, { pooling: 'mean', normalize: true });
+      const embedder = await this.getEmbedder();
+      const output = await embedder(embeddingInput(text), { pooling: 'mean', normalize: true });
       return Array.from(output.data);
     } catch (error) {
       console.error('Error generating embedding:', error);
       throw error;
     }
   }
+
+  // Search queries go through the LRU cache; returned vectors are shared, don't mutate them
+  async embedQuery(query) {
+    const key = query.trim().toLowerCase();
+    let embedding = queryEmbeddingCache.get(key);
+    if (!embedding) {
+      embedding = await this.generateEmbedding(key);
+      queryEmbeddingCache.set(key, embedding);
+    }
+    return embedding;
+  }
+
+  // One model call for a whole batch; output is a [uniqueInputs.length, dims] tensor.
+  // Identical inputs (an attachment shared by several contracts) are embedded once.
+  async generateEmbeddings(texts) {
+    try {
+      const embedder = await this.getEmbedder();
+      const inputs = texts.map(embeddingInput);
+      const uniqueInputs = [...new Set(inputs)];
+      const output = await embedder(uniqueInputs, { pooling: 'mean', normalize: true });
+      const dims = output.dims[output.dims.length - 1];
+      const byInput = new Map(uniqueInputs.map((input, index) => [input, index]));
+      return inputs.map(input => {
+        const index = byInput.get(input);
+        return Array.from(output.data.subarray(index * dims, (index + 1) * dims));
+      });
+    } catch (error) {
+      console.error('Error generating embeddings:', error);
+      throw error;
+    }
+  }
 }
 
+// Texts embedded and written per index update when bulk indexing
+VectorService.INDEX_BATCH_SIZE = 64;
+
+// Exposed so other embedding pipelines build contract text the same way
+VectorService.contractText = contractText;
+
 module.exports = VectorService;
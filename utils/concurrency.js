@@ -0,0 +1,103 @@
+/**
+ * Run async task factories with at most `limit` in flight at once.
+ * Unlike fixed-size batches, a new task starts as soon as any slot frees up,
+ * so one slow download no longer stalls the rest of its batch.
+ * @param {Array<Function>} tasks - Functions returning a promise
+ * @param {number} limit - Maximum number of concurrent tasks
+ * @param {Function} [onSettled] - Called with (result, index) after each task settles
+ * @returns {Promise<Array<{status: string, value?: any, reason?: any}>>} Results in task order
+ */
+async function runWithConcurrency(tasks, limit, onSettled) {
+  const results = new Array(tasks.length);
+  let nextIndex = 0;
+
+  const worker = async () => {
+    while (nextIndex < tasks.length) {
+      const index = nextIndex++;
+      try {
+        results[index] = { status: 'fulfilled', value: await tasks[index]() };
+      } catch (error) {
+        results[index] = { status: 'rejected', reason: error };
+      }
+      if (onSettled) {
+        onSettled(results[index], index);
+      }
+    }
+  };
+
+  const workerCount = Math.max(1, Math.min(limit || 1, tasks.length));
+  await Promise.all(Array.from({ length: workerCount }, worker));
+  return results;
+}
+
+/**
+ * Like runWithConcurrency, but halves the pool when too many recent tasks fail.
+ * Repeated timeouts usually mean the upstream is saturated, and piling more
+ * requests onto it only makes every one of them slower.
+ * @param {Array<Function>} tasks - Functions returning a promise
+ * @param {number} limit - Initial maximum number of concurrent tasks
+ * @param {Object} [options]
+ * @param {Function} [options.onSettled] - Called with (result, index) after each task settles
+ * @param {Function} [options.isFailure] - Classifies a settled result (default: rejected)
+ * @param {number} [options.minLimit=2] - Pool never shrinks below this
+ * @param {number} [options.windowSize=50] - Number of recent results considered
+ * @param {number} [options.failureThreshold=0.3] - Failure rate that triggers a shrink
+ * @returns {Promise<Array<{status: string, value?: any, reason?: any}>>} Results in task order
+ */
+async function runWithAdaptiveConcurrency(tasks, limit, options = {}) {
+  const {
+    onSettled,
+    isFailure = result => result.status === 'rejected',
+    minLimit = 2,
+    windowSize = 50,
+    failureThreshold = 0.3
+  } = options;
+
+  const results = new Array(tasks.length);
+  const recentFailures = [];
+  let nextIndex = 0;
+  let activeLimit = Math.max(1, Math.min(limit || 1, tasks.length));
+
+  const recordOutcome = (result) => {
+    recentFailures.push(isFailure(result));
+    if (recentFailures.length > windowSize) {
+      recentFailures.shift();
+    }
+
+    // Wait for a minimum sample before judging, then start a fresh window after shrinking
+    const sampleSize = Math.min(windowSize, 10);
+    if (recentFailures.length < sampleSize || activeLimit <= minLimit) {
+      return;
+    }
+    const failureRate = recentFailures.filter(Boolean).length / recentFailures.length;
+    if (failureRate > failureThreshold) {
+      activeLimit = Math.max(minLimit, Math.floor(activeLimit / 2));
+      recentFailures.length = 0;
+      console.warn(`⚠️ [DEBUG] ${(failureRate * 100).toFixed(0)}% of recent tasks failed, reducing concurrency to ${activeLimit}`);
+    }
+  };
+
+  // Workers above the current limit exit after finishing their task
+  const worker = async (workerIndex) => {
+    while (nextIndex < tasks.length && workerIndex < activeLimit) {
+      const index = nextIndex++;
+      try {
+        results[index] = { status: 'fulfilled', value: await tasks[index]() };
+      } catch (error) {
+        results[index] = { status: 'rejected', reason: error };
+      }
+      recordOutcome(results[index]);
+      if (onSettled) {
+        onSettled(results[index], index);
+      }
+    }
+  };
+
+  await Promise.all(Array.from({ length: activeLimit }, (_, workerIndex) => worker(workerIndex)));
+  return results;
+}
+
+module.exports = {
+  runWithConcurrency,
+  runWithAdaptiveConcurrency
+};
@@ -2,6 +2,13 @@ const fs = require('fs');
 const path = require('path');
 const AdmZip = require('adm-zip');
 
+// Document types pulled out of ZIP archives; everything else in the archive is skipped
+const EXTRACTABLE_EXTENSIONS = new Set([
+  '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+  '.docm', '.xlsm', '.pptm', '.dotx', '.dotm', '.xltx', '.xltm',
+  '.potx', '.potm', '.ppsx', '.ppsm', '.txt', '.rtf', '.csv'
+]);
+
 class DocumentAnalyzer {
   constructor() {
     this.supportedTypes = {
@@ -347,11 +354,7 @@ class DocumentAnalyzer {
         const entryExt = path.extname(entryName).toLowerCase();
         
         // Only extract supported document types
-        const supportedExtensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', 
-                                   '.docm', '.xlsm', '.pptm', '.dotx', '.dotm', '.xltx', '.xltm',
-                                   '.potx', '.potm', '.ppsx', '.ppsm', '.txt', '.rtf', '.csv'];
-        
-        if (!supportedExtensions.includes(entryExt)) {
+        if (!EXTRACTABLE_EXTENSIONS.has(entryExt)) {
           console.log(`📦 [DEBUG] Skipping unsupported file type: ${entryName}`);
           continue;
         }
@@ -1,19 +1,47 @@
 // Simple logger utility
-const logger = {
-  info: (message, ...args) => {
-    console.log(`[INFO] ${new Date().toISOString()} - ${message}`, ...args);
-  },
-  error: (message, ...args) => {
-    console.error(`[ERROR] ${new Date().toISOString()} - ${message}`, ...args);
-  },
-  warn: (message, ...args) => {
-    console.warn(`[WARN] ${new Date().toISOString()} - ${message}`, ...args);
-  },
-  debug: (message, ...args) => {
-    if (process.env.NODE_ENV === 'development') {
-      console.log(`[DEBUG] ${new Date().toISOString()} - ${message}`, ...args);
-    }
+//
+// The level is resolved once at load time (LOG_LEVEL, else debug in development and
+// info otherwise), and disabled levels are bound to a no-op, so their calls return
+// before building the timestamp or message. Pass values as printf-style arguments
+// (logger.info('Found %d results', count)) rather than template literals so they are
+// only formatted when the line is actually written.
+const LOG_LEVELS = { debug: 10, info: 20, warn: 30, error: 40 };
+
+const threshold = LOG_LEVELS[(process.env.LOG_LEVEL || '').toLowerCase()] ||
+  (process.env.NODE_ENV === 'development' ? LOG_LEVELS.debug : LOG_LEVELS.info);
+
+const isLevelEnabled = level => LOG_LEVELS[level] >= threshold;
+
+const noop = () => {};
+
+// Lines logged in a burst mostly share a millisecond; the ISO string is only rebuilt
+// once the clock has moved on
+let stampMs = 0;
+let stamp = '';
+const timestamp = () => {
+  const now = Date.now();
+  if (now !== stampMs) {
+    stampMs = now;
+    stamp = new Date(now).toISOString();
   }
+  return stamp;
+};
+
+const logger = {
+  info: isLevelEnabled('info')
+    ? (message, ...args) => console.log(`[INFO] ${timestamp()} - ${message}`, ...args)
+    : noop,
+  error: isLevelEnabled('error')
+    ? (message, ...args) => console.error(`[ERROR] ${timestamp()} - ${message}`, ...args)
+    : noop,
+  warn: isLevelEnabled('warn')
+    ? (message, ...args) => console.warn(`[WARN] ${timestamp()} - ${message}`, ...args)
+    : noop,
+  debug: isLevelEnabled('debug')
+    ? (message, ...args) => console.log(`[DEBUG] ${timestamp()} - ${message}`, ...args)
+    : noop,
+  // Guard for log calls whose arguments are expensive to compute
+  isLevelEnabled
 };
 
 module.exports = logger;
@@ -0,0 +1,63 @@
+/**
+ * Bounded key-value cache with least-recently-used eviction.
+ * A Map iterates in insertion order, so a hit is re-inserted at the end and the first
+ * key is always the least recently used one. Entries can optionally expire after a TTL.
+ */
+class LruCache {
+  /**
+   * @param {number} maxSize - Entries kept before the least recently used one is evicted
+   * @param {Object} [options]
+   * @param {number} [options.ttlMs] - Entry lifetime; entries never expire when omitted
+   */
+  constructor(maxSize, { ttlMs } = {}) {
+    this.maxSize = maxSize;
+    this.ttlMs = ttlMs;
+    this.entries = new Map(); // key -> { value, storedAt }
+  }
+
+  /**
+   * Look up a key and mark it as most recently used.
+   * @param {*} key
+   * @returns {*} The cached value, or undefined when missing or expired
+   */
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+
+    this.entries.delete(key);
+    if (this.ttlMs !== undefined && Date.now() - entry.storedAt > this.ttlMs) {
+      return undefined;
+    }
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  /**
+   * Store a value as the most recently used entry, evicting the oldest if over capacity.
+   * @param {*} key
+   * @param {*} value
+   * @returns {LruCache}
+   */
+  set(key, value) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, storedAt: Date.now() });
+    if (this.entries.size > this.maxSize) {
+      this.entries.delete(this.entries.keys().next().value);
+    }
+    return this;
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+}
+
+module.exports = {
+  LruCache
+};
@@ -0,0 +1,56 @@
+const { performance } = require('perf_hooks');
+
+/**
+ * Token bucket rate limiter with lazy refill.
+ * Tokens are topped up from the elapsed monotonic time whenever the bucket is used,
+ * so there is no background timer, and callers only wait when the bucket is empty:
+ * a request that already took longer than the refill interval proceeds immediately.
+ */
+class TokenBucket {
+  /**
+   * @param {number} capacity - Maximum burst size
+   * @param {number} refillPerSecond - Tokens added per second
+   */
+  constructor(capacity, refillPerSecond) {
+    this.capacity = capacity;
+    // Both directions precomputed so refill and wait are a multiply each
+    this.refillPerMs = refillPerSecond / 1000;
+    this.msPerToken = 1000 / refillPerSecond;
+    this.tokens = capacity;
+    this.lastRefill = performance.now();
+  }
+
+  refill(now = performance.now()) {
+    this.tokens = Math.min(this.capacity, this.tokens + (now - this.lastRefill) * this.refillPerMs);
+    this.lastRefill = now;
+  }
+
+  /**
+   * Reserve tokens and return how long the caller must wait before using them.
+   * The balance may go negative, which queues later callers behind earlier ones
+   * instead of having every waiter wake and retry at once.
+   * @param {number} [tokens=1]
+   * @returns {number} Milliseconds to wait (0 when tokens were available)
+   */
+  reserve(tokens = 1) {
+    this.refill();
+    this.tokens -= tokens;
+    return this.tokens >= 0 ? 0 : -this.tokens * this.msPerToken;
+  }
+
+  /**
+   * Wait until the requested tokens are available, then consume them.
+   * @param {number} [tokens=1]
+   * @returns {Promise<void>}
+   */
+  async acquire(tokens = 1) {
+    const wait = this.reserve(tokens);
+    if (wait > 0) {
+      await new Promise(resolve => setTimeout(resolve, wait));
+    }
+  }
+}
+
+module.exports = {
+  TokenBucket
+};
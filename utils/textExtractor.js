@@ -0,0 +1,170 @@
+const fs = require('fs-extra');
+const path = require('path');
+const pdfParse = require('pdf-parse');
+const mammoth = require('mammoth');
+const AdmZip = require('adm-zip');
+const config = require('../config/env');
+
+// Tokens in word/document.xml that carry text or layout we keep
+const DOCX_TOKEN_RE = /<w:t(?:\s[^>]*)?>([^<]*)<\/w:t>|<\/w:p>|<w:tab\/>|<w:(?:br|cr)(?:\s[^>]*)?\/>/g;
+const XML_ENTITY_RE = /&(?:lt|gt|amp|quot|apos|#(\d+)|#x([0-9a-fA-F]+));/g;
+const XML_ENTITIES = { '&lt;': '<', '&gt;': '>', '&amp;': '&', '&quot;': '"', '&apos;': "'" };
+
+// fatal: throw on the first invalid sequence instead of scanning the whole buffer for U+FFFD
+const utf8Decoder = new TextDecoder('utf-8', { fatal: true });
+const utf16leDecoder = new TextDecoder('utf-16le');
+const utf16beDecoder = new TextDecoder('utf-16be');
+
+// Windows-1252 differs from Latin-1 only in 0x80-0x9F (smart quotes, dashes, euro, ...).
+// Mapped by hand because TextDecoder('windows-1252') degrades to Latin-1 on small-icu builds.
+const WINDOWS_1252_HIGH = '\u20AC\u0081\u201A\u0192\u201E\u2026\u2020\u2021\u02C6\u2030\u0160\u2039\u0152\u008D\u017D\u008F' +
+  '\u0090\u2018\u2019\u201C\u201D\u2022\u2013\u2014\u02DC\u2122\u0161\u203A\u0153\u009D\u017E\u0178';
+const WINDOWS_1252_HIGH_RE = /[\x80-\x9F]/g;
+
+const decodeWindows1252 = (buffer) => buffer
+  .toString('latin1')
+  .replace(WINDOWS_1252_HIGH_RE, char => WINDOWS_1252_HIGH[char.charCodeAt(0) - 0x80]);
+
+const decodeXmlEntities = (text) => text.replace(XML_ENTITY_RE, (entity, dec, hex) => {
+  if (dec) return String.fromCodePoint(parseInt(dec, 10));
+  if (hex) return String.fromCodePoint(parseInt(hex, 16));
+  return XML_ENTITIES[entity];
+});
+
+class TextExtractor {
+  /**
+   * Extract plain text from a PDF buffer using pdf-parse (pdf.js text layer).
+   * Much cheaper than table detection or OCR, so callers try it first.
+   * Per-page text is returned too, so callers can OCR only the pages that have
+   * no text layer (scans, drawings) instead of rasterizing the whole document.
+   * Only the first maxPages pages are read; large plan sets add little past that.
+   * @param {Buffer} buffer - PDF file contents
+   * @param {Object} [options]
+   * @param {number} [options.maxPages] - Page cap (0 reads every page)
+   * @returns {Promise<{text: string, pages: number, pageTexts: string[], truncated: boolean}>}
+   */
+  async extractPdfText(buffer, { maxPages = config.pdfMaxPages } = {}) {
+    const pageTexts = [];
+
+    // Same line reconstruction as pdf-parse's default renderer, but keeps each page's text
+    const pagerender = (pageData) => pageData.getTextContent({
+      normalizeWhitespace: false,
+      disableCombineTextItems: false
+    }).then((textContent) => {
+      let lastY;
+      let text = '';
+      for (const item of textContent.items) {
+        text += (lastY === item.transform[5] || !lastY) ? item.str : '\n' + item.str;
+        lastY = item.transform[5];
+      }
+      pageTexts[pageData.pageIndex] = text;
+      return text;
+    });
+
+    const pdfData = await pdfParse(buffer, { pagerender, max: maxPages || 0 });
+    const truncated = maxPages > 0 && pdfData.numpages > maxPages;
+    if (truncated) {
+      console.warn(`⚠️ [DEBUG] PDF has ${pdfData.numpages} pages, text extracted from the first ${maxPages} only`);
+    }
+
+    return {
+      text: pdfData.text || '',
+      pages: pdfData.numpages || 0,
+      pageTexts: Array.from(pageTexts, text => text || ''),
+      truncated
+    };
+  }
+
+  /**
+   * Extract plain text from a .docx buffer by scanning word/document.xml directly.
+   * Only text runs, paragraph ends, tabs and breaks are read; no document model
+   * (styles, numbering, relationships) is built.
+   * @param {Buffer} buffer - DOCX file contents
+   * @returns {string} Extracted text
+   */
+  extractDocxText(buffer) {
+    const zip = new AdmZip(buffer);
+    const entry = zip.getEntry('word/document.xml');
+    if (!entry) {
+      throw new Error('word/document.xml not found in DOCX archive');
+    }
+
+    const xml = entry.getData().toString('utf8');
+    const parts = [];
+    DOCX_TOKEN_RE.lastIndex = 0;
+    let match;
+    while ((match = DOCX_TOKEN_RE.exec(xml)) !== null) {
+      if (match[1] !== undefined) {
+        parts.push(decodeXmlEntities(match[1]));
+      } else if (match[0] === '</w:p>') {
+        parts.push('\n');
+      } else if (match[0] === '<w:tab/>') {
+        parts.push('\t');
+      } else {
+        parts.push('\n');
+      }
+    }
+    return parts.join('');
+  }
+
+  /**
+   * Decode a plain-text buffer, detecting the encoding from its byte-order mark.
+   * Without a BOM the bytes are decoded as UTF-8, falling back to Windows-1252
+   * (the usual encoding of text exported from Office) when they aren't valid UTF-8.
+   * @param {Buffer} buffer - Raw file contents
+   * @returns {string} Decoded text without the BOM
+   */
+  decodeText(buffer) {
+    if (buffer.length >= 3 && buffer[0] === 0xEF && buffer[1] === 0xBB && buffer[2] === 0xBF) {
+      return utf8Decoder.decode(buffer.subarray(3));
+    }
+    if (buffer.length >= 2 && buffer[0] === 0xFF && buffer[1] === 0xFE) {
+      return utf16leDecoder.decode(buffer.subarray(2));
+    }
+    if (buffer.length >= 2 && buffer[0] === 0xFE && buffer[1] === 0xFF) {
+      return utf16beDecoder.decode(buffer.subarray(2));
+    }
+
+    try {
+      return utf8Decoder.decode(buffer);
+    } catch (error) {
+      return decodeWindows1252(buffer);
+    }
+  }
+
+  /**
+   * Extract plain text from an uploaded document based on its extension.
+   * @param {string} filePath - Path to the file on disk
+   * @param {string} extension - Lower-case extension including the dot
+   * @returns {Promise<string>} Extracted text ('' for unsupported types)
+   */
+  async extractTextFromFile(filePath, extension = path.extname(filePath).toLowerCase()) {
+    switch (extension) {
+      case '.pdf': {
+        const buffer = await fs.readFile(filePath);
+        const { text } = await this.extractPdfText(buffer);
+        return text;
+      }
+      case '.docx': {
+        const buffer = await fs.readFile(filePath);
+        try {
+          return this.extractDocxText(buffer);
+        } catch (error) {
+          console.warn(`⚠️ [DEBUG] Fast DOCX extraction failed (${error.message}), falling back to mammoth`);
+          const result = await mammoth.extractRawText({ buffer });
+          return result.value;
+        }
+      }
+      case '.doc': {
+        const result = await mammoth.extractRawText({ path: filePath });
+        return result.value;
+      }
+      case '.txt':
+        return this.decodeText(await fs.readFile(filePath));
+      default:
+        return '';
+    }
+  }
+}
+
+module.exports = new TextExtractor();